@@ -0,0 +1,98 @@
+"""
+Per-item decode cost of order reads: resource path vs. client path.
+
+  resource: TypeDeserializer (what boto3's Table does) + convert_item_to_python
+  client:   decode_item on the raw AttributeValue map, in one pass
+
+Orders are synthetic but shaped like real ones (same attributes as
+build_order_item / convert_product_for_storage), with 1-50 products.
+
+    python -m benchmarks.decode_items --repeat 2000
+"""
+
+import argparse
+import timeit
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from utils.dynamodb_utils import convert_item_to_python, decode_item
+
+PRODUCT_COUNTS = (1, 5, 10, 25, 50)
+
+
+def make_product(i: int) -> dict:
+    return {
+        "ProductType": "Machine",
+        "ProductCategory": "D-Cut Bag",
+        "ProductId": i,
+        "ProductSize": "12 X 16",
+        "Width": 12,
+        "Height": 16,
+        "BagMaterial": "Non Woven",
+        "Quantity": 1000 + i,
+        "QuantityType": "Pieces",
+        "SheetGSM": 70,
+        "SheetColor": "White",
+        "HandleType": "Loop",
+        "HandleColor": "Red",
+        "HandleGSM": 80,
+        "PrintingType": "Screen",
+        "PrintColor": "Blue",
+        "Color": "White",
+        "Design": True,
+        "PlateAvailable": False,
+        "PlateRate": Decimal("450.50"),
+        "Rate": Decimal("1.85"),
+        "GST": Decimal("5"),
+        "ProductAmount": Decimal("1942.50"),
+        "ProductStatus": "ToDo",
+    }
+
+
+def make_order(products: int) -> dict:
+    return {
+        "OrderId": 2601010001,
+        "AgentId": "A01",
+        "Party_Name": "Shree Traders",
+        "AliasOrCompanyName": "Shree Traders Pvt Ltd",
+        "Address": "12 Market Road",
+        "City": "Pune",
+        "State": "Maharashtra",
+        "Pincode": 411001,
+        "Contact_Person1": "Ravi Kumar",
+        "Mobile1": 9876543210,
+        "Email": "ravi@example.com",
+        "Products": [make_product(i) for i in range(1, products + 1)],
+        "TotalAmount": Decimal("1942.50") * products,
+        "Carting": Decimal("150"),
+        "OrderStatus": "ToDo",
+        "OrderStartDate": "2026-01-01",
+        "deleted": False,
+        "Active": "2601010001",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="decodes per measurement")
+    args = parser.parse_args()
+
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+
+    def resource_path(raw: dict) -> dict:
+        return convert_item_to_python({k: deserializer.deserialize(v) for k, v in raw.items()})
+
+    print(f"{'products':>8} {'resource µs':>12} {'client µs':>10} {'speedup':>8}")
+    for count in PRODUCT_COUNTS:
+        raw = {k: serializer.serialize(v) for k, v in make_order(count).items()}
+        assert resource_path(raw) == decode_item(raw)
+
+        old = min(timeit.repeat(lambda: resource_path(raw), number=args.repeat, repeat=3)) / args.repeat
+        new = min(timeit.repeat(lambda: decode_item(raw), number=args.repeat, repeat=3)) / args.repeat
+        print(f"{count:>8} {old * 1e6:>12.1f} {new * 1e6:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
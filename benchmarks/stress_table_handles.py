@@ -0,0 +1,66 @@
+"""
+Concurrency stress test for the per-thread DynamoDB table handles.
+
+Hammers one counter item in the Counters table from many threads at once
+through the shared `counters_table` handle, then checks that
+  * no call failed,
+  * every increment landed (final value == threads * calls), and
+  * every thread used its own boto3 resource.
+Point AWS_ENDPOINT_URL_DYNAMODB at DynamoDB Local to run it off AWS.
+
+    python -m benchmarks.stress_table_handles --threads 64 --calls 50
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db.dynamodb import counters_table, get_resource
+
+COUNTER_NAME = "stress#table-handles"
+
+
+def worker(calls: int, barrier: threading.Barrier) -> int:
+    barrier.wait()
+    for _ in range(calls):
+        counters_table.update_item(
+            Key={"CounterName": COUNTER_NAME},
+            UpdateExpression="ADD CounterValue :inc",
+            ExpressionAttributeValues={":inc": 1},
+        )
+        counters_table.get_item(Key={"CounterName": COUNTER_NAME})
+    return id(get_resource())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    counters_table.delete_item(Key={"CounterName": COUNTER_NAME})
+    barrier = threading.Barrier(args.threads)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        futures = [pool.submit(worker, args.calls, barrier) for _ in range(args.threads)]
+        resources = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    item = counters_table.get_item(Key={"CounterName": COUNTER_NAME}, ConsistentRead=True)["Item"]
+    expected = args.threads * args.calls
+    actual = int(item["CounterValue"])
+    counters_table.delete_item(Key={"CounterName": COUNTER_NAME})
+
+    calls = expected * 2
+    print(f"{calls} calls from {args.threads} threads in {elapsed:.2f}s ({calls / elapsed:.0f} calls/s)")
+    print(f"distinct resources: {len(set(resources))} (expected {args.threads})")
+    print(f"counter: {actual} (expected {expected})")
+    if actual != expected or len(set(resources)) != args.threads:
+        raise SystemExit("FAILED")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
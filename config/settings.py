@@ -24,6 +24,89 @@ PARTY_TABLE = os.getenv("PARTY_TABLE", "Party")
 PRODUCTS_TABLE = os.getenv("PRODUCTS_TABLE", "Product")
 ORDERS_TABLE = os.getenv("ORDERS_TABLE", "Order")
 
+ROLL_SIZES_TABLE = os.getenv("ROLL_SIZES_TABLE", "Roll_Size_Table")
+
+# DynamoDB client tuning (db/dynamodb.py).
+# Each thread has its own resource and makes one call at a time, so a small
+# per-thread pool is enough; total connections scale with the thread count.
+DDB_MAX_POOL_CONNECTIONS = int(os.getenv("DDB_MAX_POOL_CONNECTIONS", "2"))
+DDB_CONNECT_TIMEOUT = float(os.getenv("DDB_CONNECT_TIMEOUT", "2"))
+DDB_READ_TIMEOUT = float(os.getenv("DDB_READ_TIMEOUT", "10"))
+DDB_MAX_RETRIES = int(os.getenv("DDB_MAX_RETRIES", "5"))
+
+# Data backend behind the repositories (db/repositories.py):
+#   "dynamodb" (default), "memory" (per-process, nothing persisted) or
+#   "sqlite" (single file at SQLITE_PATH) for offline profiling and local demos
+DATA_BACKEND = os.getenv("DATA_BACKEND", "dynamodb").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "local_data.db")
+
+# Worker threads behind the awaitable DynamoDB layer (db/aio.py): the number of
+# DynamoDB calls async handlers can keep in flight per process
+DDB_ASYNC_MAX_WORKERS = int(os.getenv("DDB_ASYNC_MAX_WORKERS", "128"))
+
+# Atomic sequence counters (partition key: CounterName [S], value: CounterValue [N])
+COUNTERS_TABLE = os.getenv("COUNTERS_TABLE", "Counters")
+
+# Party uniqueness guards (partition key: UniqueKey [S] = "mobile#<digits>" or
+# "email#<address>", value: PartyId [N]), written in one transaction with the party.
+# Create and backfill: migrations/backfill_party_unique_keys.py
+PARTY_UNIQUE_TABLE = os.getenv("PARTY_UNIQUE_TABLE", "PartyUnique")
+
+# Number of counter items a day's OrderId sequence is spread over.
+# Raise above 1 only for very hot days; sharded sequences stay unique but are not contiguous.
+ORDER_ID_COUNTER_SHARDS = int(os.getenv("ORDER_ID_COUNTER_SHARDS", "1"))
+
+# How many agent/party/product/size ids a warm container reserves per counter update
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "10"))
+
+# Parallel scans: segments per full-table scan, and the process-wide cap on scan workers
+SCAN_TOTAL_SEGMENTS = int(os.getenv("SCAN_TOTAL_SEGMENTS", "4"))
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", "8"))
+
+# Sparse GSI (partition key: Active [S] = the row's own key, projection ALL) on the Order,
+# Party and Agent tables holding only rows that are not soft-deleted. One key value per
+# row keeps index writes and parallel-scan segments spread out. Backfill: migrations/backfill_active_index.py
+ACTIVE_INDEX_NAME = os.getenv("ACTIVE_INDEX_NAME", "ActiveIndex")
+
+# GSI on the Order table (partition key: AgentId [S], sort key: OrderStartDate [S],
+# projection ALL) behind GET /api/agents/{id}/orders. Create: migrations/add_agent_orders_index.py
+AGENT_ORDERS_INDEX_NAME = os.getenv("AGENT_ORDERS_INDEX_NAME", "AgentOrdersIndex")
+
+# Sparse GSI on the Order table (partition key: OpenStatus [S], sort key: OrderId [N],
+# projection ALL) holding only live orders that are not Delivered.
+# Backfill: migrations/backfill_open_orders_index.py
+OPEN_ORDERS_INDEX_NAME = os.getenv("OPEN_ORDERS_INDEX_NAME", "OpenOrdersIndex")
+
+# Sparse GSI on the Order table (partition key: OrderMonth [S] = "YYYY-MM" of the
+# start date, sort key: OrderStartDate [S], projection ALL) for date-range listings.
+# Backfill: migrations/backfill_order_month_index.py
+ORDER_MONTH_INDEX_NAME = os.getenv("ORDER_MONTH_INDEX_NAME", "OrderMonthIndex")
+
+# Sparse GSI on the Party table (partition key: PartyNameKey [S] = normalized PartyName,
+# sort key: PartyId [N], projection ALL) behind GET /api/party/by-name/{name}.
+# Backfill: migrations/backfill_party_name_index.py
+PARTY_NAME_INDEX_NAME = os.getenv("PARTY_NAME_INDEX_NAME", "PartyNameIndex")
+
+# GSI on the Party table (partition key: AgentId [N], sort key: PartyId [N],
+# projection ALL) behind GET /api/agents/{id}/parties. Create: migrations/add_agent_parties_index.py
+AGENT_PARTIES_INDEX_NAME = os.getenv("AGENT_PARTIES_INDEX_NAME", "AgentPartiesIndex")
+
+# Party typeahead and fuzzy search (GET /api/party/suggest, /api/party/search): each
+# process keeps in-memory indexes built from one scan and updated by its own writes;
+# they are rebuilt after this many seconds so parties written by other processes show up too
+PARTY_INDEX_TTL = int(os.getenv("PARTY_INDEX_TTL", "300"))
+
+# Seconds a process serves its cached GET /api/party/lightweight body; its own party
+# writes invalidate it at once, this bounds how stale other processes' writes can leave it
+PARTY_DIRECTORY_TTL = int(os.getenv("PARTY_DIRECTORY_TTL", "60"))
+
+# How many months GET /api/orders/recent walks back through OrderMonthIndex at most
+RECENT_ORDERS_MAX_MONTHS = int(os.getenv("RECENT_ORDERS_MAX_MONTHS", "24"))
+
+# Cursor pagination: page size when only ?cursor= is given, and the largest ?limit= accepted
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
 # App Configuration
 APP_NAME = "Orders Management API"
 APP_VERSION = "1.0.0"
@@ -0,0 +1,20 @@
+"""Awaitable data access for async route handlers."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config.settings import DDB_ASYNC_MAX_WORKERS
+
+# Dedicated I/O pool for blocking data-access calls made from async handlers
+# (every Repository method runs here). It is sized independently of FastAPI's
+# threadpool, so one event loop can keep up to DDB_ASYNC_MAX_WORKERS requests
+# in flight; each pool thread gets its own boto3 resource (db/dynamodb.py).
+_executor = ThreadPoolExecutor(max_workers=DDB_ASYNC_MAX_WORKERS, thread_name_prefix="ddb-io")
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking DynamoDB code `fn(*args, **kwargs)` on the I/O pool and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
@@ -0,0 +1,263 @@
+"""Repository backend on DynamoDB (low-level client, one table per repository)."""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from botocore.exceptions import ClientError
+
+from db.dynamodb import ClientTable, transact_write_items
+from db.repository import (
+    EXISTS,
+    LIVE,
+    NOT_EXISTS,
+    PRESENT,
+    ConditionFailed,
+    Item,
+    Page,
+    Path,
+    Put,
+    Repository,
+    TransactionCanceled,
+    path_parts,
+)
+from db.scan import iter_scan, scan_all, scan_page
+from utils.dynamodb_utils import decode_cursor, decode_item, encode_cursor
+
+
+class _Expression:
+    """Collects #name / :value placeholders while an expression is being built."""
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+
+    def name(self, attribute: str) -> str:
+        for placeholder, existing in self.names.items():
+            if existing == attribute:
+                return placeholder
+        placeholder = f"#n{len(self.names)}"
+        self.names[placeholder] = attribute
+        return placeholder
+
+    def value(self, value: Any) -> str:
+        placeholder = f":v{len(self.values)}"
+        self.values[placeholder] = value
+        return placeholder
+
+    def path(self, path: Path) -> str:
+        expression = ""
+        for part in path_parts(path):
+            if isinstance(part, int):
+                expression += f"[{part}]"
+            else:
+                expression += ("." if expression else "") + self.name(part)
+        return expression
+
+    def kwargs(self, **expressions) -> Dict[str, Any]:
+        out = {k: v for k, v in expressions.items() if v}
+        if self.names:
+            out["ExpressionAttributeNames"] = self.names
+        if self.values:
+            out["ExpressionAttributeValues"] = self.values
+        return out
+
+
+class DynamoDBRepository(Repository):
+    def __init__(self, name: str, key: str, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        super().__init__(name, key, indexes)
+        self.table = ClientTable(name)
+
+    # ── Expression helpers ────────────────────────────────────────
+    def _condition(self, condition: Optional[str], expr: _Expression) -> Optional[str]:
+        if condition is None:
+            return None
+        key = expr.name(self.key)
+        if condition == EXISTS:
+            return f"attribute_exists({key})"
+        if condition == NOT_EXISTS:
+            return f"attribute_not_exists({key})"
+        if condition == LIVE:
+            deleted = expr.name("deleted")
+            return (
+                f"attribute_exists({key}) AND "
+                f"(attribute_not_exists({deleted}) OR {deleted} <> {expr.value(True)})"
+            )
+        raise ValueError(f"Unknown condition: {condition}")
+
+    @staticmethod
+    def _expectations(expect: Dict[Path, Any], expr: _Expression) -> List[str]:
+        clauses = []
+        for path, value in expect.items():
+            if value is None:
+                target = expr.path(path)
+                clauses.append(f"attribute_not_exists({target}) OR attribute_type({target}, {expr.value('NULL')})")
+            elif value is PRESENT:
+                clauses.append(f"attribute_exists({expr.path(path)})")
+            else:
+                clauses.append(f"{expr.path(path)} = {expr.value(value)}")
+        return clauses
+
+    @staticmethod
+    def _projection(attributes: Optional[Sequence[str]], expr: _Expression) -> Optional[str]:
+        if not attributes:
+            return None
+        return ", ".join(expr.name(a) for a in attributes)
+
+    @staticmethod
+    def _write(call: Callable[..., Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        try:
+            return call(**kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ConditionFailed(str(e)) from e
+            raise
+
+    # ── Repository ────────────────────────────────────────────────
+    def _get(self, key: Any, attributes: Optional[Sequence[str]]) -> Optional[Item]:
+        expr = _Expression()
+        kwargs = expr.kwargs(ProjectionExpression=self._projection(attributes, expr))
+        return self.table.get_item(Key={self.key: key}, **kwargs).get("Item")
+
+    def _put(self, item: Item, condition: Optional[str]) -> None:
+        expr = _Expression()
+        kwargs = expr.kwargs(ConditionExpression=self._condition(condition, expr))
+        self._write(self.table.put_item, Item=item, **kwargs)
+
+    def _update(
+        self,
+        key: Any,
+        updates: Dict[Path, Any],
+        remove: List[Path],
+        condition: Optional[str],
+        expect: Dict[Path, Any],
+    ) -> Item:
+        if not updates and not remove:
+            raise ValueError("update() needs at least one path to set or remove")
+        expr = _Expression()
+        clauses = []
+        if updates:
+            clauses.append("SET " + ", ".join(f"{expr.path(p)} = {expr.value(v)}" for p, v in updates.items()))
+        if remove:
+            clauses.append("REMOVE " + ", ".join(expr.path(p) for p in remove))
+        kwargs = expr.kwargs(
+            UpdateExpression=" ".join(clauses),
+            ConditionExpression=self._conditions(condition, expect, expr),
+        )
+        response = self._write(self.table.update_item, Key={self.key: key}, ReturnValues="ALL_NEW", **kwargs)
+        return response["Attributes"]
+
+    def _conditions(self, condition: Optional[str], expect: Dict[Path, Any], expr: _Expression) -> Optional[str]:
+        conditions = self._expectations(expect, expr)
+        if condition is not None:
+            conditions.insert(0, self._condition(condition, expr))
+        return " AND ".join(f"({c})" for c in conditions)
+
+    def _delete(self, key: Any, condition: Optional[str], expect: Dict[Path, Any]) -> None:
+        expr = _Expression()
+        kwargs = expr.kwargs(ConditionExpression=self._conditions(condition, expect, expr))
+        self._write(self.table.delete_item, Key={self.key: key}, **kwargs)
+
+    def _increment(self, key: Any, attribute: str, amount: int, condition: Optional[str]) -> int:
+        expr = _Expression()
+        kwargs = expr.kwargs(
+            UpdateExpression=f"ADD {expr.name(attribute)} {expr.value(amount)}",
+            ConditionExpression=self._condition(condition, expr),
+        )
+        response = self._write(self.table.update_item, Key={self.key: key}, ReturnValues="UPDATED_NEW", **kwargs)
+        return int(response["Attributes"][attribute])
+
+    def _start_key(self, cursor: Optional[str], index: Optional[str]) -> Optional[Item]:
+        """The ExclusiveStartKey of `cursor`, which must hold exactly the key attributes of `index` (or the table)."""
+        if not cursor:
+            return None
+        keys = {self.key}
+        if index:
+            keys.update(a for a in self.indexes[index] if a)
+        return decode_cursor(cursor, keys)
+
+    def _scan_kwargs(self, index: Optional[str], attributes: Optional[Sequence[str]]) -> Dict[str, Any]:
+        expr = _Expression()
+        kwargs = expr.kwargs(ProjectionExpression=self._projection(attributes, expr))
+        if index:
+            kwargs["IndexName"] = index
+        return kwargs
+
+    def _scan(self, index: Optional[str], attributes: Optional[Sequence[str]]) -> List[Item]:
+        return scan_all(self.table, **self._scan_kwargs(index, attributes))
+
+    def _scan_page(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        index: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page:
+        start_key = self._start_key(cursor, index)
+        items, last_key = scan_page(
+            self.table, limit, exclusive_start_key=start_key, keep=keep, **self._scan_kwargs(index, attributes)
+        )
+        return items, encode_cursor(last_key)
+
+    def _find(self, match: Callable[[Item], bool], index: Optional[str]) -> Optional[Item]:
+        return next((item for item in iter_scan(self.table, **self._scan_kwargs(index, None)) if match(item)), None)
+
+    def _query(
+        self,
+        index: str,
+        partition: Any,
+        sort_from: Any,
+        sort_to: Any,
+        descending: bool,
+        limit: Optional[int],
+        cursor: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page:
+        partition_attribute, sort_attribute = self.indexes[index]
+        expr = _Expression()
+        key_condition = f"{expr.name(partition_attribute)} = {expr.value(partition)}"
+        if sort_attribute and (sort_from is not None or sort_to is not None):
+            sort = expr.name(sort_attribute)
+            if sort_from is not None and sort_to is not None:
+                key_condition += f" AND {sort} BETWEEN {expr.value(sort_from)} AND {expr.value(sort_to)}"
+            elif sort_from is not None:
+                key_condition += f" AND {sort} >= {expr.value(sort_from)}"
+            else:
+                key_condition += f" AND {sort} <= {expr.value(sort_to)}"
+        kwargs = expr.kwargs(
+            KeyConditionExpression=key_condition,
+            ProjectionExpression=self._projection(attributes, expr),
+        )
+        kwargs.update(IndexName=index, ScanIndexForward=not descending)
+        if cursor:
+            kwargs["ExclusiveStartKey"] = self._start_key(cursor, index)
+
+        items: List[Item] = []
+        while limit is None or len(items) < limit:
+            if limit is not None:
+                kwargs["Limit"] = limit - len(items)
+            response = self.table.query(**kwargs)
+            items.extend(item for item in response.get("Items", []) if keep is None or keep(item))
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return items, None
+            kwargs["ExclusiveStartKey"] = last_key
+        return items, encode_cursor(kwargs.get("ExclusiveStartKey"))
+
+    def _transact(self, puts: List[Put]) -> None:
+        transact_items = []
+        for put in puts:
+            expr = _Expression()
+            kwargs = expr.kwargs(ConditionExpression=put.repository._conditions(put.condition, put.expect or {}, expr))
+            if "ConditionExpression" in kwargs:
+                kwargs["ReturnValuesOnConditionCheckFailure"] = "ALL_OLD"
+            transact_items.append({"Put": dict(kwargs, TableName=put.repository.name, Item=put.item)})
+        try:
+            transact_write_items(transact_items)
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons") or []
+            failed = [i for i, reason in enumerate(reasons) if reason.get("Code") == "ConditionalCheckFailed"]
+            if e.response["Error"]["Code"] == "TransactionCanceledException" and failed:
+                stored = {i: decode_item(reasons[i]["Item"]) if reasons[i].get("Item") else None for i in failed}
+                raise TransactionCanceled(str(e), failed, stored) from e
+            raise
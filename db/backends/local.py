@@ -0,0 +1,312 @@
+"""Shared logic for repository backends that keep whole items locally (memory, SQLite)."""
+
+import copy
+import threading
+from abc import abstractmethod
+from contextlib import ExitStack, contextmanager
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from db.repository import (
+    EXISTS,
+    LIVE,
+    NOT_EXISTS,
+    PRESENT,
+    ConditionFailed,
+    Item,
+    Page,
+    Path,
+    Put,
+    Repository,
+    TransactionCanceled,
+    path_parts,
+)
+from utils.dynamodb_utils import decode_cursor, decode_number, encode_cursor
+
+# Marks "no partition filter" in _select
+ANY = object()
+# A path that is not present in an item
+MISSING = object()
+
+
+def to_plain(value: Any) -> Any:
+    """Deep copy of `value` with Decimals, sets and tuples turned into JSON-ready types."""
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_plain(v) for v in value]
+    if isinstance(value, Decimal):
+        return decode_number(str(value))
+    return value
+
+
+def project(item: Item, attributes: Optional[Sequence[str]]) -> Item:
+    """Copy of `item` limited to the top-level `attributes` (all when None)."""
+    if not attributes:
+        return copy.deepcopy(item)
+    return {a: copy.deepcopy(item[a]) for a in attributes if a in item}
+
+
+def _cursor_value(value: Any) -> Any:
+    return decode_number(str(value)) if isinstance(value, Decimal) else value
+
+
+class LocalRepository(Repository):
+    """
+    Conditions, update paths, ordering and cursors implemented in Python on
+    top of four storage primitives (_load, _store, _remove, _select).
+    Scans are ordered by key; index queries by (sort attribute, key).
+    Writes run inside _transaction(), so read-check-write is atomic.
+    """
+
+    def __init__(self, name: str, key: str, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        super().__init__(name, key, indexes)
+        self.lock = threading.RLock()
+
+    # ── Storage primitives ────────────────────────────────────────
+    @abstractmethod
+    def _load(self, key: Any) -> Optional[Item]:
+        """The stored item (callers may modify the returned dict), or None."""
+
+    @abstractmethod
+    def _store(self, item: Item) -> None:
+        """Insert or replace a JSON-ready item."""
+
+    @abstractmethod
+    def _remove(self, key: Any) -> None:
+        """Delete an item if present."""
+
+    @abstractmethod
+    def _select(
+        self,
+        index: Optional[str] = None,
+        partition: Any = ANY,
+        sort_from: Any = None,
+        sort_to: Any = None,
+    ) -> Iterable[Item]:
+        """Items of the table or of `index`, optionally filtered on the index keys (any order)."""
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        with self.lock:
+            yield
+
+    # ── Helpers ───────────────────────────────────────────────────
+    def _in_index(self, item: Item, index: Optional[str]) -> bool:
+        if index is None:
+            return True
+        partition_attribute, sort_attribute = self.indexes[index]
+        return partition_attribute in item and (sort_attribute is None or sort_attribute in item)
+
+    def _check(self, existing: Optional[Item], condition: Optional[str], key: Any) -> None:
+        if condition is None:
+            return
+        if condition == EXISTS:
+            ok = existing is not None
+        elif condition == NOT_EXISTS:
+            ok = existing is None
+        elif condition == LIVE:
+            ok = existing is not None and existing.get("deleted") is not True
+        else:
+            raise ValueError(f"Unknown condition: {condition}")
+        if not ok:
+            raise ConditionFailed(f"{self.name} {key!r}: condition '{condition}' failed")
+
+    def _check_expect(self, existing: Optional[Item], expect: Dict[Path, Any], key: Any) -> None:
+        for path, value in expect.items():
+            actual = self._get_path(existing, path) if existing is not None else MISSING
+            if value is PRESENT:
+                ok = actual is not MISSING
+            elif value is None:
+                ok = actual in (MISSING, None)
+            else:
+                ok = actual == to_plain(value)
+            if not ok:
+                raise ConditionFailed(f"{self.name} {key!r}: expected {path!r} = {value!r}")
+
+    @staticmethod
+    def _get_path(item: Item, path: Path) -> Any:
+        target: Any = item
+        try:
+            for part in path_parts(path):
+                target = target[part]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+        return target
+
+    @staticmethod
+    def _set_path(item: Item, path: Path, value: Any) -> None:
+        parts = path_parts(path)
+        target = item
+        for part in parts[:-1]:
+            target = target[part]
+        if isinstance(parts[-1], int) and parts[-1] >= len(target):
+            target.append(value)
+        else:
+            target[parts[-1]] = value
+
+    @staticmethod
+    def _remove_path(item: Item, path: Path) -> None:
+        parts = path_parts(path)
+        target = item
+        try:
+            for part in parts[:-1]:
+                target = target[part]
+            if isinstance(parts[-1], int):
+                del target[parts[-1]]
+            else:
+                target.pop(parts[-1], None)
+        except (KeyError, IndexError, TypeError):
+            pass
+
+    def _order_key(self, index: Optional[str]) -> Callable[[Item], Tuple]:
+        if index is None:
+            return lambda item: (item[self.key],)
+        sort_attribute = self.indexes[index][1]
+        if sort_attribute is None:
+            return lambda item: (item[self.key],)
+        return lambda item: (item[sort_attribute], item[self.key])
+
+    def _cursor_fields(self, index: Optional[str]) -> List[str]:
+        sort_attribute = self.indexes[index][1] if index else None
+        return [sort_attribute, self.key] if sort_attribute else [self.key]
+
+    def _paginate(
+        self,
+        items: List[Item],
+        index: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[str],
+        descending: bool,
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]] = None,
+    ) -> Page:
+        order_key = self._order_key(index)
+        items.sort(key=order_key, reverse=descending)
+        fields = self._cursor_fields(index)
+        if cursor:
+            start = decode_cursor(cursor, fields)
+            after = tuple(_cursor_value(start[f]) for f in fields)
+            if descending:
+                items = [i for i in items if order_key(i) < after]
+            else:
+                items = [i for i in items if order_key(i) > after]
+
+        page: List[Item] = []
+        for position, item in enumerate(items):
+            if limit is not None and len(page) >= limit:
+                last = items[position - 1]
+                return page, encode_cursor({f: last[f] for f in fields})
+            if keep is None or keep(item):
+                page.append(project(item, attributes))
+        return page, None
+
+    # ── Repository ────────────────────────────────────────────────
+    def _get(self, key: Any, attributes: Optional[Sequence[str]]) -> Optional[Item]:
+        item = self._load(key)
+        return project(item, attributes) if item is not None else None
+
+    def _put(self, item: Item, condition: Optional[str]) -> None:
+        item = to_plain(item)
+        with self._transaction():
+            self._check(self._load(item[self.key]), condition, item[self.key])
+            self._store(item)
+
+    def _update(
+        self,
+        key: Any,
+        updates: Dict[Path, Any],
+        remove: List[Path],
+        condition: Optional[str],
+        expect: Dict[Path, Any],
+    ) -> Item:
+        if not updates and not remove:
+            raise ValueError("update() needs at least one path to set or remove")
+        with self._transaction():
+            existing = self._load(key)
+            self._check(existing, condition, key)
+            self._check_expect(existing, expect, key)
+            # Work on a copy so a bad path leaves the stored item untouched
+            item = copy.deepcopy(existing) if existing is not None else {self.key: key}
+            for path, value in updates.items():
+                self._set_path(item, path, to_plain(value))
+            for path in remove:
+                self._remove_path(item, path)
+            self._store(item)
+            return project(item, None)
+
+    def _delete(self, key: Any, condition: Optional[str], expect: Dict[Path, Any]) -> None:
+        with self._transaction():
+            existing = self._load(key)
+            self._check(existing, condition, key)
+            self._check_expect(existing, expect, key)
+            self._remove(key)
+
+    def _increment(self, key: Any, attribute: str, amount: int, condition: Optional[str]) -> int:
+        with self._transaction():
+            existing = self._load(key)
+            self._check(existing, condition, key)
+            item = existing if existing is not None else {self.key: key}
+            item[attribute] = item.get(attribute, 0) + amount
+            self._store(item)
+            return int(item[attribute])
+
+    def _scan(self, index: Optional[str], attributes: Optional[Sequence[str]]) -> List[Item]:
+        return [project(item, attributes) for item in self._select(index)]
+
+    def _scan_page(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        index: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page:
+        # Scans page by table key, like a single DynamoDB scan segment
+        items = list(self._select(index))
+        return self._paginate(items, None, limit, cursor, False, attributes, keep)
+
+    def _find(self, match: Callable[[Item], bool], index: Optional[str]) -> Optional[Item]:
+        return next((copy.deepcopy(item) for item in self._select(index) if match(item)), None)
+
+    def _query(
+        self,
+        index: str,
+        partition: Any,
+        sort_from: Any,
+        sort_to: Any,
+        descending: bool,
+        limit: Optional[int],
+        cursor: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page:
+        items = list(self._select(index, partition, sort_from, sort_to))
+        return self._paginate(items, index, limit, cursor, descending, attributes, keep)
+
+    def _transact(self, puts: List[Put]) -> None:
+        repositories = {id(put.repository): put.repository for put in puts}.values()
+        if any(type(repository) is not type(self) for repository in repositories):
+            raise ValueError("transact() writes must all use the same backend")
+        items = [to_plain(put.item) for put in puts]
+        with ExitStack() as stack:
+            # Every table involved is locked (in name order, so concurrent calls cannot deadlock)
+            for repository in sorted(repositories, key=lambda r: r.name):
+                stack.enter_context(repository.lock)
+            stack.enter_context(self._transaction())
+            failed, stored = [], {}
+            for position, (put, item) in enumerate(zip(puts, items)):
+                key = item[put.repository.key]
+                existing = put.repository._load(key)
+                try:
+                    put.repository._check(existing, put.condition, key)
+                    put.repository._check_expect(existing, put.expect or {}, key)
+                except ConditionFailed:
+                    failed.append(position)
+                    stored[position] = project(existing, None) if existing is not None else None
+            if failed:
+                raise TransactionCanceled(
+                    f"transaction canceled: condition failed for write(s) {failed}", failed, stored
+                )
+            for put, item in zip(puts, items):
+                put.repository._store(item)
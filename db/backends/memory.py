@@ -0,0 +1,46 @@
+"""In-memory repository backend: per-process dicts, nothing persisted. For offline profiling and tests."""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from db.backends.local import ANY, LocalRepository
+from db.repository import Item
+
+
+class MemoryRepository(LocalRepository):
+    def __init__(self, name: str, key: str, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        super().__init__(name, key, indexes)
+        self.items: Dict[Any, Item] = {}
+
+    def _load(self, key: Any) -> Optional[Item]:
+        return self.items.get(key)
+
+    def _store(self, item: Item) -> None:
+        self.items[item[self.key]] = item
+
+    def _remove(self, key: Any) -> None:
+        self.items.pop(key, None)
+
+    def _select(
+        self,
+        index: Optional[str] = None,
+        partition: Any = ANY,
+        sort_from: Any = None,
+        sort_to: Any = None,
+    ) -> Iterable[Item]:
+        with self.lock:
+            items = list(self.items.values())
+        if index is None:
+            return items
+        partition_attribute, sort_attribute = self.indexes[index]
+        selected = []
+        for item in items:
+            if not self._in_index(item, index):
+                continue
+            if partition is not ANY and item[partition_attribute] != partition:
+                continue
+            if sort_attribute and sort_from is not None and item[sort_attribute] < sort_from:
+                continue
+            if sort_attribute and sort_to is not None and item[sort_attribute] > sort_to:
+                continue
+            selected.append(item)
+        return selected
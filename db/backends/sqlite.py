@@ -0,0 +1,111 @@
+"""
+SQLite repository backend: one table per repository in a single database file
+(SQLITE_PATH), each row holding the item as a JSON document. Secondary indexes
+become expression indexes over json_extract(). For local demos and offline
+profiling; not meant for production traffic.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import SQLITE_PATH
+from db.backends.local import ANY, LocalRepository
+from db.repository import Item
+
+# One connection per process, shared by every repository (guarded by _lock)
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.RLock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    with _lock:
+        if _connection is None:
+            _connection = sqlite3.connect(SQLITE_PATH, check_same_thread=False, isolation_level=None)
+            _connection.execute("PRAGMA journal_mode=WAL")
+        return _connection
+
+
+def _json_path(attribute: str) -> str:
+    return '$."' + attribute.replace('"', '""') + '"'
+
+
+class SQLiteRepository(LocalRepository):
+    def __init__(self, name: str, key: str, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        super().__init__(name, key, indexes)
+        self.lock = _lock
+        self.table = '"' + name.replace('"', '""') + '"'
+        with _lock:
+            db = _connect()
+            db.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (pk PRIMARY KEY, item TEXT NOT NULL)")
+            for index, (partition_attribute, sort_attribute) in self.indexes.items():
+                columns = [f"json_extract(item, '{_json_path(partition_attribute)}')"]
+                if sort_attribute:
+                    columns.append(f"json_extract(item, '{_json_path(sort_attribute)}')")
+                index_name = '"' + f"{name}.{index}".replace('"', '""') + '"'
+                db.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} ({', '.join(columns)})")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE also serializes writers in other processes (uvicorn workers)
+        with _lock:
+            db = _connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _load(self, key: Any) -> Optional[Item]:
+        with _lock:
+            row = _connect().execute(f"SELECT item FROM {self.table} WHERE pk = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _store(self, item: Item) -> None:
+        with _lock:
+            _connect().execute(
+                f"INSERT OR REPLACE INTO {self.table} (pk, item) VALUES (?, ?)",
+                (item[self.key], json.dumps(item, separators=(",", ":"))),
+            )
+
+    def _remove(self, key: Any) -> None:
+        with _lock:
+            _connect().execute(f"DELETE FROM {self.table} WHERE pk = ?", (key,))
+
+    def _select(
+        self,
+        index: Optional[str] = None,
+        partition: Any = ANY,
+        sort_from: Any = None,
+        sort_to: Any = None,
+    ) -> Iterable[Item]:
+        where: List[str] = []
+        params: List[Any] = []
+        if index is not None:
+            partition_attribute, sort_attribute = self.indexes[index]
+            partition_column = f"json_extract(item, '{_json_path(partition_attribute)}')"
+            if partition is ANY:
+                where.append(f"{partition_column} IS NOT NULL")
+            else:
+                where.append(f"{partition_column} = ?")
+                params.append(partition)
+            if sort_attribute:
+                sort_column = f"json_extract(item, '{_json_path(sort_attribute)}')"
+                where.append(f"{sort_column} IS NOT NULL")
+                if sort_from is not None:
+                    where.append(f"{sort_column} >= ?")
+                    params.append(sort_from)
+                if sort_to is not None:
+                    where.append(f"{sort_column} <= ?")
+                    params.append(sort_to)
+        sql = f"SELECT item FROM {self.table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with _lock:
+            rows = _connect().execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
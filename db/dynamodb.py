@@ -1,4 +1,10 @@
+import threading
+from typing import Any, Dict, List
+
 import boto3
+import botocore.session
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
 from config.settings import (
     AWS_REGION,
     ACCOUNTS_TABLE,
@@ -6,16 +12,181 @@ from config.settings import (
     PARTY_TABLE,
     PRODUCTS_TABLE,
     ORDERS_TABLE,
+    COUNTERS_TABLE,
+    PARTY_UNIQUE_TABLE,
+    DDB_MAX_POOL_CONNECTIONS,
+    DDB_CONNECT_TIMEOUT,
+    DDB_READ_TIMEOUT,
+    DDB_MAX_RETRIES,
+)
+from utils.dynamodb_utils import decode_item
+
+# One tuned botocore config for every DynamoDB resource in the process.
+BOTO_CONFIG = Config(
+    region_name=AWS_REGION,
+    max_pool_connections=DDB_MAX_POOL_CONNECTIONS,
+    connect_timeout=DDB_CONNECT_TIMEOUT,
+    read_timeout=DDB_READ_TIMEOUT,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": DDB_MAX_RETRIES},
 )
 
-# Let boto3 auto-discover credentials from the environment.
-# Locally: reads AWS_ACCESS_KEY_ID + AWS_SECRET_ACCESS_KEY from .env via os.environ.
-# Lambda: reads execution-role credentials including AWS_SESSION_TOKEN automatically.
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
+# boto3 sessions and resources are not thread-safe, and every route handler runs
+# on FastAPI's threadpool (scans add their own worker threads). Each thread
+# therefore gets its own session + resource + client, created on first use and reused
+# for the life of the thread. All sessions share one botocore data loader, so
+# the DynamoDB service model is parsed once per process, not once per thread.
+_local = threading.local()
+_data_loader = botocore.session.get_session().get_component("data_loader")
+
+
+def get_resource():
+    """Return the calling thread's DynamoDB resource."""
+    resource = getattr(_local, "resource", None)
+    if resource is None:
+        # Let boto3 auto-discover credentials from the environment.
+        # Locally: reads AWS_ACCESS_KEY_ID + AWS_SECRET_ACCESS_KEY from .env via os.environ.
+        # Lambda: reads execution-role credentials including AWS_SESSION_TOKEN automatically.
+        core_session = botocore.session.get_session()
+        core_session.register_component("data_loader", _data_loader)
+        session = boto3.session.Session(botocore_session=core_session)
+        resource = session.resource("dynamodb", config=BOTO_CONFIG)
+        _local.resource = resource
+        _local.tables = {}
+        # A separate plain client: resource.meta.client has the resource
+        # layer's (de)serialization hooks registered on it.
+        _local.client = session.client("dynamodb", config=BOTO_CONFIG)
+    return resource
+
+
+def get_client():
+    """Return the calling thread's low-level DynamoDB client."""
+    get_resource()
+    return _local.client
+
+
+def _thread_table(name: str):
+    """Return the calling thread's Table object for `name`."""
+    resource = get_resource()
+    table = _local.tables.get(name)
+    if table is None:
+        table = _local.tables[name] = resource.Table(name)
+    return table
+
+
+class TableHandle:
+    """
+    Thread-safe stand-in for a boto3 Table.
+    Attribute access resolves to the calling thread's own Table object, so one
+    handle can be shared by every router and passed to scan worker threads.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(_thread_table(self.name), attr)
+
+    def __repr__(self) -> str:
+        return f"TableHandle({self.name!r})"
+
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _serialize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of request parameters with the item, key and expression values in wire format."""
+    params = dict(params)
+    for key in ("Item", "Key", "ExclusiveStartKey", "ExpressionAttributeValues"):
+        if key in params:
+            params[key] = {k: _serializer.serialize(v) for k, v in params[key].items()}
+    return params
+
+
+def transact_write_items(transact_items: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    TransactWriteItems on the calling thread's client. Each entry is
+    {"Put" | "Update" | "Delete" | "ConditionCheck": parameters}, with the
+    parameters given as for ClientTable (plain values, TableName included).
+    """
+    items = [{operation: _serialize_params(params) for operation, params in entry.items()} for entry in transact_items]
+    return get_client().transact_write_items(TransactItems=items)
+
+
+class ClientTable:
+    """
+    A table on the low-level client.
+    Methods take the same arguments as on a boto3 Table (string expressions
+    only), but items come back already decoded to JSON-ready types by
+    decode_item instead of as Decimals, so the resource layer's
+    TypeDeserializer pass is skipped. LastEvaluatedKey keeps the resource
+    format, so cursors work unchanged.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _call(self, operation: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        params = _serialize_params(dict(kwargs, TableName=self.name))
+        response = getattr(get_client(), operation)(**params)
+        if "Item" in response:
+            response["Item"] = decode_item(response["Item"])
+        if "Items" in response:
+            response["Items"] = [decode_item(item) for item in response["Items"]]
+        if "Attributes" in response:
+            response["Attributes"] = decode_item(response["Attributes"])
+        if "LastEvaluatedKey" in response:
+            response["LastEvaluatedKey"] = {
+                k: _deserializer.deserialize(v) for k, v in response["LastEvaluatedKey"].items()
+            }
+        return response
+
+    def get_item(self, **kwargs) -> Dict[str, Any]:
+        return self._call("get_item", kwargs)
+
+    def query(self, **kwargs) -> Dict[str, Any]:
+        return self._call("query", kwargs)
+
+    def scan(self, **kwargs) -> Dict[str, Any]:
+        return self._call("scan", kwargs)
+
+    def put_item(self, **kwargs) -> Dict[str, Any]:
+        return self._call("put_item", kwargs)
+
+    def update_item(self, **kwargs) -> Dict[str, Any]:
+        return self._call("update_item", kwargs)
+
+    def delete_item(self, **kwargs) -> Dict[str, Any]:
+        return self._call("delete_item", kwargs)
+
+    def __repr__(self) -> str:
+        return f"ClientTable({self.name!r})"
+
+
+# Table registry: every router gets its table handles from here
+_tables: Dict[str, TableHandle] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(name: str) -> TableHandle:
+    """Return the shared handle for table `name`, creating it on first use."""
+    table = _tables.get(name)
+    if table is None:
+        with _tables_lock:
+            table = _tables.setdefault(name, TableHandle(name))
+    return table
+
 
 # Get table references
-accounts_table = dynamodb.Table(ACCOUNTS_TABLE)
-agents_table = dynamodb.Table(AGENTS_TABLE)
-party_table = dynamodb.Table(PARTY_TABLE)
-products_table = dynamodb.Table(PRODUCTS_TABLE)
-orders_table = dynamodb.Table(ORDERS_TABLE)
\ No newline at end of file
+accounts_table = get_table(ACCOUNTS_TABLE)
+agents_table = get_table(AGENTS_TABLE)
+party_table = get_table(PARTY_TABLE)
+products_table = get_table(PRODUCTS_TABLE)
+orders_table = get_table(ORDERS_TABLE)
+counters_table = get_table(COUNTERS_TABLE)
+party_unique_table = get_table(PARTY_UNIQUE_TABLE)
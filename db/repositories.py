@@ -0,0 +1,90 @@
+"""Repository factory: every router and helper gets its data access from here."""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.settings import (
+    ACCOUNTS_TABLE,
+    ACTIVE_INDEX_NAME,
+    AGENT_ORDERS_INDEX_NAME,
+    AGENT_PARTIES_INDEX_NAME,
+    AGENTS_TABLE,
+    COUNTERS_TABLE,
+    DATA_BACKEND,
+    OPEN_ORDERS_INDEX_NAME,
+    ORDER_MONTH_INDEX_NAME,
+    ORDERS_TABLE,
+    PARTY_NAME_INDEX_NAME,
+    PARTY_TABLE,
+    PARTY_UNIQUE_TABLE,
+    PRODUCTS_TABLE,
+)
+from db.repository import Repository
+
+# Partition key of each known table. Size tables (routes/sizes.py, roll sizes)
+# are keyed by "ID", which is the default.
+TABLE_KEYS = {
+    ACCOUNTS_TABLE: "txnId",
+    AGENTS_TABLE: "AgentId",
+    PARTY_TABLE: "PartyId",
+    PRODUCTS_TABLE: "ProductId",
+    ORDERS_TABLE: "OrderId",
+    COUNTERS_TABLE: "CounterName",
+    PARTY_UNIQUE_TABLE: "UniqueKey",
+}
+DEFAULT_KEY = "ID"
+
+# Secondary indexes: table → {index name: (partition attribute, sort attribute)}
+TABLE_INDEXES: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {
+    ORDERS_TABLE: {
+        ACTIVE_INDEX_NAME: ("Active", None),
+        AGENT_ORDERS_INDEX_NAME: ("AgentId", "OrderStartDate"),
+        OPEN_ORDERS_INDEX_NAME: ("OpenStatus", "OrderId"),
+        ORDER_MONTH_INDEX_NAME: ("OrderMonth", "OrderStartDate"),
+    },
+    PARTY_TABLE: {
+        ACTIVE_INDEX_NAME: ("Active", None),
+        PARTY_NAME_INDEX_NAME: ("PartyNameKey", "PartyId"),
+        AGENT_PARTIES_INDEX_NAME: ("AgentId", "PartyId"),
+    },
+    AGENTS_TABLE: {ACTIVE_INDEX_NAME: ("Active", None)},
+}
+
+
+def _backend():
+    if DATA_BACKEND == "dynamodb":
+        from db.backends.dynamodb import DynamoDBRepository
+        return DynamoDBRepository
+    if DATA_BACKEND == "memory":
+        from db.backends.memory import MemoryRepository
+        return MemoryRepository
+    if DATA_BACKEND == "sqlite":
+        from db.backends.sqlite import SQLiteRepository
+        return SQLiteRepository
+    raise ValueError(f"Unknown DATA_BACKEND '{DATA_BACKEND}' (expected dynamodb, memory or sqlite)")
+
+
+_repositories: Dict[str, Repository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(name: str) -> Repository:
+    """Return the shared repository for table `name` on the configured backend."""
+    repository = _repositories.get(name)
+    if repository is None:
+        with _repositories_lock:
+            repository = _repositories.get(name)
+            if repository is None:
+                repository = _backend()(name, TABLE_KEYS.get(name, DEFAULT_KEY), TABLE_INDEXES.get(name))
+                _repositories[name] = repository
+    return repository
+
+
+# Get repository references
+accounts_repo = get_repository(ACCOUNTS_TABLE)
+agents_repo = get_repository(AGENTS_TABLE)
+party_repo = get_repository(PARTY_TABLE)
+products_repo = get_repository(PRODUCTS_TABLE)
+orders_repo = get_repository(ORDERS_TABLE)
+counters_repo = get_repository(COUNTERS_TABLE)
+party_unique_repo = get_repository(PARTY_UNIQUE_TABLE)
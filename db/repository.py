@@ -0,0 +1,222 @@
+"""Backend-neutral data access: one Repository per table."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from db.aio import run_db
+
+# Write conditions
+EXISTS = "exists"          # the item must already exist
+NOT_EXISTS = "not_exists"  # the item must not exist yet
+LIVE = "live"              # the item must exist and not be soft-deleted
+
+# `expect` value for a path that must be present, whatever it holds
+PRESENT = object()
+
+# An attribute path: "TransportName" or ("Products", 2, "ProductStatus")
+Path = Union[str, Tuple[Union[str, int], ...]]
+Item = Dict[str, Any]
+# One page of results and the cursor for the next one (None on the last page)
+Page = Tuple[List[Item], Optional[str]]
+
+
+class ConditionFailed(Exception):
+    """The condition of a write did not hold (e.g. the item does not exist)."""
+
+
+class TransactionCanceled(ConditionFailed):
+    """A condition in transact() did not hold, so none of its writes were applied."""
+
+    def __init__(self, message: str, failed: Sequence[int], items: Optional[Dict[int, Optional[Item]]] = None):
+        super().__init__(message)
+        # Positions (in the transact() list) of the writes whose condition failed
+        self.failed = list(failed)
+        # The item stored at each failed position when the transaction ran (None: no item)
+        self.items = items or {}
+
+
+def path_parts(path: Path) -> Tuple[Union[str, int], ...]:
+    """Normalize a Path to a tuple of attribute names and list indexes."""
+    return (path,) if isinstance(path, str) else tuple(path)
+
+
+class Repository(ABC):
+    """
+    Data access for one table with a single partition key attribute `key`.
+
+    Items are plain dicts. Items read back are JSON-ready (str, int, float,
+    bool, None, list, dict); writes also accept Decimal values.
+    `indexes` maps a secondary index name to (partition attribute, sort
+    attribute or None). Indexes are sparse: items lacking an index key
+    attribute are not in that index.
+
+    The public methods are awaitable. Backends implement the blocking `_`
+    methods, which run on the DynamoDB I/O pool (db.aio.run_db).
+    """
+
+    def __init__(self, name: str, key: str, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        self.name = name
+        self.key = key
+        self.indexes = indexes or {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    # ── Public API ────────────────────────────────────────────────
+    async def get(self, key: Any, attributes: Optional[Sequence[str]] = None) -> Optional[Item]:
+        """The item with key `key` (only `attributes`, if given), or None."""
+        return await run_db(self._get, key, attributes)
+
+    async def put(self, item: Item, condition: Optional[str] = None) -> None:
+        """Write a whole item. Raises ConditionFailed if `condition` does not hold."""
+        await run_db(self._put, item, condition)
+
+    async def update(
+        self,
+        key: Any,
+        updates: Optional[Dict[Path, Any]] = None,
+        remove: Sequence[Path] = (),
+        condition: Optional[str] = None,
+        expect: Optional[Dict[Path, Any]] = None,
+    ) -> Item:
+        """
+        Set the `updates` paths and remove the `remove` paths in one write.
+        `expect` maps paths to the values they must hold when the write
+        happens (None: the path must be absent or null; PRESENT: it must
+        exist), for optimistic read-modify-write.
+        Returns the item as stored after the update.
+        Raises ConditionFailed if `condition` or `expect` does not hold.
+        """
+        return await run_db(self._update, key, updates or {}, list(remove), condition, expect or {})
+
+    async def delete(self, key: Any, condition: Optional[str] = None, expect: Optional[Dict[Path, Any]] = None) -> None:
+        """Delete an item. Raises ConditionFailed if `condition` or `expect` (as in update()) does not hold."""
+        await run_db(self._delete, key, condition, expect or {})
+
+    async def increment(self, key: Any, attribute: str, amount: int = 1, condition: Optional[str] = None) -> int:
+        """Atomically add `amount` to a numeric attribute (missing counts as 0) and return the new value."""
+        return await run_db(self._increment, key, attribute, amount, condition)
+
+    async def scan(self, index: Optional[str] = None, attributes: Optional[Sequence[str]] = None) -> List[Item]:
+        """Every item of the table, or of the sparse `index`."""
+        return await run_db(self._scan, index, attributes)
+
+    async def scan_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        index: Optional[str] = None,
+        attributes: Optional[Sequence[str]] = None,
+        keep: Optional[Callable[[Item], bool]] = None,
+    ) -> Page:
+        """
+        One page of at most `limit` items, starting after `cursor`.
+        Items rejected by `keep` do not count towards the page.
+        Raises ValueError for a malformed cursor.
+        """
+        return await run_db(self._scan_page, limit, cursor, index, attributes, keep)
+
+    async def find(self, match: Callable[[Item], bool], index: Optional[str] = None) -> Optional[Item]:
+        """The first item for which match(item) is true, stopping the scan there."""
+        return await run_db(self._find, match, index)
+
+    async def query(
+        self,
+        index: str,
+        partition: Any,
+        sort_from: Any = None,
+        sort_to: Any = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        attributes: Optional[Sequence[str]] = None,
+        keep: Optional[Callable[[Item], bool]] = None,
+    ) -> Page:
+        """
+        Items of `index` whose partition attribute equals `partition`, ordered
+        by the sort attribute and limited to sort_from <= sort <= sort_to
+        (either bound optional). Without `limit`, every match is returned.
+        Items rejected by `keep` do not count towards the page.
+        Raises ValueError for a malformed cursor.
+        """
+        return await run_db(
+            self._query, index, partition, sort_from, sort_to, descending, limit, cursor, attributes, keep
+        )
+
+    # ── Backend implementation ───────────────────────────────────
+    @abstractmethod
+    def _get(self, key: Any, attributes: Optional[Sequence[str]]) -> Optional[Item]: ...
+
+    @abstractmethod
+    def _put(self, item: Item, condition: Optional[str]) -> None: ...
+
+    @abstractmethod
+    def _update(
+        self,
+        key: Any,
+        updates: Dict[Path, Any],
+        remove: List[Path],
+        condition: Optional[str],
+        expect: Dict[Path, Any],
+    ) -> Item: ...
+
+    @abstractmethod
+    def _delete(self, key: Any, condition: Optional[str], expect: Dict[Path, Any]) -> None: ...
+
+    @abstractmethod
+    def _increment(self, key: Any, attribute: str, amount: int, condition: Optional[str]) -> int: ...
+
+    @abstractmethod
+    def _scan(self, index: Optional[str], attributes: Optional[Sequence[str]]) -> List[Item]: ...
+
+    @abstractmethod
+    def _scan_page(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        index: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page: ...
+
+    @abstractmethod
+    def _find(self, match: Callable[[Item], bool], index: Optional[str]) -> Optional[Item]: ...
+
+    @abstractmethod
+    def _query(
+        self,
+        index: str,
+        partition: Any,
+        sort_from: Any,
+        sort_to: Any,
+        descending: bool,
+        limit: Optional[int],
+        cursor: Optional[str],
+        attributes: Optional[Sequence[str]],
+        keep: Optional[Callable[[Item], bool]],
+    ) -> Page: ...
+
+    @abstractmethod
+    def _transact(self, puts: List["Put"]) -> None:
+        """Apply `puts`, which may target other repositories of the same backend, all or none."""
+
+
+class Put(NamedTuple):
+    """One conditional item write of a transact() call."""
+
+    repository: Repository
+    item: Item
+    condition: Optional[str] = None
+    # Paths the stored item must hold, as in Repository.update()
+    expect: Optional[Dict[Path, Any]] = None
+
+
+async def transact(puts: Sequence[Put]) -> None:
+    """
+    Write items across tables atomically: either every condition holds and
+    every item is written, or nothing is. Raises TransactionCanceled, whose
+    `failed` lists the positions of the puts whose condition did not hold
+    and `items` the item each of them found stored.
+    """
+    if puts:
+        await run_db(puts[0].repository._transact, list(puts))
@@ -0,0 +1,111 @@
+"""Paginated, parallel segmented DynamoDB scans."""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import SCAN_MAX_CONCURRENCY, SCAN_TOTAL_SEGMENTS
+
+logger = logging.getLogger("uvicorn.error")
+
+# Shared by every scan in the process, so SCAN_MAX_CONCURRENCY caps the total
+# number of in-flight scan requests no matter how many listings run at once.
+_executor = ThreadPoolExecutor(max_workers=SCAN_MAX_CONCURRENCY, thread_name_prefix="ddb-scan")
+
+_SEGMENT_DONE = object()
+
+
+def _scan_segment(table, scan_kwargs: Dict[str, Any], out: queue.Queue, stop: threading.Event) -> None:
+    """Follow LastEvaluatedKey for one segment, pushing each page onto `out`."""
+    try:
+        kwargs = dict(scan_kwargs)
+        while not stop.is_set():
+            response = table.scan(**kwargs)
+            out.put(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(_SEGMENT_DONE)
+
+
+def iter_scan(table, total_segments: Optional[int] = None, **scan_kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every item of `table`, following pagination to the end.
+
+    The scan is split into `total_segments` Segment/TotalSegments workers that
+    run on a shared thread pool; items are yielded as soon as their page
+    arrives, in no particular order. Extra keyword arguments (FilterExpression,
+    ProjectionExpression, IndexName, ...) are passed to every scan call.
+    Stopping the iteration early stops the workers after their current page.
+    """
+    segments = total_segments or SCAN_TOTAL_SEGMENTS
+
+    if segments <= 1:
+        kwargs = dict(scan_kwargs)
+        while True:
+            response = table.scan(**kwargs)
+            yield from response.get("Items", [])
+            if "LastEvaluatedKey" not in response:
+                return
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    out: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    for segment in range(segments):
+        kwargs = {**scan_kwargs, "Segment": segment, "TotalSegments": segments}
+        _executor.submit(_scan_segment, table, kwargs, out, stop)
+
+    remaining = segments
+    try:
+        while remaining:
+            page = out.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        stop.set()
+
+
+def scan_all(table, total_segments: Optional[int] = None, **scan_kwargs) -> List[Dict[str, Any]]:
+    """Return every item of `table` (see iter_scan)."""
+    return list(iter_scan(table, total_segments, **scan_kwargs))
+
+
+def scan_page(
+    table,
+    limit: int,
+    exclusive_start_key: Optional[Dict[str, Any]] = None,
+    keep: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    **scan_kwargs,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Read one page of at most `limit` items, starting after `exclusive_start_key`.
+
+    Items rejected by `keep` do not count towards the page; the scan asks for
+    just the missing number of items each round, so it never reads past the
+    last returned item. Returns (items, last_evaluated_key); the key is None
+    when the table is exhausted.
+    """
+    items: List[Dict[str, Any]] = []
+    kwargs = dict(scan_kwargs)
+    if exclusive_start_key:
+        kwargs["ExclusiveStartKey"] = exclusive_start_key
+
+    while len(items) < limit:
+        response = table.scan(Limit=limit - len(items), **kwargs)
+        page = response.get("Items", [])
+        items.extend(item for item in page if keep is None or keep(item))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return items, None
+        kwargs["ExclusiveStartKey"] = last_key
+
+    return items, kwargs.get("ExclusiveStartKey")
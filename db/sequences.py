@@ -0,0 +1,95 @@
+"""Atomic sequence counters backed by the Counters table."""
+
+import asyncio
+import logging
+import random
+from typing import Dict, List
+
+from config.settings import ID_BLOCK_SIZE
+from db.repositories import counters_repo
+from db.repository import EXISTS, NOT_EXISTS, ConditionFailed
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def next_sequence_value(name: str, shards: int = 1) -> int:
+    """
+    Atomically increment the counter `name` and return the new value.
+
+    One UpdateItem per call, so the cost does not depend on table size and
+    two concurrent callers can never receive the same value.
+
+    With shards > 1 the sequence is spread over `shards` counter items
+    ("<name>#0" .. "<name>#N-1") to avoid a hot key. Shard i hands out
+    i+1, i+1+N, i+1+2N, ... so values stay unique across shards, but the
+    sequence is no longer contiguous. A missing counter starts at 0 (see
+    _advance_counter).
+    """
+    if shards <= 1:
+        counter_name = name
+        shard = 0
+        shards = 1
+    else:
+        shard = random.randrange(shards)
+        counter_name = f"{name}#{shard}"
+
+    count = await _advance_counter(counter_name, 1)
+    return (count - 1) * shards + shard + 1
+
+
+async def _advance_counter(name: str, amount: int) -> int:
+    """
+    Add `amount` to counter `name` and return the new value.
+    The update only applies to an existing counter; a missing counter is first
+    created at 0 with a conditional put, so concurrent first uses agree on a
+    single starting point. Counters that must continue above ids already in
+    use are seeded by migrations/create_counters_table.py, never on the
+    request path.
+    """
+    for _ in range(2):
+        try:
+            return await counters_repo.increment(name, "CounterValue", amount, condition=EXISTS)
+        except ConditionFailed:
+            pass
+
+        logger.info(f"Starting sequence '{name}' at 0")
+        try:
+            await counters_repo.put({"CounterName": name, "CounterValue": 0}, condition=NOT_EXISTS)
+        except ConditionFailed:
+            # Another container created it first, which is just as good
+            pass
+
+    raise RuntimeError(f"Could not advance sequence '{name}'")
+
+
+# ── Block-allocated ids (hi/lo) ───────────────────────────────────
+# Each warm container reserves a block of ids with one counter update and hands
+# them out locally. Ids stay unique across containers; ids left in a block when
+# a container is recycled are simply never used (gaps are expected).
+_blocks: Dict[str, List[int]] = {}
+_block_locks: Dict[str, asyncio.Lock] = {}
+
+# Creates using these ids are conditional on the id being unused and retry
+# with a fresh id this many times, so a counter that is missing or seeded
+# below the ids in use fails with 503 instead of overwriting rows.
+MAX_ID_ATTEMPTS = 5
+
+
+def _block_lock(name: str) -> asyncio.Lock:
+    return _block_locks.setdefault(name, asyncio.Lock())
+
+
+async def allocate_id(name: str, block_size: int = ID_BLOCK_SIZE) -> int:
+    """
+    Return the next id of sequence `name`.
+    Only one in `block_size` calls touches the Counters table.
+    """
+    async with _block_lock(name):
+        block = _blocks.get(name)
+        if not block or block[0] > block[1]:
+            hi = await _advance_counter(name, block_size)
+            block = [hi - block_size + 1, hi]
+            _blocks[name] = block
+        next_id = block[0]
+        block[0] += 1
+        return next_id
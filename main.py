@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
@@ -10,11 +12,22 @@ from routes import orders, accounts, agents, party, products, sizes, roll_sizes
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn.error")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rebuild the party search indexes in the background, so /party/suggest and
+    # /party/search never wait for the full scan behind a rebuild
+    refresh = asyncio.create_task(party.party_search.keep_fresh())
+    yield
+    refresh.cancel()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=APP_NAME,
     version=APP_VERSION,
-    description="API for managing orders, accounts, agents, parties, and products"
+    description="API for managing orders, accounts, agents, parties, and products",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
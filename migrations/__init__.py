@@ -0,0 +1,8 @@
+"""
+One-off data migrations, each run as `python -m migrations.<name>`.
+
+Migrations that add a GSI return only once the index is ACTIVE, because
+DynamoDB builds one index per table at a time. Run them one after another and
+let each finish before deploying the code that queries its index: until then
+those queries fail.
+"""
@@ -0,0 +1,20 @@
+"""
+Create the AgentOrdersIndex GSI on the Order table.
+
+Partition key AgentId [S], sort key OrderStartDate [S], projection ALL. Every
+order already carries both attributes, so no backfill is needed: DynamoDB
+indexes the existing items while the index is being built. Safe to re-run.
+
+    python -m migrations.add_agent_orders_index
+"""
+
+from config.settings import AGENT_ORDERS_INDEX_NAME, ORDERS_TABLE
+from migrations.common import ensure_global_index
+
+
+def main():
+    ensure_global_index(ORDERS_TABLE, AGENT_ORDERS_INDEX_NAME, "AgentId", sort_key="OrderStartDate")
+
+
+if __name__ == "__main__":
+    main()
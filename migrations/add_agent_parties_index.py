@@ -0,0 +1,66 @@
+"""
+Create the AgentPartiesIndex GSI on the Party table.
+
+Partition key AgentId [N], sort key PartyId [N], projection ALL. The API
+stores AgentId as a number; this also rewrites parties holding it as a
+string ("A01", "1") to the number, and removes a null AgentId, so that
+every party with an agent is indexed and later writes are not rejected
+for a key type mismatch. Safe to re-run.
+
+    python -m migrations.add_agent_parties_index
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import AGENT_PARTIES_INDEX_NAME, PARTY_TABLE
+from db.dynamodb import party_table
+from db.scan import iter_scan
+from migrations.common import ensure_global_index, logger, run_parallel
+
+
+def backfill(table) -> int:
+    def fix(item) -> bool:
+        if "AgentId" not in item or not isinstance(item["AgentId"], (str, type(None))):
+            return False
+        agent_id = item["AgentId"]
+        try:
+            numeric_id = int(agent_id[1:] if agent_id.startswith("A") else agent_id) if agent_id else None
+        except ValueError:
+            logger.warning(f"Party {item['PartyId']}: AgentId {agent_id!r} is not a valid agent id, left as is")
+            return False
+        try:
+            if numeric_id is None:
+                table.update_item(
+                    Key={"PartyId": item["PartyId"]},
+                    UpdateExpression="REMOVE AgentId",
+                    ConditionExpression="attribute_type(AgentId, :null) OR AgentId = :empty",
+                    ExpressionAttributeValues={":null": "NULL", ":empty": ""},
+                )
+            else:
+                table.update_item(
+                    Key={"PartyId": item["PartyId"]},
+                    UpdateExpression="SET AgentId = :id",
+                    ConditionExpression="AgentId = :old",
+                    ExpressionAttributeValues={":id": numeric_id, ":old": agent_id},
+                )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Rewritten by the API meanwhile, which stores a numeric AgentId
+            return False
+        return True
+
+    items = iter_scan(table, ProjectionExpression="PartyId, AgentId")
+    return run_parallel(fix, items)
+
+
+def main():
+    changed = backfill(party_table)
+    logger.info(f"✓ {PARTY_TABLE}: converted AgentId on {changed} part(ies)")
+    ensure_global_index(
+        PARTY_TABLE, AGENT_PARTIES_INDEX_NAME, "AgentId", partition_type="N", sort_key="PartyId", sort_type="N"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Backfill the Active marker used by the sparse ActiveIndex GSI.
+
+For the Order, Party and Agent tables: creates ActiveIndex if missing,
+normalizes `deleted` to a real boolean, sets Active = the row's own key (as a
+string) on live rows and removes it from soft-deleted ones. The marker is
+per-row rather than a constant so live rows spread over the index's partitions
+instead of sharing one hot partition key. Safe to re-run.
+
+    python -m migrations.backfill_active_index
+"""
+
+from config.settings import ACTIVE_INDEX_NAME, AGENTS_TABLE, ORDERS_TABLE, PARTY_TABLE
+from db.dynamodb import agents_table, orders_table, party_table
+from db.scan import iter_scan
+from migrations.common import ensure_global_index, logger, run_parallel
+from utils.dynamodb_utils import ACTIVE_ATTRIBUTE, active_value, is_item_deleted
+
+TABLES = [
+    (ORDERS_TABLE, orders_table, "OrderId"),
+    (PARTY_TABLE, party_table, "PartyId"),
+    (AGENTS_TABLE, agents_table, "AgentId"),
+]
+
+
+def backfill(table, key: str) -> int:
+    def fix(item) -> bool:
+        deleted = is_item_deleted(item)
+        if deleted:
+            if item.get("deleted") is True and ACTIVE_ATTRIBUTE not in item:
+                return False
+            table.update_item(
+                Key={key: item[key]},
+                UpdateExpression="SET deleted = :deleted REMOVE Active",
+                ExpressionAttributeValues={":deleted": True},
+            )
+        else:
+            active = active_value(item[key])
+            if item.get("deleted") is False and item.get(ACTIVE_ATTRIBUTE) == active:
+                return False
+            table.update_item(
+                Key={key: item[key]},
+                UpdateExpression="SET deleted = :deleted, Active = :active",
+                ExpressionAttributeValues={":deleted": False, ":active": active},
+            )
+        return True
+
+    items = iter_scan(
+        table,
+        ProjectionExpression="#key, deleted, Active",
+        ExpressionAttributeNames={"#key": key},
+    )
+    return run_parallel(fix, items)
+
+
+def main():
+    for table_name, table, key in TABLES:
+        ensure_global_index(table_name, ACTIVE_INDEX_NAME, ACTIVE_ATTRIBUTE)
+        changed = backfill(table, key)
+        logger.info(f"✓ {table_name}: updated {changed} item(s)")
+
+
+if __name__ == "__main__":
+    main()
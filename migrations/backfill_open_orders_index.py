@@ -0,0 +1,58 @@
+"""
+Backfill the OpenStatus marker used by the sparse OpenOrdersIndex GSI.
+
+Creates OpenOrdersIndex on the Order table if missing, then sets
+OpenStatus = OrderStatus on live orders that are ToDo or In-Progress and
+removes it from delivered and soft-deleted ones. Run after
+migrations/backfill_order_status.py so OrderStatus is current. Safe to re-run.
+
+    python -m migrations.backfill_open_orders_index
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import OPEN_ORDERS_INDEX_NAME, ORDERS_TABLE
+from db.dynamodb import orders_table
+from db.scan import iter_scan
+from migrations.common import ensure_global_index, logger, run_parallel
+from utils.dynamodb_utils import is_item_deleted
+from utils.order_rules import OPEN_STATUS_ATTRIBUTE, open_status
+
+
+def backfill(table) -> int:
+    def fix(item) -> bool:
+        status = open_status(item.get("OrderStatus"), is_item_deleted(item))
+        if item.get(OPEN_STATUS_ATTRIBUTE) == status:
+            return False
+        try:
+            if status:
+                # Only while the order is still live with the status that was scanned
+                table.update_item(
+                    Key={"OrderId": item["OrderId"]},
+                    UpdateExpression="SET OpenStatus = :status",
+                    ConditionExpression="OrderStatus = :status AND (attribute_not_exists(deleted) OR deleted <> :true)",
+                    ExpressionAttributeValues={":status": status, ":true": True},
+                )
+            else:
+                table.update_item(Key={"OrderId": item["OrderId"]}, UpdateExpression="REMOVE OpenStatus")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Rewritten by the API meanwhile, which maintains OpenStatus itself
+            return False
+        return True
+
+    items = iter_scan(table, ProjectionExpression="OrderId, OrderStatus, OpenStatus, deleted")
+    return run_parallel(fix, items)
+
+
+def main():
+    ensure_global_index(
+        ORDERS_TABLE, OPEN_ORDERS_INDEX_NAME, OPEN_STATUS_ATTRIBUTE, sort_key="OrderId", sort_type="N"
+    )
+    changed = backfill(orders_table)
+    logger.info(f"✓ {ORDERS_TABLE}: updated OpenStatus on {changed} order(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Backfill the OrderMonth bucket used by the OrderMonthIndex GSI.
+
+Creates OrderMonthIndex on the Order table if missing, then sets
+OrderMonth = "YYYY-MM" of OrderStartDate on live orders and removes it from
+soft-deleted ones and orders without a start date. Safe to re-run.
+
+    python -m migrations.backfill_order_month_index
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import ORDER_MONTH_INDEX_NAME, ORDERS_TABLE
+from db.dynamodb import orders_table
+from db.scan import iter_scan
+from migrations.common import ensure_global_index, logger, run_parallel
+from utils.dynamodb_utils import is_item_deleted
+from utils.order_rules import ORDER_MONTH_ATTRIBUTE, order_month
+
+
+def backfill(table) -> int:
+    def fix(item) -> bool:
+        month = order_month(item.get("OrderStartDate"), is_item_deleted(item))
+        if item.get(ORDER_MONTH_ATTRIBUTE) == month:
+            return False
+        try:
+            if month:
+                # Only while the order is still live with the start date that was scanned
+                table.update_item(
+                    Key={"OrderId": item["OrderId"]},
+                    UpdateExpression="SET OrderMonth = :month",
+                    ConditionExpression="OrderStartDate = :start AND (attribute_not_exists(deleted) OR deleted <> :true)",
+                    ExpressionAttributeValues={":month": month, ":start": item["OrderStartDate"], ":true": True},
+                )
+            else:
+                table.update_item(Key={"OrderId": item["OrderId"]}, UpdateExpression="REMOVE OrderMonth")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Rewritten by the API meanwhile, which maintains OrderMonth itself
+            return False
+        return True
+
+    items = iter_scan(table, ProjectionExpression="OrderId, OrderStartDate, OrderMonth, deleted")
+    return run_parallel(fix, items)
+
+
+def main():
+    ensure_global_index(ORDERS_TABLE, ORDER_MONTH_INDEX_NAME, ORDER_MONTH_ATTRIBUTE, sort_key="OrderStartDate")
+    changed = backfill(orders_table)
+    logger.info(f"✓ {ORDERS_TABLE}: updated OrderMonth on {changed} order(s)")
+
+
+if __name__ == "__main__":
+    main()
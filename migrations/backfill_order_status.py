@@ -0,0 +1,57 @@
+"""
+Store the derived OrderStatus on every order.
+
+Orders written before the status rules ran on write (utils/order_rules.py)
+may hold no OrderStatus, or one that differs from their product statuses.
+This rewrites OrderStatus where it differs, on a parallel scan. The update
+is skipped if the order's products changed since the scan. Safe to re-run.
+
+    python -m migrations.backfill_order_status
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import ORDERS_TABLE
+from db.dynamodb import orders_table
+from db.scan import iter_scan
+from migrations.common import logger, run_parallel
+from utils.order_rules import derive_order_status
+
+
+def backfill(table) -> int:
+    def fix(item) -> bool:
+        products = item.get("Products", [])
+        status = derive_order_status((p.get("ProductStatus") for p in products), item.get("OrderStatus"))
+        if item.get("OrderStatus") == status:
+            return False
+        values = {":status": status}
+        if "Products" in item:
+            condition = "Products = :products"
+            values[":products"] = products
+        else:
+            condition = "attribute_exists(OrderId) AND attribute_not_exists(Products)"
+        try:
+            table.update_item(
+                Key={"OrderId": item["OrderId"]},
+                UpdateExpression="SET OrderStatus = :status",
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Rewritten by the API meanwhile, which already stored the status
+            return False
+        return True
+
+    items = iter_scan(table, ProjectionExpression="OrderId, Products, OrderStatus")
+    return run_parallel(fix, items)
+
+
+def main():
+    changed = backfill(orders_table)
+    logger.info(f"✓ {ORDERS_TABLE}: updated OrderStatus on {changed} order(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Backfill the PartyNameKey used by the PartyNameIndex GSI.
+
+Creates PartyNameIndex on the Party table if missing, then sets
+PartyNameKey (normalized PartyName) on live parties and removes it from
+soft-deleted ones and parties without a name. Safe to re-run.
+
+    python -m migrations.backfill_party_name_index
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import PARTY_NAME_INDEX_NAME, PARTY_TABLE
+from db.dynamodb import party_table
+from db.scan import iter_scan
+from migrations.common import ensure_global_index, logger, run_parallel
+from utils.dynamodb_utils import is_item_deleted
+from utils.party_names import PARTY_NAME_KEY_ATTRIBUTE, party_name_key
+
+
+def backfill(table) -> int:
+    def fix(item) -> bool:
+        key = party_name_key(item.get("PartyName"), is_item_deleted(item))
+        if item.get(PARTY_NAME_KEY_ATTRIBUTE) == key:
+            return False
+        try:
+            if key:
+                # Only while the party is still live with the name that was scanned
+                table.update_item(
+                    Key={"PartyId": item["PartyId"]},
+                    UpdateExpression="SET PartyNameKey = :key",
+                    ConditionExpression="PartyName = :name AND (attribute_not_exists(deleted) OR deleted <> :true)",
+                    ExpressionAttributeValues={":key": key, ":name": item["PartyName"], ":true": True},
+                )
+            else:
+                table.update_item(Key={"PartyId": item["PartyId"]}, UpdateExpression="REMOVE PartyNameKey")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Rewritten by the API meanwhile, which maintains PartyNameKey itself
+            return False
+        return True
+
+    items = iter_scan(table, ProjectionExpression="PartyId, PartyName, PartyNameKey, deleted")
+    return run_parallel(fix, items)
+
+
+def main():
+    ensure_global_index(
+        PARTY_TABLE, PARTY_NAME_INDEX_NAME, PARTY_NAME_KEY_ATTRIBUTE, sort_key="PartyId", sort_type="N"
+    )
+    changed = backfill(party_table)
+    logger.info(f"✓ {PARTY_TABLE}: updated PartyNameKey on {changed} part(ies)")
+
+
+if __name__ == "__main__":
+    main()
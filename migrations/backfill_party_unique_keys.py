@@ -0,0 +1,54 @@
+"""
+Create the PartyUnique table and write the Mobile1 / Email uniqueness
+guards of existing parties (utils/party_unique.py).
+
+Each live party gets a guard per normalized value unless another party
+already holds it. Parties that already share a value are logged so they
+can be merged or corrected by hand; the API keeps rejecting new
+duplicates either way. Safe to re-run.
+
+    python -m migrations.backfill_party_unique_keys
+"""
+
+from botocore.exceptions import ClientError
+
+from config.settings import PARTY_TABLE, PARTY_UNIQUE_TABLE
+from db.dynamodb import party_table, party_unique_table
+from db.scan import iter_scan
+from migrations.common import ensure_table, logger, run_parallel
+from utils.dynamodb_utils import is_item_deleted
+from utils.party_unique import UNIQUE_KEY_ATTRIBUTE, guard_item, unique_keys
+
+
+def backfill(table, guards) -> int:
+    def fix(item) -> bool:
+        if is_item_deleted(item):
+            return False
+        written = False
+        for key in unique_keys(item):
+            try:
+                guards.put_item(
+                    Item=guard_item(key, item["PartyId"]),
+                    ConditionExpression="attribute_not_exists(UniqueKey) OR PartyId = :id",
+                    ExpressionAttributeValues={":id": item["PartyId"]},
+                )
+                written = True
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                owner = guards.get_item(Key={UNIQUE_KEY_ATTRIBUTE: key}).get("Item", {}).get("PartyId")
+                logger.warning(f"Duplicate {key}: party {item['PartyId']} shares it with party {owner}")
+        return written
+
+    items = iter_scan(table, ProjectionExpression="PartyId, Mobile1, Email, deleted")
+    return run_parallel(fix, items)
+
+
+def main():
+    ensure_table(PARTY_UNIQUE_TABLE, UNIQUE_KEY_ATTRIBUTE)
+    changed = backfill(party_table, party_unique_table)
+    logger.info(f"✓ {PARTY_UNIQUE_TABLE}: wrote uniqueness guards for {changed} part(ies) of {PARTY_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
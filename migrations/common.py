@@ -0,0 +1,112 @@
+"""Shared helpers for one-off data migrations."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from db.dynamodb import get_resource
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn.error")
+
+MIGRATION_WORKERS = 16
+# How often, and for how long, ensure_global_index polls a new index until it is ACTIVE
+INDEX_POLL_SECONDS = 15
+INDEX_WAIT_SECONDS = 6 * 60 * 60
+
+
+def ensure_global_index(
+    table_name: str,
+    index_name: str,
+    partition_key: str,
+    partition_type: str = "S",
+    sort_key: Optional[str] = None,
+    sort_type: str = "S",
+) -> None:
+    """
+    Create the GSI `index_name` (projection ALL) on `table_name` if it does not
+    exist, and wait until it is ACTIVE. DynamoDB builds the index in the
+    background (items written meanwhile are indexed too) and builds only one
+    index per table at a time, so the next index migration can only start once
+    this one returns. Code that queries the index must not be deployed before then.
+    """
+    client = get_resource().meta.client
+    description = client.describe_table(TableName=table_name)["Table"]
+    existing = {gsi["IndexName"] for gsi in description.get("GlobalSecondaryIndexes", [])}
+    if index_name in existing:
+        logger.info(f"Index {index_name} already exists on {table_name}")
+        wait_for_index(table_name, index_name)
+        return
+
+    key_schema = [{"AttributeName": partition_key, "KeyType": "HASH"}]
+    attribute_definitions = [{"AttributeName": partition_key, "AttributeType": partition_type}]
+    if sort_key:
+        key_schema.append({"AttributeName": sort_key, "KeyType": "RANGE"})
+        attribute_definitions.append({"AttributeName": sort_key, "AttributeType": sort_type})
+
+    create: Dict[str, Any] = {
+        "IndexName": index_name,
+        "KeySchema": key_schema,
+        "Projection": {"ProjectionType": "ALL"},
+    }
+    billing_mode = description.get("BillingModeSummary", {}).get("BillingMode", "PROVISIONED")
+    if billing_mode == "PROVISIONED":
+        throughput = description["ProvisionedThroughput"]
+        create["ProvisionedThroughput"] = {
+            "ReadCapacityUnits": throughput["ReadCapacityUnits"],
+            "WriteCapacityUnits": throughput["WriteCapacityUnits"],
+        }
+
+    client.update_table(
+        TableName=table_name,
+        AttributeDefinitions=attribute_definitions,
+        GlobalSecondaryIndexUpdates=[{"Create": create}],
+    )
+    logger.info(f"Creating index {index_name} on {table_name}")
+    wait_for_index(table_name, index_name)
+
+
+def wait_for_index(table_name: str, index_name: str) -> None:
+    """Poll `table_name` until its GSI `index_name` is ACTIVE (raises TimeoutError after INDEX_WAIT_SECONDS)."""
+    client = get_resource().meta.client
+    deadline = time.monotonic() + INDEX_WAIT_SECONDS
+    while True:
+        description = client.describe_table(TableName=table_name)["Table"]
+        status = next(
+            (gsi["IndexStatus"] for gsi in description.get("GlobalSecondaryIndexes", []) if gsi["IndexName"] == index_name),
+            None,
+        )
+        if status == "ACTIVE":
+            logger.info(f"Index {index_name} on {table_name} is active")
+            return
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Index {index_name} on {table_name} is still {status} after {INDEX_WAIT_SECONDS}s")
+        logger.info(f"Waiting for index {index_name} on {table_name} ({status})")
+        time.sleep(INDEX_POLL_SECONDS)
+
+
+def ensure_table(table_name: str, partition_key: str, partition_type: str = "S") -> None:
+    """Create the on-demand table `table_name` if it does not exist, and wait until it is active."""
+    client = get_resource().meta.client
+    try:
+        client.describe_table(TableName=table_name)
+        logger.info(f"Table {table_name} already exists")
+        return
+    except client.exceptions.ResourceNotFoundException:
+        pass
+
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": partition_key, "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": partition_key, "AttributeType": partition_type}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    client.get_waiter("table_exists").wait(TableName=table_name)
+    logger.info(f"Created table {table_name}")
+
+
+def run_parallel(fn: Callable[[Dict[str, Any]], bool], items: Iterable[Dict[str, Any]]) -> int:
+    """Apply `fn` to every item on a thread pool; returns how many calls returned True."""
+    with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as pool:
+        return sum(1 for changed in pool.map(fn, items) if changed)
@@ -0,0 +1,100 @@
+"""
+Create the Counters table behind the atomic sequences (db/sequences.py) and
+seed the counters that must continue above ids already in use:
+
+- AgentId, PartyId and ProductId, from the highest id in their table;
+- Size#<table> of every size table (routes/sizes.py), likewise;
+- today's OrderId counter (every shard of it), from the orders numbered
+  today before the counter existed.
+
+Run it once before deploying the counter-based id generation. Every other
+counter starts at 0 the first time it is used. A counter is only ever
+raised, so this is safe to re-run.
+
+    python -m migrations.create_counters_table
+"""
+
+from datetime import date
+
+from botocore.exceptions import ClientError
+
+from config.settings import COUNTERS_TABLE, ORDER_ID_COUNTER_SHARDS
+from db.dynamodb import agents_table, counters_table, get_table, orders_table, party_table, products_table
+from migrations.common import ensure_table, logger
+from routes.sizes import SIZE_TABLE_MAP
+
+# Block-allocated sequence → (table, id attribute)
+ID_SEQUENCES = {
+    "AgentId": (agents_table, "AgentId"),
+    "PartyId": (party_table, "PartyId"),
+    "ProductId": (products_table, "ProductId"),
+    **{f"Size#{name}": (get_table(name), "ID") for name in SIZE_TABLE_MAP.values()},
+}
+
+
+def scan_values(table, attribute: str):
+    """Yield `attribute` of every item of `table`."""
+    kwargs = {"ProjectionExpression": "#a", "ExpressionAttributeNames": {"#a": attribute}}
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            if item.get(attribute) is not None:
+                yield item[attribute]
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def highest_id(table, attribute: str) -> int:
+    """The highest numeric `attribute` in `table` (0 if none)."""
+    ids = []
+    for value in scan_values(table, attribute):
+        try:
+            ids.append(int(value))
+        except (ValueError, TypeError):
+            pass
+    return max(ids, default=0)
+
+
+def raise_counter(name: str, value: int) -> bool:
+    """Set counter `name` to `value` unless it is already at least that high."""
+    try:
+        counters_table.update_item(
+            Key={"CounterName": name},
+            UpdateExpression="SET CounterValue = :value",
+            ConditionExpression="attribute_not_exists(CounterValue) OR CounterValue < :value",
+            ExpressionAttributeValues={":value": value},
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    logger.info(f"Counter {name} set to {value}")
+    return True
+
+
+def seed_order_ids(date_str: str) -> None:
+    """Continue day `date_str`'s OrderId sequence (YYMMDDNNNN) above the NNNN already used."""
+    first = int(f"{date_str}0000")
+    used = [int(order_id) - first for order_id in scan_values(orders_table, "OrderId")]
+    highest = max((seq for seq in used if 0 < seq <= 9999), default=0)
+    name = f"OrderId#{date_str}"
+    if ORDER_ID_COUNTER_SHARDS <= 1:
+        raise_counter(name, highest)
+        return
+    # Shard i hands out count * shards + i + 1 next, which must be above `highest`
+    count = -(-highest // ORDER_ID_COUNTER_SHARDS)
+    for shard in range(ORDER_ID_COUNTER_SHARDS):
+        raise_counter(f"{name}#{shard}", count)
+
+
+def main():
+    ensure_table(COUNTERS_TABLE, "CounterName")
+    for name, (table, attribute) in ID_SEQUENCES.items():
+        raise_counter(name, highest_id(table, attribute))
+    seed_order_ids(date.today().strftime("%y%m%d"))
+    logger.info(f"✓ {COUNTERS_TABLE} ready")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,23 @@ from botocore.exceptions import ClientError
 
 from schemas.accounts import AccountTxn, CreateAccountTxn, UpdateAccountTxn
 from utils.helpers import aws_error_detail, ddb_decimal, normalize_ddb_item
-from db.dynamodb import accounts_table
+from db.repositories import accounts_repo
+from db.repository import EXISTS, ConditionFailed
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
 
 @router.get("/accounts", response_model=List[AccountTxn])
-def list_accounts():
+async def list_accounts():
     try:
-        items = accounts_table.scan().get("Items", [])
-        return [normalize_ddb_item(x) for x in items]
+        return [normalize_ddb_item(x) for x in await accounts_repo.scan()]
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
 
 
 @router.post("/accounts", response_model=AccountTxn)
-def create_account(payload: CreateAccountTxn):
+async def create_account(payload: CreateAccountTxn):
     try:
         txn_id = payload.txnId or f"TXN-{uuid4().hex[:8].upper()}"
 
@@ -35,7 +35,7 @@ def create_account(payload: CreateAccountTxn):
             "amount": ddb_decimal(payload.amount),
         }
 
-        accounts_table.put_item(Item=item)
+        await accounts_repo.put(item)
         return normalize_ddb_item(item)
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
@@ -45,19 +45,19 @@ def create_account(payload: CreateAccountTxn):
 
 
 @router.put("/accounts/{txn_id}", response_model=AccountTxn)
-def update_account(txn_id: str, payload: UpdateAccountTxn):
+async def update_account(txn_id: str, payload: UpdateAccountTxn):
     try:
-        existing = accounts_table.get_item(Key={"txnId": txn_id}).get("Item")
-        if not existing:
-            raise HTTPException(status_code=404, detail="Transaction not found")
-
         item = {
             "txnId": txn_id,
             **payload.dict(),
             "amount": ddb_decimal(payload.amount),
         }
 
-        accounts_table.put_item(Item=item)
+        # Single round trip: the write only applies to an existing transaction
+        try:
+            await accounts_repo.put(item, condition=EXISTS)
+        except ConditionFailed:
+            raise HTTPException(status_code=404, detail="Transaction not found")
         return normalize_ddb_item(item)
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
@@ -69,14 +69,13 @@ def update_account(txn_id: str, payload: UpdateAccountTxn):
 
 
 @router.delete("/accounts/{txn_id}")
-def delete_account(txn_id: str):
+async def delete_account(txn_id: str):
     try:
-        existing = accounts_table.get_item(Key={"txnId": txn_id}).get("Item")
-        if not existing:
-            raise HTTPException(status_code=404, detail="Transaction not found")
-
-        accounts_table.delete_item(Key={"txnId": txn_id})
+        # Single round trip: the delete only applies to an existing transaction
+        await accounts_repo.delete(txn_id, condition=EXISTS)
         return {"deleted": True}
+    except ConditionFailed:
+        raise HTTPException(status_code=404, detail="Transaction not found")
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
     except HTTPException:
@@ -1,18 +1,26 @@
 import logging
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from botocore.exceptions import ClientError
 from pydantic import ValidationError
 
 from schemas.agents import Agent, AgentLightweight, CreateAgent, UpdateAgent
-from utils.helpers import aws_error_detail, normalize_agent_item, get_next_agent_id
-from utils.dynamodb_utils import filter_deleted_items, is_item_deleted
-from db.dynamodb import agents_table
+from utils.helpers import AGENT_FIELD_ATTRIBUTES, aws_error_detail, normalize_agent_item, get_next_agent_id
+from utils.dynamodb_utils import is_item_deleted, mark_active
+from utils.fieldsets import parse_fields, projection_attributes, trim
+from config.settings import ACTIVE_INDEX_NAME
+from db.repositories import agents_repo
+from db.repository import LIVE, NOT_EXISTS, ConditionFailed
+from db.sequences import MAX_ID_ATTEMPTS
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
+FIELDS_QUERY = Query(None, description="Comma-separated Agent fields to return, e.g. agentId,name")
+
 
 def format_validation_errors(errors: list) -> str:
     """Format Pydantic validation errors into a readable message"""
@@ -25,10 +33,25 @@ def format_validation_errors(errors: list) -> str:
 
 
 @router.get("/agents", response_model=List[Agent])
-def list_agents():
+async def list_agents(fields: Optional[str] = FIELDS_QUERY):
     try:
-        items = filter_deleted_items(agents_table.scan().get("Items", []))
-        return [normalize_agent_item(x) for x in items]
+        try:
+            selected = parse_fields(fields, AGENT_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # The sparse ActiveIndex only holds agents that are not soft-deleted
+        items = await agents_repo.scan(
+            index=ACTIVE_INDEX_NAME,
+            attributes=projection_attributes(selected, AGENT_FIELD_ATTRIBUTES),
+        )
+        agents = [normalize_agent_item(x) for x in items]
+        if selected:
+            # Trimmed records bypass response_model, which would require every field
+            return JSONResponse(jsonable_encoder([trim(a, selected) for a in agents]))
+        return agents
+    except HTTPException:
+        raise
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
     except Exception as e:
@@ -37,15 +60,14 @@ def list_agents():
 
 
 @router.get("/agents/lightweight", response_model=List[AgentLightweight])
-def list_agents_lightweight():
+async def list_agents_lightweight():
     """
     Returns a lightweight list of all agents: just AgentId and Name.
     AgentId is formatted as string (e.g., "A01", "A02")
     """
     try:
-        items = filter_deleted_items(agents_table.scan().get("Items", []))
         result = []
-        for item in items:
+        for item in await agents_repo.scan(index=ACTIVE_INDEX_NAME):
             agent_id = item["AgentId"]
             if isinstance(agent_id, Decimal):
                 agent_id = int(agent_id)
@@ -63,7 +85,7 @@ def list_agents_lightweight():
 
 
 @router.get("/agents/{agent_id}", response_model=Agent)
-def get_agent(agent_id: str):
+async def get_agent(agent_id: str, fields: Optional[str] = FIELDS_QUERY):
     try:
         if not agent_id or not agent_id.strip():
             raise HTTPException(status_code=400, detail="Agent ID is required")
@@ -81,11 +103,17 @@ def get_agent(agent_id: str):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Agent ID")
 
-        resp = agents_table.get_item(Key={"AgentId": numeric_id})
-        item = resp.get("Item")
+        try:
+            selected = parse_fields(fields, AGENT_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        attributes = projection_attributes(selected, AGENT_FIELD_ATTRIBUTES, extra=("deleted",))
+        item = await agents_repo.get(numeric_id, attributes)
         if not item or is_item_deleted(item):
             raise HTTPException(status_code=404, detail="Agent not found")
-        return normalize_agent_item(item)
+        agent = normalize_agent_item(item)
+        return JSONResponse(jsonable_encoder(trim(agent, selected))) if selected else agent
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
     except HTTPException:
@@ -96,25 +124,36 @@ def get_agent(agent_id: str):
 
 
 @router.post("/agents", response_model=Agent)
-def create_agent(payload: CreateAgent):
+async def create_agent(payload: CreateAgent):
     try:
         # Validation is automatically done by Pydantic
-        agent_id = get_next_agent_id()
+        for _ in range(MAX_ID_ATTEMPTS):
+            agent_id = await get_next_agent_id()
+
+            item = {
+                "AgentId": agent_id,
+                "Name": payload.name,
+                "Mobile": payload.mobile,
+                "Aadhar_Details": payload.aadhar_Details,
+                "Address": payload.address,
+                "deleted": False,
+            }
 
-        item = {
-            "AgentId": agent_id,
-            "Name": payload.name,
-            "Mobile": payload.mobile,
-            "Aadhar_Details": payload.aadhar_Details,
-            "Address": payload.address,
-            "deleted": False,
-        }
-
-        agents_table.put_item(Item=item)
+            try:
+                # Never overwrite an existing agent, even if the counter is behind the table
+                await agents_repo.put(mark_active(item, "AgentId"), condition=NOT_EXISTS)
+                break
+            except ConditionFailed:
+                logger.warning(f"AgentId {agent_id} already exists, allocating a new one")
+        else:
+            raise HTTPException(status_code=503, detail="Could not allocate a free Agent ID, please retry")
 
         logger.info(f"Agent created successfully with ID: {agent_id}")
         return normalize_agent_item(item)
 
+    except HTTPException:
+        raise
+
     except ValidationError as e:
         error_detail = format_validation_errors(e.errors())
         logger.warning(f"Validation error creating agent: {error_detail}")
@@ -130,7 +169,7 @@ def create_agent(payload: CreateAgent):
 
 
 @router.put("/agents/{agent_id}", response_model=Agent)
-def update_agent(agent_id: str, payload: UpdateAgent):
+async def update_agent(agent_id: str, payload: UpdateAgent):
     try:
         if not agent_id or not agent_id.strip():
             raise HTTPException(status_code=400, detail="Agent ID is required")
@@ -148,11 +187,6 @@ def update_agent(agent_id: str, payload: UpdateAgent):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Agent ID")
 
-        # Check if agent exists
-        existing = agents_table.get_item(Key={"AgentId": numeric_id}).get("Item")
-        if not existing or is_item_deleted(existing):
-            raise HTTPException(status_code=404, detail="Agent not found")
-
         # Validation is automatically done by Pydantic
         item = {
             "AgentId": numeric_id,
@@ -160,10 +194,14 @@ def update_agent(agent_id: str, payload: UpdateAgent):
             "Mobile": payload.mobile,
             "Aadhar_Details": payload.aadhar_Details,
             "Address": payload.address,
+            "deleted": False,
         }
 
-        item["deleted"] = existing.get("deleted", False)
-        agents_table.put_item(Item=item)
+        # Single round trip: the write only applies to an existing, non-deleted agent
+        try:
+            await agents_repo.put(mark_active(item, "AgentId"), condition=LIVE)
+        except ConditionFailed:
+            raise HTTPException(status_code=404, detail="Agent not found")
 
         logger.info(f"Agent {agent_id} updated successfully")
         return normalize_agent_item(item)
@@ -186,7 +224,7 @@ def update_agent(agent_id: str, payload: UpdateAgent):
 
 
 @router.delete("/agents/{agent_id}")
-def delete_agent(agent_id: str):
+async def delete_agent(agent_id: str):
     try:
         if not agent_id or not agent_id.strip():
             raise HTTPException(status_code=400, detail="Agent ID is required")
@@ -204,16 +242,11 @@ def delete_agent(agent_id: str):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Agent ID")
 
-        existing = agents_table.get_item(Key={"AgentId": numeric_id}).get("Item")
-        if not existing or is_item_deleted(existing):
+        try:
+            await agents_repo.update(numeric_id, {"deleted": True}, remove=["Active"], condition=LIVE)
+        except ConditionFailed:
             raise HTTPException(status_code=404, detail="Agent not found")
 
-        agents_table.update_item(
-            Key={"AgentId": numeric_id},
-            UpdateExpression="SET deleted = :deleted",
-            ExpressionAttributeValues={":deleted": True},
-        )
-
         logger.info(f"Agent {agent_id} soft deleted successfully")
         return {"deleted": True}
 
@@ -1,62 +1,85 @@
+import asyncio
 import logging
-from typing import List, Optional
+import random
+from typing import Any, Dict, List, Optional, Tuple, Union
+from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from botocore.exceptions import ClientError
 import traceback
-import time
 
-from schemas.orders import Order, CreateOrder, UpdateOrder
+from schemas.orders import Order, OrderPage, CreateOrder, UpdateOrder, PatchOrder, ProductStatusUpdate
 from utils.dynamodb_utils import (
-    convert_items_to_python,
     convert_item_to_python,
     convert_product_for_storage,
-    filter_deleted_items,
+    decode_cursor,
+    encode_cursor,
     is_item_deleted,
+    mark_active,
+)
+from utils.order_rules import (
+    OPEN_STATUS_ATTRIBUTE,
+    OPEN_STATUSES,
+    ORDER_MONTH_ATTRIBUTE,
+    apply_order_rules,
+    cascade_order_status,
+    derive_order_status,
+    month_buckets,
+    months_back,
+    open_status,
+    order_month,
+)
+from utils.fieldsets import model_field_attributes, parse_fields, projection_attributes, trim
+from db.repositories import orders_repo
+from db.repository import LIVE, NOT_EXISTS, PRESENT, ConditionFailed
+from db.sequences import next_sequence_value
+from config.settings import (
+    ACTIVE_INDEX_NAME,
+    AGENT_ORDERS_INDEX_NAME,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    OPEN_ORDERS_INDEX_NAME,
+    ORDER_ID_COUNTER_SHARDS,
+    ORDER_MONTH_INDEX_NAME,
+    RECENT_ORDERS_MAX_MONTHS,
 )
-from db.dynamodb import orders_table
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
+# How many fresh OrderIds create_order tries if an id is already taken
+# (the per-day counter and the table disagree, e.g. after a manual import).
+MAX_ORDER_ID_ATTEMPTS = 5
+
+# How many times a status change is re-read and retried when the order's
+# statuses changed between the read and the conditional write, and the
+# upper bound (seconds, times the attempt number) of the random pause between tries.
+MAX_STATUS_UPDATE_ATTEMPTS = 5
+STATUS_RETRY_BACKOFF = 0.02
+
+# Attributes the status rules read (apply_status_patch)
+STATUS_ATTRIBUTES = ["Products", "OrderStatus", "OrderEndDate", "deleted"]
+
+# ?fields= names → attributes to read (OrderStatus is stored, see utils.order_rules)
+ORDER_FIELD_ATTRIBUTES = model_field_attributes(Order)
+FIELDS_QUERY = Query(None, description="Comma-separated Order fields to return, e.g. OrderId,Party_Name,OrderStatus")
 
-def generate_order_id(agent_id: Optional[int]) -> str:
-    """Generate a unique OrderId in format YYMMDDNNNN"""
+
+async def generate_order_id(agent_id: Optional[int]) -> str:
+    """
+    Generate a unique OrderId in format YYMMDDNNNN.
+    NNNN comes from an atomic per-day counter (one UpdateItem, no table scan).
+    A day's counter starts at 0 the first time it is used; the rollout day is
+    seeded from existing orders by migrations/create_counters_table.py.
+    """
     from datetime import date
     
     today = date.today()
     date_str = today.strftime('%y%m%d')  # YYMMDD format
     
-    # Query existing orders for today to find the next sequence number
-    try:
-        response = orders_table.scan()
-        items = response.get('Items', [])
-        
-        # Filter orders from today and extract sequence numbers
-        today_orders = []
-        for item in items:
-            order_id = item.get('OrderId', '')
-            # Convert to string for comparison (DynamoDB may store as int or str)
-            order_id_str = str(order_id) if order_id else ''
-            if order_id_str.startswith(date_str):
-                today_orders.append(order_id_str)
-        
-        # Get the next sequence number (1-indexed)
-        next_seq = len(today_orders) + 1
-        order_id = f"{date_str}{next_seq:04d}"
-        
-        # Safety: ensure no collision with existing OrderIds
-        existing_ids = {str(item.get('OrderId', '')) for item in items}
-        while order_id in existing_ids:
-            next_seq += 1
-            order_id = f"{date_str}{next_seq:04d}"
-        
-    except Exception as e:
-        logger.warning(f"Failed to query existing orders for sequence: {e}. Using fallback sequence.")
-        # Fallback: use a simple counter based on timestamp
-        timestamp = int(time.time())
-        next_seq = (timestamp % 10000) % 9999 + 1
-        order_id = f"{date_str}{next_seq:04d}"
+    next_seq = await next_sequence_value(f"OrderId#{date_str}", shards=ORDER_ID_COUNTER_SHARDS)
+    order_id = f"{date_str}{next_seq:04d}"
     
     logger.info(f"Generated OrderId: {order_id} from AgentId: {agent_id}")
     return order_id
@@ -286,7 +309,8 @@ def build_order_item(order_id: int, payload, ddb_products: list, is_new_order: b
     
     UPDATE ORDERS:
     - Product statuses are PRESERVED as sent from frontend
-    - Order status is computed based on product statuses (by get_order/list_orders)
+    - Order status is derived from the product statuses and stored with the
+      order (utils.order_rules.apply_order_rules); reads return it as stored
     """
     # Convert OrderId to int if it's a string (e.g., "2604220001" -> 2604220001)
     order_id_value = int(order_id) if isinstance(order_id, str) else order_id
@@ -296,31 +320,8 @@ def build_order_item(order_id: int, payload, ddb_products: list, is_new_order: b
     product_count = len(ddb_products) if ddb_products else 0
     
     if is_new_order:
-        # ── NEW ORDER: Apply cascading logic ──
-        # Case 1: Single product order
-        if product_count == 1:
-            # Sync order status to product (order-to-product sync)
-            if order_status == "Delivered":
-                ddb_products[0]["ProductStatus"] = "Delivered"
-            elif order_status == "In-Progress":
-                ddb_products[0]["ProductStatus"] = "In-Progress"
-            elif order_status == "ToDo":
-                ddb_products[0]["ProductStatus"] = "ToDo"
-        
-        # Case 2: Multiple products order
-        elif product_count > 1:
-            # If order status is directly set to Delivered, mark all products as Delivered
-            if order_status == "Delivered":
-                for product in ddb_products:
-                    product["ProductStatus"] = "Delivered"
-            # If order status is directly set to In-Progress, mark all products as In-Progress
-            elif order_status == "In-Progress":
-                for product in ddb_products:
-                    product["ProductStatus"] = "In-Progress"
-            # If order status is directly set to ToDo, mark all products as ToDo
-            elif order_status == "ToDo":
-                for product in ddb_products:
-                    product["ProductStatus"] = "ToDo"
+        # ── NEW ORDER: the order status cascades to every product ──
+        cascade_order_status(ddb_products, order_status)
     else:
         # ── UPDATE ORDER: Preserve product statuses, don't override ──
         # Product statuses come from the frontend and should be respected
@@ -336,6 +337,8 @@ def build_order_item(order_id: int, payload, ddb_products: list, is_new_order: b
 
     if payload.OrderStartDate is not None:
         item["OrderStartDate"] = payload.OrderStartDate.isoformat() if hasattr(payload.OrderStartDate, 'isoformat') else str(payload.OrderStartDate)
+    elif is_new_order:
+        item["OrderStartDate"] = date.today().isoformat()
     
     if payload.OrderEndDate is not None:
         item["OrderEndDate"] = payload.OrderEndDate.isoformat() if hasattr(payload.OrderEndDate, 'isoformat') else str(payload.OrderEndDate)
@@ -378,34 +381,269 @@ def build_order_item(order_id: int, payload, ddb_products: list, is_new_order: b
     if payload.Carting is not None:
         item["Carting"] = Decimal(str(payload.Carting))
 
-    return item
+    return apply_order_rules(item)
+
+
+def patch_storage_value(value: Any) -> Any:
+    """Convert one PATCH value to its stored form (floats → Decimal, dates → ISO strings)."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def build_order_patch(payload: PatchOrder) -> Tuple[Dict[Any, Any], List[Any], Dict[int, dict]]:
+    """
+    Turn a PATCH body into repository update paths.
+    Returns (updates, remove, product_changes): attribute paths to set, paths
+    to remove (fields sent as null) and the raw per-product changes by index.
+    Product fields are addressed as ("Products", index, Field).
+    """
+    changes = payload.model_dump(exclude_unset=True, exclude={"Products"})
+    product_changes = {
+        index: product.model_dump(exclude_unset=True)
+        for index, product in (payload.Products or {}).items()
+    }
+
+    updates: Dict[Any, Any] = {}
+    remove: List[Any] = []
+    for field, value in changes.items():
+        if value is None:
+            remove.append(field)
+        else:
+            updates[field] = patch_storage_value(value)
+    for index, fields in product_changes.items():
+        for field, value in fields.items():
+            path = ("Products", index, field)
+            if value is None:
+                remove.append(path)
+            else:
+                updates[path] = patch_storage_value(value)
+
+    # Keep the OrderMonthIndex bucket in step with OrderStartDate
+    if "OrderStartDate" in updates:
+        updates[ORDER_MONTH_ATTRIBUTE] = order_month(updates["OrderStartDate"])
+    elif "OrderStartDate" in remove:
+        remove.append(ORDER_MONTH_ATTRIBUTE)
+    return updates, remove, product_changes
+
+
+async def query_order_months(
+    date_from: date,
+    date_to: date,
+    attributes: Optional[List[str]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Live orders with date_from <= OrderStartDate <= date_to, oldest first,
+    read from OrderMonthIndex one month bucket at a time.
+    Without `limit`, every bucket is queried concurrently and all orders are
+    returned. With `limit`, buckets are read in order until the page is full;
+    the cursor records the bucket and the position inside it.
+    Raises ValueError for a malformed cursor.
+    """
+    sort_from, sort_to = date_from.isoformat(), date_to.isoformat()
+    months = month_buckets(date_from, date_to)
+    if limit is None:
+        pages = await asyncio.gather(*[
+            orders_repo.query(ORDER_MONTH_INDEX_NAME, month, sort_from, sort_to, attributes=attributes)
+            for month in months
+        ])
+        return [item for page, _ in pages for item in page], None
+
+    month_cursor = None
+    if cursor:
+        start = decode_cursor(cursor, ("OrderMonth", "Cursor"))
+        if start["OrderMonth"] not in months:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        months = months[months.index(start["OrderMonth"]):]
+        month_cursor = start["Cursor"] or None
+
+    items: List[dict] = []
+    for position, month in enumerate(months):
+        page, month_cursor = await orders_repo.query(
+            ORDER_MONTH_INDEX_NAME, month, sort_from, sort_to,
+            limit=limit - len(items), cursor=month_cursor, attributes=attributes,
+        )
+        items.extend(page)
+        if len(items) >= limit:
+            if month_cursor:
+                return items, encode_cursor({"OrderMonth": month, "Cursor": month_cursor})
+            if position + 1 < len(months):
+                return items, encode_cursor({"OrderMonth": months[position + 1], "Cursor": ""})
+            break
+    return items, None
+
+
+def apply_status_patch(current: dict, updates: dict, remove: list, product_changes: Dict[int, dict]) -> None:
+    """
+    Re-apply the order status rules to a PATCH (updates/remove are changed in place).
+    - A new OrderStatus cascades to every product, as for new orders;
+      ProductStatus values sent in the same PATCH win for their product.
+    - OrderStatus is then derived from the product statuses (derive_order_status)
+      and OpenStatus follows it.
+    - OrderEndDate is set to today when the order becomes Delivered without one.
+    `current` is the stored order (at least Products, OrderStatus, OrderEndDate).
+    """
+    products = current.get("Products", [])
+    statuses = [p.get("ProductStatus", "ToDo") for p in products]
+    if "OrderStatus" in updates:
+        statuses = [updates["OrderStatus"]] * len(statuses)
+    for index, fields in product_changes.items():
+        if fields.get("ProductStatus"):
+            statuses[index] = fields["ProductStatus"]
+    for index, status in enumerate(statuses):
+        if status != products[index].get("ProductStatus"):
+            updates[("Products", index, "ProductStatus")] = status
+
+    order_status = derive_order_status(statuses, updates.get("OrderStatus", current.get("OrderStatus")))
+    updates["OrderStatus"] = order_status
+    if open_status(order_status):
+        updates[OPEN_STATUS_ATTRIBUTE] = order_status
+    else:
+        remove.append(OPEN_STATUS_ATTRIBUTE)
+
+    end_date_missing = "OrderEndDate" in remove or not current.get("OrderEndDate")
+    if order_status == "Delivered" and "OrderEndDate" not in updates and end_date_missing:
+        updates["OrderEndDate"] = date.today().isoformat()
+        if "OrderEndDate" in remove:
+            remove.remove("OrderEndDate")
 
 
-@router.get("/orders", response_model=List[Order])
-def list_orders():
-    """Retrieve all orders from DynamoDB."""
+def product_count_expectations(current: dict) -> Dict[Any, Any]:
+    """
+    Paths that pin the product count read in `current`: the last product is
+    still there and none follows it, so Products[i] paths stay valid.
+    """
+    count = len(current.get("Products", []))
+    expect: Dict[Any, Any] = {("Products", count): None}
+    if count:
+        expect[("Products", count - 1)] = PRESENT
+    return expect
+
+
+def status_expectations(current: dict) -> Dict[Any, Any]:
+    """
+    Paths that must still hold the values read in `current` for a status
+    write to apply: every product's status, the product count and OrderEndDate.
+    """
+    products = current.get("Products", [])
+    expect: Dict[Any, Any] = {
+        ("Products", index, "ProductStatus"): product.get("ProductStatus")
+        for index, product in enumerate(products)
+    }
+    expect.update(product_count_expectations(current))
+    expect["OrderEndDate"] = current.get("OrderEndDate")
+    return expect
+
+
+def check_product_indexes(order_id: int, current: dict, indexes) -> None:
+    """400 if any of `indexes` is not a product position of the stored order."""
+    product_count = len(current.get("Products", []))
+    missing = [i for i in indexes if not 0 <= i < product_count]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Order {order_id} has no product at index {missing[0]} ({product_count} product(s))",
+        )
+
+
+async def write_status_patch(order_id: int, updates: dict, remove: list, product_changes: Dict[int, dict]) -> dict:
+    """
+    Apply a status-changing patch as one conditional UpdateItem.
+    The order's statuses are read, the status rules applied, and the write is
+    guarded on the statuses read (status_expectations). If another request
+    changed them in between, the read and write are retried.
+    """
+    for attempt in range(1, MAX_STATUS_UPDATE_ATTEMPTS + 1):
+        current = await orders_repo.get(order_id, STATUS_ATTRIBUTES)
+        if not current or is_item_deleted(current):
+            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+        check_product_indexes(order_id, current, product_changes)
+
+        attempt_updates, attempt_remove = dict(updates), list(remove)
+        apply_status_patch(current, attempt_updates, attempt_remove, product_changes)
+        try:
+            return await orders_repo.update(
+                order_id, attempt_updates, attempt_remove, condition=LIVE, expect=status_expectations(current)
+            )
+        except ConditionFailed:
+            logger.warning(f"⚠️ Order {order_id} changed during a status update (attempt {attempt})")
+            await asyncio.sleep(random.uniform(0, STATUS_RETRY_BACKOFF * attempt))
+    raise HTTPException(status_code=409, detail=f"Order {order_id} is being updated concurrently, please retry")
+
+
+@router.get("/orders", response_model=Union[List[Order], OrderPage])
+async def list_orders(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
+    date_from: Optional[date] = Query(None, alias="from", description="Earliest OrderStartDate (YYYY-MM-DD); needs 'to'"),
+    date_to: Optional[date] = Query(None, alias="to", description="Latest OrderStartDate (YYYY-MM-DD); needs 'from'"),
+):
+    """
+    Retrieve orders from DynamoDB.
+    Without limit/cursor: all orders as a plain list (original response shape).
+    With limit and/or cursor: one page as {items, next_cursor}.
+    With fields: only those attributes are read and returned.
+    With from/to: only orders starting in that window, oldest first, read
+    from the OrderMonthIndex buckets the window covers.
+    """
     try:
-        logger.info("📋 Fetching all orders from DynamoDB")
-        response = orders_table.scan()
-        items = filter_deleted_items(response.get("Items", []))
-        converted_items = convert_items_to_python(items)
-        
-        # ── NEW: Auto-update order status based on product statuses ──────────
-        for order in converted_items:
-            products = order.get("Products", [])
-            if products:
-                # If all products are "Delivered", set order status to "Delivered"
-                if all(p.get("ProductStatus") == "Delivered" for p in products):
-                    order["OrderStatus"] = "Delivered"
-                # If all products are "In-Progress", set order status to "In-Progress"
-                elif all(p.get("ProductStatus") == "In-Progress" for p in products):
-                    order["OrderStatus"] = "In-Progress"
-                # If all products are "ToDo", set order status to "ToDo"
-                elif all(p.get("ProductStatus") == "ToDo" for p in products):
-                    order["OrderStatus"] = "ToDo"
-        
+        try:
+            selected = parse_fields(fields, ORDER_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # The sparse ActiveIndex only holds orders that are not soft-deleted
+        attributes = projection_attributes(selected, ORDER_FIELD_ATTRIBUTES)
+
+        def to_response(item: dict) -> dict:
+            # Items from the client read path are already JSON-ready (no Decimals)
+            return trim(item, selected, Order) if selected else item
+
+        if date_from or date_to:
+            if not (date_from and date_to):
+                raise HTTPException(status_code=400, detail="A date range needs both 'from' and 'to'")
+            if date_from > date_to:
+                raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+            paged = limit is not None or cursor is not None
+            logger.info(f"📋 Fetching orders started {date_from} → {date_to}")
+            try:
+                items, next_cursor = await query_order_months(
+                    date_from, date_to, attributes, limit=(limit or DEFAULT_PAGE_SIZE) if paged else None, cursor=cursor
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            converted_items = [to_response(item) for item in items]
+            logger.info(f"✓ Successfully retrieved {len(converted_items)} orders")
+            result = {"items": converted_items, "next_cursor": next_cursor} if paged else converted_items
+            return JSONResponse(result) if selected else result
+
+        if limit is None and cursor is None:
+            logger.info("📋 Fetching all orders from DynamoDB")
+            items = await orders_repo.scan(index=ACTIVE_INDEX_NAME, attributes=attributes)
+            converted_items = [to_response(item) for item in items]
+            logger.info(f"✓ Successfully retrieved {len(converted_items)} orders")
+            # Trimmed records bypass response_model, which would re-add every unrequested field
+            return JSONResponse(converted_items) if selected else converted_items
+
+        page_size = limit or DEFAULT_PAGE_SIZE
+        logger.info(f"📋 Fetching a page of up to {page_size} orders from DynamoDB")
+        try:
+            items, next_cursor = await orders_repo.scan_page(
+                page_size, cursor, index=ACTIVE_INDEX_NAME, attributes=attributes
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        converted_items = [to_response(item) for item in items]
         logger.info(f"✓ Successfully retrieved {len(converted_items)} orders")
-        return converted_items
+        page = {"items": converted_items, "next_cursor": next_cursor}
+        return JSONResponse(page) if selected else page
+    except HTTPException:
+        raise
     except ClientError as e:
         logger.error(f"❌ DynamoDB ClientError listing orders: {str(e)}")
         raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
@@ -415,30 +653,153 @@ def list_orders():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/agents/{agent_id}/orders", response_model=OrderPage)
+async def list_agent_orders(
+    agent_id: str,
+    date_from: Optional[date] = Query(None, alias="from", description="Earliest OrderStartDate (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Latest OrderStartDate (YYYY-MM-DD)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """
+    One agent's orders, newest OrderStartDate first, as {items, next_cursor}.
+    Queries the AgentOrdersIndex GSI, so reads scale with the agent's orders
+    in the date range rather than with the whole table.
+    """
+    try:
+        try:
+            selected = parse_fields(fields, ORDER_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if date_from and date_to and date_from > date_to:
+            raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+        logger.info(f"📋 Fetching up to {limit} orders of agent {agent_id} ({date_from} → {date_to})")
+        try:
+            items, next_cursor = await orders_repo.query(
+                AGENT_ORDERS_INDEX_NAME,
+                agent_id,
+                sort_from=date_from.isoformat() if date_from else None,
+                sort_to=date_to.isoformat() if date_to else None,
+                descending=True,
+                limit=limit,
+                cursor=cursor,
+                attributes=projection_attributes(selected, ORDER_FIELD_ATTRIBUTES, extra=("deleted",)),
+                keep=lambda item: not is_item_deleted(item),
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        logger.info(f"✓ Retrieved {len(items)} orders of agent {agent_id}")
+        if selected:
+            return JSONResponse({"items": [trim(o, selected, Order) for o in items], "next_cursor": next_cursor})
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except ClientError as e:
+        logger.error(f"❌ DynamoDB ClientError listing orders of agent {agent_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
+    except Exception as e:
+        logger.error(f"❌ Unexpected error listing orders of agent {agent_id}: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/orders/recent", response_model=List[Order])
+async def list_recent_orders(
+    n: int = Query(10, ge=1, le=MAX_PAGE_SIZE, description="How many orders to return"),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """
+    The `n` most recent orders by OrderStartDate, newest first.
+    Walks OrderMonthIndex back from the current month with descending,
+    limited queries until it has `n` orders (or RECENT_ORDERS_MAX_MONTHS
+    months were read), so it reads about `n` items instead of the table.
+    """
+    try:
+        try:
+            selected = parse_fields(fields, ORDER_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        attributes = projection_attributes(selected, ORDER_FIELD_ATTRIBUTES)
+        logger.info(f"📋 Fetching the {n} most recent orders")
+        items: List[dict] = []
+        for month in months_back(date.today(), RECENT_ORDERS_MAX_MONTHS):
+            page, _ = await orders_repo.query(
+                ORDER_MONTH_INDEX_NAME, month, descending=True, limit=n - len(items), attributes=attributes
+            )
+            items.extend(page)
+            if len(items) >= n:
+                break
+        logger.info(f"✓ Retrieved {len(items)} recent orders")
+        if selected:
+            return JSONResponse([trim(o, selected, Order) for o in items])
+        return items
+    except HTTPException:
+        raise
+    except ClientError as e:
+        logger.error(f"❌ DynamoDB ClientError listing recent orders: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
+    except Exception as e:
+        logger.error(f"❌ Unexpected error listing recent orders: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/orders/open", response_model=List[Order])
+async def list_open_orders(
+    status: Optional[str] = Query(None, description="ToDo or In-Progress (both when omitted)"),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """
+    Orders that are not Delivered (the work-in-progress view), oldest first.
+    Reads only the sparse OpenOrdersIndex GSI, so delivered orders cost nothing.
+    """
+    try:
+        try:
+            selected = parse_fields(fields, ORDER_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if status is not None and status not in OPEN_STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(OPEN_STATUSES)}")
+
+        statuses = [status] if status else list(OPEN_STATUSES)
+        attributes = projection_attributes(selected, ORDER_FIELD_ATTRIBUTES, extra=("OrderId",))
+        logger.info(f"📋 Fetching open orders ({', '.join(statuses)})")
+        pages = await asyncio.gather(*[
+            orders_repo.query(OPEN_ORDERS_INDEX_NAME, s, attributes=attributes) for s in statuses
+        ])
+        items = sorted((item for page, _ in pages for item in page), key=lambda o: int(o["OrderId"]))
+        logger.info(f"✓ Retrieved {len(items)} open orders")
+        if selected:
+            return JSONResponse([trim(o, selected, Order) for o in items])
+        return items
+    except HTTPException:
+        raise
+    except ClientError as e:
+        logger.error(f"❌ DynamoDB ClientError listing open orders: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
+    except Exception as e:
+        logger.error(f"❌ Unexpected error listing open orders: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/orders/{order_id}", response_model=Order)
-def get_order(order_id: int):
-    """Retrieve a specific order by Order ID."""
+async def get_order(order_id: int, fields: Optional[str] = FIELDS_QUERY):
+    """Retrieve a specific order by Order ID (optionally only the given fields)."""
     try:
-        response = orders_table.get_item(Key={"OrderId": order_id})
-        order = response.get("Item")
+        try:
+            selected = parse_fields(fields, ORDER_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        attributes = projection_attributes(selected, ORDER_FIELD_ATTRIBUTES, extra=("deleted",))
+        order = await orders_repo.get(order_id, attributes)
         if not order or is_item_deleted(order):
             raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
-        order = convert_item_to_python(order)
-        
-        # ── Auto-update order status based on product statuses ──────────
-        products = order.get("Products", [])
-        if products:
-            # If all products are "Delivered", set order status to "Delivered"
-            if all(p.get("ProductStatus") == "Delivered" for p in products):
-                order["OrderStatus"] = "Delivered"
-            # If all products are "In-Progress", set order status to "In-Progress"
-            elif all(p.get("ProductStatus") == "In-Progress" for p in products):
-                order["OrderStatus"] = "In-Progress"
-            # If all products are "ToDo", set order status to "ToDo"
-            elif all(p.get("ProductStatus") == "ToDo" for p in products):
-                order["OrderStatus"] = "ToDo"
-        
-        return order
+        return JSONResponse(trim(order, selected, Order)) if selected else order
     except HTTPException:
         raise
     except ClientError as e:
@@ -449,25 +810,36 @@ def get_order(order_id: int):
 
 
 @router.post("/orders", response_model=Order)
-def create_order(payload: CreateOrder):
+async def create_order(payload: CreateOrder):
     """Create a new order in DynamoDB with multiple products."""
     try:
-        from datetime import date
-        
         # ✓ Validate AgentId is provided and not empty
         if not payload.AgentId or (isinstance(payload.AgentId, str) and not payload.AgentId.strip()):
             raise HTTPException(status_code=422, detail="AgentId is required and cannot be empty")
         
         logger.info(f"➕ Creating new order with {len(payload.Products)} product(s), AgentId: {payload.AgentId}")
-        order_id = generate_order_id(payload.AgentId)
         ddb_products = build_products_for_storage(payload.Products)
-        item = build_order_item(order_id, payload, ddb_products, is_new_order=True)
-        
-        # Set OrderStartDate to today if not provided
-        if "OrderStartDate" not in item or item["OrderStartDate"] is None:
-            item["OrderStartDate"] = date.today().isoformat()
-        
-        orders_table.put_item(Item=item)
+
+        for _ in range(MAX_ORDER_ID_ATTEMPTS):
+            try:
+                order_id = await generate_order_id(payload.AgentId)
+            except ClientError as e:
+                # No fallback id: a timestamp could collide and would hide a missing Counters table
+                logger.error(f"❌ OrderId counter unavailable: {e.response['Error']['Message']}")
+                raise HTTPException(status_code=503, detail="Could not allocate an OrderId, please retry")
+            item = mark_active(build_order_item(order_id, payload, ddb_products, is_new_order=True), "OrderId")
+            
+            try:
+                # Never overwrite an existing order, even if the counter and the table disagree
+                await orders_repo.put(item, condition=NOT_EXISTS)
+                break
+            except ConditionFailed:
+                logger.warning(f"⚠️ OrderId {order_id} already exists, generating a new one")
+        else:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Could not allocate a free OrderId after {MAX_ORDER_ID_ATTEMPTS} attempts, please retry",
+            )
         logger.info(f"✓ Order {order_id} created with AgentId {payload.AgentId} and {len(ddb_products)} product(s)")
         return convert_item_to_python(item)
     except HTTPException:
@@ -480,28 +852,24 @@ def create_order(payload: CreateOrder):
 
 
 @router.put("/orders/{order_id}", response_model=Order)
-def update_order(order_id: int, payload: UpdateOrder):
+async def update_order(order_id: int, payload: UpdateOrder):
     """Update an existing order in DynamoDB."""
     try:
-        from datetime import date
-        
         # ✓ Validate AgentId is provided and not empty
         if not payload.AgentId or (isinstance(payload.AgentId, str) and not payload.AgentId.strip()):
             raise HTTPException(status_code=422, detail="AgentId is required and cannot be empty")
         
         logger.info(f"✏️ Updating order {order_id} with AgentId: {payload.AgentId} and {len(payload.Products)} product(s)")
-        existing = orders_table.get_item(Key={"OrderId": order_id}).get("Item")
-        if not existing or is_item_deleted(existing):
-            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
         ddb_products = build_products_for_storage(payload.Products)
         item = build_order_item(order_id, payload, ddb_products, is_new_order=False)
-        item["deleted"] = existing.get("deleted", False)
-        
-        # Auto-set OrderEndDate to today when status is changed to "Delivered"
-        if payload.OrderStatus == "Delivered" and payload.OrderEndDate is None:
-            item["OrderEndDate"] = date.today().isoformat()
+        item["deleted"] = False
+        mark_active(item, "OrderId")
         
-        orders_table.put_item(Item=item)
+        # Single round trip: the write only applies to an existing, non-deleted order
+        try:
+            await orders_repo.put(item, condition=LIVE)
+        except ConditionFailed:
+            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
         logger.info(f"✓ Order {order_id} updated with AgentId {payload.AgentId} and {len(ddb_products)} product(s)")
         return convert_item_to_python(item)
     except HTTPException:
@@ -513,18 +881,95 @@ def update_order(order_id: int, payload: UpdateOrder):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.patch("/orders/{order_id}", response_model=Order)
+async def patch_order(order_id: int, payload: PatchOrder):
+    """
+    Partially update an order with a single UpdateItem.
+    Only the fields present in the body are written; null removes a field.
+    Products are addressed by position: {"Products": {"0": {"ProductStatus": "Delivered"}}}.
+    Patches touching products or statuses, or removing OrderEndDate, read the
+    order first to check the product positions and apply the status rules
+    (see apply_status_patch), so a Delivered order keeps an OrderEndDate.
+    """
+    try:
+        if payload.AgentId is not None and not payload.AgentId.strip():
+            raise HTTPException(status_code=422, detail="AgentId cannot be empty")
+        if "AgentId" in payload.model_fields_set and payload.AgentId is None:
+            raise HTTPException(status_code=422, detail="AgentId is required and cannot be removed")
+
+        updates, remove, product_changes = build_order_patch(payload)
+        if not updates and not remove:
+            raise HTTPException(status_code=400, detail="No fields to update")
+
+        logger.info(f"🩹 Patching order {order_id}: set {list(updates)}, remove {remove}")
+        status_changed = "OrderStatus" in updates or any("ProductStatus" in f for f in product_changes.values())
+        if status_changed or "OrderEndDate" in remove:
+            order = await write_status_patch(order_id, updates, remove, product_changes)
+        elif product_changes:
+            current = await orders_repo.get(order_id, ["Products", "deleted"])
+            if not current or is_item_deleted(current):
+                raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+            check_product_indexes(order_id, current, product_changes)
+            try:
+                # Products[i] paths are only valid while the product count read still holds
+                order = await orders_repo.update(
+                    order_id, updates, remove, condition=LIVE, expect=product_count_expectations(current)
+                )
+            except ConditionFailed:
+                raise HTTPException(status_code=409, detail=f"Order {order_id} was changed concurrently, please retry")
+        else:
+            try:
+                order = await orders_repo.update(order_id, updates, remove, condition=LIVE)
+            except ConditionFailed:
+                raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+        logger.info(f"✓ Order {order_id} patched")
+        return order
+    except HTTPException:
+        raise
+    except ClientError as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
+    except Exception as e:
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/orders/{order_id}/products/{index}/status", response_model=Order)
+async def update_product_status(order_id: int, index: int, payload: ProductStatusUpdate):
+    """
+    Move one product (by position in the order) to a new status.
+    Products[index].ProductStatus, the derived OrderStatus and, on delivery,
+    OrderEndDate are written in one conditional UpdateItem.
+    """
+    try:
+        status = payload.ProductStatus
+        logger.info(f"🔁 Order {order_id}: product {index} → {status}")
+        order = await write_status_patch(
+            order_id,
+            {("Products", index, "ProductStatus"): status},
+            [],
+            {index: {"ProductStatus": status}},
+        )
+        logger.info(f"✓ Order {order_id} product {index} is {status}; order is {order.get('OrderStatus')}")
+        return order
+    except HTTPException:
+        raise
+    except ClientError as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {e.response['Error']['Message']}")
+    except Exception as e:
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/orders/{order_id}")
-def delete_order(order_id: int):
+async def delete_order(order_id: int):
     """Delete an order from DynamoDB."""
     try:
-        existing = orders_table.get_item(Key={"OrderId": order_id}).get("Item")
-        if not existing or is_item_deleted(existing):
+        try:
+            await orders_repo.update(
+                order_id, {"deleted": True}, remove=["Active", OPEN_STATUS_ATTRIBUTE, ORDER_MONTH_ATTRIBUTE], condition=LIVE
+            )
+        except ConditionFailed:
             raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
-        orders_table.update_item(
-            Key={"OrderId": order_id},
-            UpdateExpression="SET deleted = :deleted",
-            ExpressionAttributeValues={":deleted": True},
-        )
         logger.info(f"✓ Order {order_id} soft deleted")
         return {"success": True, "orderId": order_id, "message": f"Order {order_id} deleted successfully"}
     except HTTPException:
@@ -1,17 +1,48 @@
 import logging
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import Iterable, List, Optional, Sequence
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from botocore.exceptions import ClientError
 from pydantic import ValidationError
 
-from schemas.party import Party, CreateParty, UpdateParty
-from utils.helpers import aws_error_detail, normalize_party_item, get_next_party_id
-from utils.dynamodb_utils import filter_deleted_items, is_item_deleted
-from db.dynamodb import party_table
+from schemas.party import Party, PartyLightweight, PartyPage, PartySearchResult, PartySuggestion, CreateParty, UpdateParty
+from utils.helpers import PARTY_FIELD_ATTRIBUTES, aws_error_detail, normalize_party_item, get_next_party_id
+from utils.dynamodb_utils import is_item_deleted, mark_active
+from utils.fieldsets import parse_fields, projection_attributes, trim
+from utils.party_names import PARTY_NAME_KEY_ATTRIBUTE, apply_party_name_key, normalize_party_name
+from utils.party_directory import PartyDirectory
+from utils.party_search import PartySearchIndexes, search_results
+from utils.party_unique import UNIQUE_FIELDS, guard_item, unique_keys
+from config.settings import (
+    ACTIVE_INDEX_NAME,
+    AGENT_PARTIES_INDEX_NAME,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    PARTY_DIRECTORY_TTL,
+    PARTY_INDEX_TTL,
+    PARTY_NAME_INDEX_NAME,
+)
+from db.repositories import party_repo, party_unique_repo
+from db.repository import LIVE, NOT_EXISTS, ConditionFailed, Put, TransactionCanceled, transact
+from db.sequences import MAX_ID_ATTEMPTS
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
+FIELDS_QUERY = Query(None, description="Comma-separated Party fields to return, e.g. partyId,partyName,city")
+
+# In-memory indexes behind GET /party/suggest and GET /party/search, kept
+# current by this process's create/update/delete (utils/party_search.py)
+party_search = PartySearchIndexes(party_repo, ACTIVE_INDEX_NAME, PARTY_INDEX_TTL)
+# Encoded GET /party/lightweight body, dropped by this process's party writes
+party_directory = PartyDirectory(party_repo, ACTIVE_INDEX_NAME, PARTY_DIRECTORY_TTL)
+
+# How many times a party write is retried after the stored Mobile1/Email turned
+# out to differ from the expected ones, or only stale uniqueness guards (left by
+# a deleted party, or one whose Mobile1/Email changed) were in the way
+MAX_UNIQUE_WRITE_ATTEMPTS = 4
+
 
 def format_validation_errors(errors: list) -> str:
     """Format Pydantic validation errors into a readable message"""
@@ -23,11 +54,133 @@ def format_validation_errors(errors: list) -> str:
     return "; ".join(error_messages)
 
 
+async def release_unique_keys(party_id: int, keys: Iterable[str]) -> None:
+    """Delete the uniqueness guards `party_id` holds for `keys` (guards of other parties are left alone)."""
+    for key in keys:
+        try:
+            await party_unique_repo.delete(key, expect={"PartyId": party_id})
+        except ConditionFailed:
+            pass
+
+
+async def unique_key_owner(unique_key: str) -> Optional[dict]:
+    """
+    The live party holding `unique_key`, or None. A stale guard (its party
+    was deleted or no longer has the value) is released on the way.
+    """
+    guard = await party_unique_repo.get(unique_key)
+    if guard is None:
+        return None
+    owner = await party_repo.get(guard["PartyId"])
+    if owner and not is_item_deleted(owner) and unique_key in unique_keys(owner):
+        return owner
+    await release_unique_keys(guard["PartyId"], [unique_key])
+    return None
+
+
+def duplicate_error(item: dict, attribute: str, owner: dict) -> HTTPException:
+    """409 for a party whose `attribute` value is already used by the live party `owner`."""
+    label = UNIQUE_FIELDS[attribute][1]
+    existing_id = normalize_party_item(owner)["partyId"]
+    return HTTPException(
+        status_code=409,
+        detail=f"{label} {item[attribute]} is already used by party {existing_id} ({owner.get('PartyName')})",
+    )
+
+
+async def check_unique(item: dict) -> None:
+    """
+    Raise the 409 of write_party up front if another live party already holds
+    one of the item's Mobile1/Email values. A cheap read that lets create
+    fail before allocating a PartyId; write_party's transaction stays the guard.
+    """
+    for key, attribute in unique_keys(item).items():
+        owner = await unique_key_owner(key)
+        if owner:
+            raise duplicate_error(item, attribute, owner)
+
+
+async def write_party(
+    item: dict,
+    condition: Optional[str],
+    previous: Optional[dict] = None,
+    keep: Sequence[str] = (),
+) -> None:
+    """
+    Write a party item. Guards for the Mobile1/Email values it gains over
+    `previous` are written in the same transaction, so a value another party
+    already uses fails that one conditional write with a 409 naming the
+    party. Guards of values it dropped are released afterwards.
+
+    `previous` holds the Mobile1/Email the stored party is expected to have
+    (None for a new party). The write only applies while the stored values
+    match; otherwise the failed transaction returns the stored party and the
+    write is retried against it, so an update learns the values it replaces
+    without reading the party first. Attributes named in `keep` are taken
+    over from the stored party the same way.
+    Raises ConditionFailed if `condition` does not hold for the party.
+    """
+    party_id = item["PartyId"]
+    keys = unique_keys(item)
+
+    for _ in range(MAX_UNIQUE_WRITE_ATTEMPTS):
+        previous_keys = unique_keys(previous)
+        added = [key for key in keys if key not in previous_keys]
+        guards = [Put(party_unique_repo, guard_item(key, party_id), NOT_EXISTS) for key in added]
+        expect = None
+        if previous is not None:
+            expect = {attribute: previous.get(attribute) for attribute in UNIQUE_FIELDS}
+            expect.update((attribute, item.get(attribute)) for attribute in keep)
+        try:
+            if guards or expect:
+                await transact([Put(party_repo, item, condition, expect), *guards])
+            else:
+                await party_repo.put(item, condition=condition)
+            break
+        except TransactionCanceled as e:
+            if 0 in e.failed:
+                stored = e.items.get(0)
+                if previous is None or stored is None or is_item_deleted(stored):
+                    raise
+                # The stored party holds other values than expected: retry against them
+                previous = stored
+                for attribute in keep:
+                    if stored.get(attribute) is None:
+                        item.pop(attribute, None)
+                    else:
+                        item[attribute] = stored[attribute]
+                continue
+            for position in e.failed:
+                key = added[position - 1]
+                owner = await unique_key_owner(key)
+                if owner:
+                    raise duplicate_error(item, keys[key], owner)
+    else:
+        raise HTTPException(status_code=409, detail=f"Party {party_id} is being updated concurrently, please retry")
+
+    await release_unique_keys(party_id, [key for key in previous_keys if key not in keys])
+
+
 @router.get("/party", response_model=List[Party])
-def list_parties():
+async def list_parties(fields: Optional[str] = FIELDS_QUERY):
     try:
-        items = filter_deleted_items(party_table.scan().get("Items", []))
-        return [normalize_party_item(x) for x in items]
+        try:
+            selected = parse_fields(fields, PARTY_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # The sparse ActiveIndex only holds parties that are not soft-deleted
+        items = await party_repo.scan(
+            index=ACTIVE_INDEX_NAME,
+            attributes=projection_attributes(selected, PARTY_FIELD_ATTRIBUTES),
+        )
+        parties = [normalize_party_item(x) for x in items]
+        if selected:
+            # Trimmed records bypass response_model, which would require every field
+            return JSONResponse(jsonable_encoder([trim(p, selected) for p in parties]))
+        return parties
+    except HTTPException:
+        raise
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
     except Exception as e:
@@ -35,25 +188,92 @@ def list_parties():
         raise HTTPException(status_code=500, detail="Failed to fetch parties")
 
 
+@router.get("/party/lightweight", response_model=List[PartyLightweight])
+async def list_parties_lightweight(if_none_match: Optional[str] = Header(None)):
+    """
+    Returns a lightweight list of all parties: just PartyId and PartyName.
+    PartyId is formatted as string (e.g., "A01P001").
+    Served from an in-process cache with an ETag; a matching If-None-Match gets 304.
+    """
+    try:
+        body, etag = await party_directory.get()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except ClientError as e:
+        raise HTTPException(status_code=500, detail=aws_error_detail(e))
+    except Exception as e:
+        logger.error(f"Error listing lightweight parties: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch parties")
+
+
+@router.get("/agents/{agent_id}/parties", response_model=PartyPage)
+async def list_agent_parties(
+    agent_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """
+    One agent's parties in PartyId order, as {items, next_cursor}.
+    Queries the AgentPartiesIndex GSI, so reads scale with the agent's
+    parties rather than with the whole table.
+    """
+    try:
+        # Convert formatted string ID back to numeric (e.g., "A01" -> 1)
+        try:
+            numeric_agent_id = int(agent_id[1:] if agent_id.startswith("A") else agent_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Agent ID")
+
+        try:
+            selected = parse_fields(fields, PARTY_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        try:
+            items, next_cursor = await party_repo.query(
+                AGENT_PARTIES_INDEX_NAME,
+                numeric_agent_id,
+                limit=limit,
+                cursor=cursor,
+                attributes=projection_attributes(selected, PARTY_FIELD_ATTRIBUTES, extra=("deleted",)),
+                keep=lambda item: not is_item_deleted(item),
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        parties = [normalize_party_item(x) for x in items]
+        if selected:
+            page = {"items": [trim(p, selected) for p in parties], "next_cursor": next_cursor}
+            return JSONResponse(jsonable_encoder(page))
+        return {"items": parties, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except ClientError as e:
+        logger.error(f"DynamoDB error listing parties of agent {agent_id}: {aws_error_detail(e)}")
+        raise HTTPException(status_code=500, detail=aws_error_detail(e))
+    except Exception as e:
+        logger.error(f"Unexpected error listing parties of agent {agent_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch agent parties")
+
+
 # ── NEW: Lookup party by Party Name ───────────────────────────────
 @router.get("/party/by-name/{party_name}", response_model=Party)
-def get_party_by_name(party_name: str):
+async def get_party_by_name(party_name: str):
     """
-    Scan the Party table for a record whose PartyName matches
-    the given party_name (case-insensitive). Returns the first match.
+    Find the party whose PartyName matches the given party_name, ignoring
+    case and extra whitespace. Returns the first match (lowest PartyId).
+    One Query on PartyNameIndex, however many parties there are.
     Used by the Old Order flow to auto-fill the New Order form.
     """
     try:
         logger.info(f"🔍 Looking up party by name: {party_name}")
-        response = party_table.scan()
-        items = response.get("Items", [])
-
-        # Case-insensitive match on PartyName
-        match = next(
-            (item for item in filter_deleted_items(items)
-             if str(item.get("PartyName", "")).lower() == party_name.lower()),
-            None,
-        )
+        match = None
+        name_key = normalize_party_name(party_name)
+        if name_key:
+            items, _ = await party_repo.query(PARTY_NAME_INDEX_NAME, name_key, limit=1)
+            match = items[0] if items else None
 
         if not match:
             logger.warning(f"⚠️ No party found with name: {party_name}")
@@ -76,8 +296,55 @@ def get_party_by_name(party_name: str):
 # ─────────────────────────────────────────────────────────────────
 
 
+@router.get("/party/suggest", response_model=List[PartySuggestion])
+async def suggest_parties(
+    q: str = Query(..., min_length=1, description="What the user typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+):
+    """
+    Party autocomplete: parties whose PartyName or AliasOrCompanyName has a
+    word starting with `q` (case and spacing ignored). Served from the
+    in-memory prefix index, so a warm process does no DynamoDB read.
+    """
+    try:
+        prefix = normalize_party_name(q)
+        if not prefix:
+            return []
+        index = await party_search.prefix()
+        return index.search(prefix, limit)
+    except ClientError as e:
+        logger.error(f"DynamoDB error building party suggestions: {aws_error_detail(e)}")
+        raise HTTPException(status_code=500, detail=aws_error_detail(e))
+    except Exception as e:
+        logger.error(f"Unexpected error suggesting parties: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to suggest parties")
+
+
+@router.get("/party/search", response_model=List[PartySearchResult])
+async def search_parties(
+    q: str = Query(..., min_length=1, description="Search text; misspellings and abbreviations are tolerated"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results"),
+    min_score: float = Query(0.3, ge=0, le=1, alias="minScore", description="Minimum similarity, 0-1"),
+):
+    """
+    Fuzzy party search over PartyName, AliasOrCompanyName, the contact
+    persons and City, ranked by trigram similarity of the best matching
+    field ("Mehta Ind." finds "Mehta Industries"). Served from the
+    in-memory trigram index, so a warm process does no DynamoDB read.
+    """
+    try:
+        index = await party_search.trigram()
+        return search_results(index.search(q, limit, min_score))
+    except ClientError as e:
+        logger.error(f"DynamoDB error building party search index: {aws_error_detail(e)}")
+        raise HTTPException(status_code=500, detail=aws_error_detail(e))
+    except Exception as e:
+        logger.error(f"Unexpected error searching parties: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search parties")
+
+
 @router.get("/party/{party_id}", response_model=Party)
-def get_party(party_id: str):
+async def get_party(party_id: str, fields: Optional[str] = FIELDS_QUERY):
     try:
         if not party_id or not party_id.strip():
             raise HTTPException(status_code=400, detail="Party ID is required")
@@ -96,10 +363,17 @@ def get_party(party_id: str):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Party ID")
 
-        item = party_table.get_item(Key={"PartyId": numeric_id}).get("Item")
+        try:
+            selected = parse_fields(fields, PARTY_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        attributes = projection_attributes(selected, PARTY_FIELD_ATTRIBUTES, extra=("deleted",))
+        item = await party_repo.get(numeric_id, attributes)
         if not item or is_item_deleted(item):
             raise HTTPException(status_code=404, detail="Party not found")
-        return normalize_party_item(item)
+        party = normalize_party_item(item)
+        return JSONResponse(jsonable_encoder(trim(party, selected))) if selected else party
     except ClientError as e:
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
     except HTTPException:
@@ -110,7 +384,7 @@ def get_party(party_id: str):
 
 
 @router.post("/party", response_model=Party)
-def create_party(payload: CreateParty):
+async def create_party(payload: CreateParty):
     try:
         # Get numeric agent_id - convert from formatted string if needed
         agent_id = payload.agentId
@@ -133,30 +407,45 @@ def create_party(payload: CreateParty):
         if not numeric_agent_id:
             numeric_agent_id = 1  # Default agent
         
-        party_id_num = get_next_party_id(numeric_agent_id)
-
-        item = {
-            "PartyId": party_id_num,
-            "PartyName": payload.partyName,
-            "AliasOrCompanyName": payload.aliasOrCompanyName,
-            "Contact_Person1": payload.contact_Person1,
-            "Contact_Person2": payload.contact_Person2,
-            "Mobile1": payload.mobile1,
-            "Mobile2": payload.mobile2,
-            "Email": payload.email,
-            "Address": payload.address,
-            "City": payload.city,
-            "State": payload.state,
-            "Pincode": payload.pincode,
-            "AgentId": numeric_agent_id,
-            "deleted": False,
-        }
+        # Reject a known duplicate before it uses up a PartyId
+        await check_unique({"Mobile1": payload.mobile1, "Email": payload.email})
+        for _ in range(MAX_ID_ATTEMPTS):
+            party_id_num = await get_next_party_id(numeric_agent_id)
+
+            item = {
+                "PartyId": party_id_num,
+                "PartyName": payload.partyName,
+                "AliasOrCompanyName": payload.aliasOrCompanyName,
+                "Contact_Person1": payload.contact_Person1,
+                "Contact_Person2": payload.contact_Person2,
+                "Mobile1": payload.mobile1,
+                "Mobile2": payload.mobile2,
+                "Email": payload.email,
+                "Address": payload.address,
+                "City": payload.city,
+                "State": payload.state,
+                "Pincode": payload.pincode,
+                "AgentId": numeric_agent_id,
+                "deleted": False,
+            }
 
-        party_table.put_item(Item=item)
+            try:
+                # Never overwrite an existing party, even if the counter is behind the table
+                await write_party(apply_party_name_key(mark_active(item, "PartyId")), NOT_EXISTS)
+                break
+            except ConditionFailed:
+                logger.warning(f"PartyId {party_id_num} already exists, allocating a new one")
+        else:
+            raise HTTPException(status_code=503, detail="Could not allocate a free Party ID, please retry")
+        party_search.put(item)
+        party_directory.invalidate()
 
         logger.info(f"Party created successfully with ID: {party_id_num}")
         return normalize_party_item(item)
 
+    except HTTPException:
+        raise
+
     except ValidationError as e:
         error_detail = format_validation_errors(e.errors())
         logger.warning(f"Validation error creating party: {error_detail}")
@@ -172,7 +461,7 @@ def create_party(payload: CreateParty):
 
 
 @router.put("/party/{party_id}", response_model=Party)
-def update_party(party_id: str, payload: UpdateParty):
+async def update_party(party_id: str, payload: UpdateParty):
     try:
         if not party_id or not party_id.strip():
             raise HTTPException(status_code=400, detail="Party ID is required")
@@ -190,23 +479,20 @@ def update_party(party_id: str, payload: UpdateParty):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Party ID")
 
-        existing = party_table.get_item(Key={"PartyId": numeric_id}).get("Item")
-        if not existing or is_item_deleted(existing):
-            raise HTTPException(status_code=404, detail="Party not found")
-
-        # Get numeric agent_id
+        # Get numeric agent_id (an unparseable one keeps the stored AgentId)
         numeric_agent_id = payload.agentId
+        keep_agent_id = False
         if isinstance(numeric_agent_id, str):
             if numeric_agent_id.startswith("A"):
                 try:
                     numeric_agent_id = int(numeric_agent_id[1:])
                 except (ValueError, IndexError):
-                    numeric_agent_id = existing.get("AgentId")
+                    keep_agent_id = True
             else:
                 try:
                     numeric_agent_id = int(numeric_agent_id)
                 except ValueError:
-                    numeric_agent_id = existing.get("AgentId")
+                    keep_agent_id = True
 
         item = {
             "PartyId": numeric_id,
@@ -222,10 +508,26 @@ def update_party(party_id: str, payload: UpdateParty):
             "State": payload.state,
             "Pincode": payload.pincode,
             "AgentId": numeric_agent_id,
+            "deleted": False,
         }
-
-        item["deleted"] = existing.get("deleted", False)
-        party_table.put_item(Item=item)
+        apply_party_name_key(mark_active(item, "PartyId"))
+
+        if keep_agent_id or item["AgentId"] is None:
+            # AgentId is a key of AgentPartiesIndex, which rejects a null value;
+            # a kept AgentId is filled in from the stored party by write_party
+            del item["AgentId"]
+
+        # Single round trip in the usual case: the write expects the stored
+        # Mobile1/Email to be the ones sent and only applies to an existing,
+        # non-deleted party. If the contact details changed, the failed write
+        # returns the stored ones and write_party retries with their guards.
+        previous = {attribute: item.get(attribute) for attribute in UNIQUE_FIELDS}
+        try:
+            await write_party(item, LIVE, previous, keep=["AgentId"] if keep_agent_id else ())
+        except ConditionFailed:
+            raise HTTPException(status_code=404, detail="Party not found")
+        party_search.put(item)
+        party_directory.invalidate()
 
         logger.info(f"Party {party_id} updated successfully")
         return normalize_party_item(item)
@@ -248,7 +550,7 @@ def update_party(party_id: str, payload: UpdateParty):
 
 
 @router.delete("/party/{party_id}")
-def delete_party(party_id: str):
+async def delete_party(party_id: str):
     try:
         if not party_id or not party_id.strip():
             raise HTTPException(status_code=400, detail="Party ID is required")
@@ -266,15 +568,15 @@ def delete_party(party_id: str):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid Party ID")
 
-        existing = party_table.get_item(Key={"PartyId": numeric_id}).get("Item")
-        if not existing or is_item_deleted(existing):
+        try:
+            item = await party_repo.update(
+                numeric_id, {"deleted": True}, remove=["Active", PARTY_NAME_KEY_ATTRIBUTE], condition=LIVE
+            )
+        except ConditionFailed:
             raise HTTPException(status_code=404, detail="Party not found")
-
-        party_table.update_item(
-            Key={"PartyId": numeric_id},
-            UpdateExpression="SET deleted = :deleted",
-            ExpressionAttributeValues={":deleted": True},
-        )
+        party_search.remove(numeric_id)
+        party_directory.invalidate()
+        await release_unique_keys(numeric_id, unique_keys(item))
 
         logger.info(f"Party {party_id} soft deleted successfully")
         return {"deleted": True}
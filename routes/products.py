@@ -1,17 +1,24 @@
 import logging
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from botocore.exceptions import ClientError
 from pydantic import ValidationError
 
 from schemas.products import Product, CreateProduct, UpdateProduct, SearchProduct
-from utils.helpers import aws_error_detail, ddb_decimal, normalize_product_item, get_next_product_id
-from db.dynamodb import products_table
+from utils.helpers import PRODUCT_FIELD_ATTRIBUTES, aws_error_detail, ddb_decimal, normalize_product_item, get_next_product_id
+from utils.fieldsets import parse_fields, projection_attributes, trim
+from db.repositories import products_repo
+from db.repository import EXISTS, NOT_EXISTS, ConditionFailed
+from db.sequences import MAX_ID_ATTEMPTS
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
+FIELDS_QUERY = Query(None, description="Comma-separated Product fields to return, e.g. productId,productType,rate")
+
 
 def format_validation_errors(errors: list) -> str:
     """Format Pydantic validation errors into a readable message"""
@@ -36,14 +43,26 @@ def format_validation_errors(errors: list) -> str:
 
 
 @router.get("/products", response_model=List[Product])
-def list_products():
+async def list_products(fields: Optional[str] = FIELDS_QUERY):
     """
-    Get all products from the database
+    Get all products from the database (optionally only the given fields)
     """
     try:
-        items = products_table.scan().get("Items", [])
-        logger.info(f"Listed {len(items)} products")
-        return [normalize_product_item(x) for x in items]
+        try:
+            selected = parse_fields(fields, PRODUCT_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # normalize_product_item always needs ProductId
+        attributes = projection_attributes(selected, PRODUCT_FIELD_ATTRIBUTES, extra=("ProductId",))
+        products = [normalize_product_item(x) for x in await products_repo.scan(attributes=attributes)]
+        logger.info(f"Listed {len(products)} products")
+        if selected:
+            # Trimmed records bypass response_model, which would require every field
+            return JSONResponse(jsonable_encoder([trim(p, selected) for p in products]))
+        return products
+    except HTTPException:
+        raise
     except ClientError as e:
         logger.error(f"Database error listing products: {aws_error_detail(e)}")
         raise HTTPException(status_code=500, detail=aws_error_detail(e))
@@ -53,21 +72,27 @@ def list_products():
 
 
 @router.get("/products/{product_id}", response_model=Product)
-def get_product(product_id: int):
+async def get_product(product_id: int, fields: Optional[str] = FIELDS_QUERY):
     """
-    Get a specific product by ID
+    Get a specific product by ID (optionally only the given fields)
     """
     try:
         if product_id <= 0:
             raise HTTPException(status_code=400, detail="Product ID must be a positive integer")
 
-        resp = products_table.get_item(Key={"ProductId": product_id})
-        item = resp.get("Item")
+        try:
+            selected = parse_fields(fields, PRODUCT_FIELD_ATTRIBUTES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        attributes = projection_attributes(selected, PRODUCT_FIELD_ATTRIBUTES, extra=("ProductId",))
+        item = await products_repo.get(product_id, attributes)
         if not item:
             raise HTTPException(status_code=404, detail="Product not found")
 
         logger.info(f"Retrieved product {product_id}")
-        return normalize_product_item(item)
+        product = normalize_product_item(item)
+        return JSONResponse(jsonable_encoder(trim(product, selected))) if selected else product
 
     except HTTPException:
         raise
@@ -80,41 +105,52 @@ def get_product(product_id: int):
 
 
 @router.post("/products", response_model=Product)
-def create_product(payload: CreateProduct):
+async def create_product(payload: CreateProduct):
     """
     Create a new product with auto-generated ID
     """
     try:
         # Validation is automatically done by Pydantic
-        product_id = get_next_product_id()
-
-        item = {
-            "ProductId": product_id,
-            "ProductType": payload.productType,
-            "ProductSize": ddb_decimal(payload.productSize),
-            "BagMaterial": payload.bagMaterial,
-            "Quantity": ddb_decimal(payload.quantity),
-            "SheetGSM": ddb_decimal(payload.sheetGSM),
-            "SheetColor": payload.sheetColor,
-            "BorderGSM": ddb_decimal(payload.borderGSM),
-            "BorderColor": payload.borderColor,
-            "HandleType": payload.handleType,
-            "HandleColor": payload.handleColor,
-            "HandleGSM": ddb_decimal(payload.handleGSM),
-            "PrintingType": payload.printingType,
-            "PrintColor": payload.printColor,
-            "Color": payload.color,
-            "Design": payload.design,
-            "PlateBlockNumber": ddb_decimal(payload.plateBlockNumber),
-            "PlateAvailable": payload.plateAvailable,
-            "Rate": ddb_decimal(payload.rate),
-        }
-
-        products_table.put_item(Item=item)
+        for _ in range(MAX_ID_ATTEMPTS):
+            product_id = await get_next_product_id()
+
+            item = {
+                "ProductId": product_id,
+                "ProductType": payload.productType,
+                "ProductSize": ddb_decimal(payload.productSize),
+                "BagMaterial": payload.bagMaterial,
+                "Quantity": ddb_decimal(payload.quantity),
+                "SheetGSM": ddb_decimal(payload.sheetGSM),
+                "SheetColor": payload.sheetColor,
+                "BorderGSM": ddb_decimal(payload.borderGSM),
+                "BorderColor": payload.borderColor,
+                "HandleType": payload.handleType,
+                "HandleColor": payload.handleColor,
+                "HandleGSM": ddb_decimal(payload.handleGSM),
+                "PrintingType": payload.printingType,
+                "PrintColor": payload.printColor,
+                "Color": payload.color,
+                "Design": payload.design,
+                "PlateBlockNumber": ddb_decimal(payload.plateBlockNumber),
+                "PlateAvailable": payload.plateAvailable,
+                "Rate": ddb_decimal(payload.rate),
+            }
+
+            try:
+                # Never overwrite an existing product, even if the counter is behind the table
+                await products_repo.put(item, condition=NOT_EXISTS)
+                break
+            except ConditionFailed:
+                logger.warning(f"ProductId {product_id} already exists, allocating a new one")
+        else:
+            raise HTTPException(status_code=503, detail="Could not allocate a free Product ID, please retry")
 
         logger.info(f"Product created successfully with ID: {product_id}")
         return normalize_product_item(item)
 
+    except HTTPException:
+        raise
+
     except ValidationError as e:
         error_detail = format_validation_errors(e.errors())
         logger.warning(f"Validation error creating product: {error_detail}")
@@ -130,7 +166,7 @@ def create_product(payload: CreateProduct):
 
 
 @router.put("/products/{product_id}", response_model=Product)
-def update_product(product_id: int, payload: UpdateProduct):
+async def update_product(product_id: int, payload: UpdateProduct):
     """
     Update an existing product
     """
@@ -138,11 +174,6 @@ def update_product(product_id: int, payload: UpdateProduct):
         if product_id <= 0:
             raise HTTPException(status_code=400, detail="Product ID must be a positive integer")
 
-        # Check if product exists
-        existing = products_table.get_item(Key={"ProductId": product_id}).get("Item")
-        if not existing:
-            raise HTTPException(status_code=404, detail="Product not found")
-
         # Log the incoming payload for debugging
         logger.debug(f"Update payload for product {product_id}: {payload.dict()}")
 
@@ -170,7 +201,11 @@ def update_product(product_id: int, payload: UpdateProduct):
             "Rate": ddb_decimal(payload.rate),
         }
 
-        products_table.put_item(Item=item)
+        # Single round trip: the write only applies to an existing product
+        try:
+            await products_repo.put(item, condition=EXISTS)
+        except ConditionFailed:
+            raise HTTPException(status_code=404, detail="Product not found")
 
         logger.info(f"Product {product_id} updated successfully")
         return normalize_product_item(item)
@@ -194,7 +229,7 @@ def update_product(product_id: int, payload: UpdateProduct):
 
 
 @router.delete("/products/{product_id}")
-def delete_product(product_id: int):
+async def delete_product(product_id: int):
     """
     Delete a product by ID
     """
@@ -202,12 +237,11 @@ def delete_product(product_id: int):
         if product_id <= 0:
             raise HTTPException(status_code=400, detail="Product ID must be a positive integer")
 
-        existing = products_table.get_item(Key={"ProductId": product_id}).get("Item")
-        if not existing:
+        try:
+            await products_repo.delete(product_id, condition=EXISTS)
+        except ConditionFailed:
             raise HTTPException(status_code=404, detail="Product not found")
 
-        products_table.delete_item(Key={"ProductId": product_id})
-
         logger.info(f"Product {product_id} deleted successfully")
         return {"deleted": True, "productId": product_id}
 
@@ -224,7 +258,7 @@ def delete_product(product_id: int):
 
 
 @router.post("/products/search", response_model=List[Product])
-def search_products(filters: SearchProduct):
+async def search_products(filters: SearchProduct):
     """
     Search products with optional filters.
     Supports filtering by:
@@ -241,7 +275,7 @@ def search_products(filters: SearchProduct):
     - minPrice / maxPrice (rate range)
     """
     try:
-        items = products_table.scan().get("Items", [])
+        items = await products_repo.scan()
 
         filtered_items = []
         for item in items:
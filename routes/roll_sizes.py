@@ -3,19 +3,18 @@ import time
 from decimal import Decimal
 from typing import List
 
-import boto3
 from botocore.exceptions import ClientError
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from config.settings import AWS_REGION
+from config.settings import ROLL_SIZES_TABLE
+from db.repositories import get_repository
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
 # ── DynamoDB table ────────────────────────────────────────────────
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-roll_size_table = dynamodb.Table("Roll_Size_Table")
+roll_size_repo = get_repository(ROLL_SIZES_TABLE)
 
 
 # ── Pydantic models ───────────────────────────────────────────────
@@ -28,12 +27,8 @@ class RollSizeResponse(BaseModel):
 
 
 # ── Helper: fetch all sizes sorted ───────────────────────────────
-def _fetch_all_sizes() -> List[str]:
-    response = roll_size_table.scan()
-    items = response.get("Items", [])
-    while "LastEvaluatedKey" in response:
-        response = roll_size_table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-        items.extend(response.get("Items", []))
+async def _fetch_all_sizes() -> List[str]:
+    items = await roll_size_repo.scan()
     sizes = [str(item["Size"]) for item in items if "Size" in item]
     sizes.sort()
     return sizes
@@ -41,10 +36,10 @@ def _fetch_all_sizes() -> List[str]:
 
 # ── GET /api/roll-sizes ───────────────────────────────────────────
 @router.get("/roll-sizes", response_model=RollSizeResponse)
-def list_roll_sizes():
+async def list_roll_sizes():
     """Return all roll sizes from Roll_Size_Table, sorted."""
     try:
-        sizes = _fetch_all_sizes()
+        sizes = await _fetch_all_sizes()
         logger.info(f"✓ Retrieved {len(sizes)} roll size(s)")
         return {"sizes": sizes}
     except ClientError as e:
@@ -60,7 +55,7 @@ def list_roll_sizes():
 
 # ── POST /api/roll-sizes ──────────────────────────────────────────
 @router.post("/roll-sizes", response_model=RollSizeResponse, status_code=201)
-def add_roll_size(payload: RollSizeCreate):
+async def add_roll_size(payload: RollSizeCreate):
     """
     Add a new roll size to Roll_Size_Table.
     Returns 409 if the size already exists.
@@ -70,7 +65,7 @@ def add_roll_size(payload: RollSizeCreate):
         raise HTTPException(status_code=422, detail="Size value cannot be empty.")
 
     try:
-        existing_sizes = _fetch_all_sizes()
+        existing_sizes = await _fetch_all_sizes()
         if size_val in existing_sizes:
             raise HTTPException(status_code=409, detail=f"Roll size '{size_val}' already exists.")
 
@@ -90,10 +85,10 @@ def add_roll_size(payload: RollSizeCreate):
         if size_number is not None:
             item["SizeNumber"] = Decimal(str(size_number))
 
-        roll_size_table.put_item(Item=item)
+        await roll_size_repo.put(item)
         logger.info(f"✓ Roll size '{size_val}' added with ID {new_id}")
 
-        updated_sizes = _fetch_all_sizes()
+        updated_sizes = await _fetch_all_sizes()
         return {"sizes": updated_sizes}
 
     except HTTPException:
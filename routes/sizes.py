@@ -1,17 +1,17 @@
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from botocore.exceptions import ClientError
-import boto3
 import re
 from typing import Optional
-from config.settings import AWS_REGION
+from db.repositories import get_repository
+from db.repository import NOT_EXISTS, ConditionFailed
+from db.sequences import MAX_ID_ATTEMPTS, allocate_id
 
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-
 # ✅ UPDATED: Added 'box-bag' and 'leader-bag' entries
 SIZE_TABLE_MAP = {
     "stitching":    "Stitching_Size_Table",
@@ -47,35 +47,14 @@ class AddSizeRequest(BaseModel):
     gusset: Optional[int] = None
 
 
-def scan_all_items(table) -> list:
-    """Full paginated scan of a DynamoDB table, returns all raw items."""
-    response = table.scan()
-    items = response.get("Items", [])
-    while "LastEvaluatedKey" in response:
-        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-        items.extend(response.get("Items", []))
-    return items
-
-
-def get_next_id(items: list) -> int:
-    """
-    Derive the next numeric ID from existing items.
-    ID is stored as a Number in DynamoDB; boto3 returns it as Decimal.
-    """
-    if not items:
-        return 1
-    max_id = max(
-        int(item.get("ID", 0))
-        for item in items
-        if item.get("ID") is not None
-    )
-    return max_id + 1
+async def scan_all_items(repository) -> list:
+    """Full paginated scan of a size table, returns all raw items."""
+    return await repository.scan()
 
 
-def scan_size_table(table_name: str) -> list:
+async def scan_size_table(table_name: str) -> list:
     """Scan a size table and return [{label, value}] options."""
-    table = dynamodb.Table(table_name)
-    items = scan_all_items(table)
+    items = await scan_all_items(get_repository(table_name))
 
     sizes = sorted(
         set(
@@ -88,7 +67,7 @@ def scan_size_table(table_name: str) -> list:
 
 
 @router.get("/sizes/{category}")
-def get_sizes(category: str):
+async def get_sizes(category: str):
     """Return size options for a given product category."""
     table_name = SIZE_TABLE_MAP.get(category.lower())
     if not table_name:
@@ -97,7 +76,7 @@ def get_sizes(category: str):
             detail=f"No size table found for category '{category}'"
         )
     try:
-        options = scan_size_table(table_name)
+        options = await scan_size_table(table_name)
         return {"category": category, "options": options}
     except ClientError as e:
         logger.error(f"DynamoDB error fetching sizes for {category}: {e}")
@@ -108,10 +87,10 @@ def get_sizes(category: str):
 
 
 @router.post("/sizes/{category}")
-def add_size(category: str, body: AddSizeRequest):
+async def add_size(category: str, body: AddSizeRequest):
     """
     Add a new size value to the given category's DynamoDB table.
-    ID is auto-incremented as a Number (matches DynamoDB key type N).
+    ID comes from the table's id sequence as a Number (matches DynamoDB key type N).
     Duplicate sizes (case-insensitive) are silently ignored.
     Returns the full updated list of size options for the category.
     """
@@ -129,10 +108,10 @@ def add_size(category: str, body: AddSizeRequest):
         raise HTTPException(status_code=400, detail="Size value cannot be empty.")
 
     try:
-        table = dynamodb.Table(table_name)
+        repository = get_repository(table_name)
 
         # ── Fetch all existing items (needed for duplicate check + next ID) ──
-        existing_items = scan_all_items(table)
+        existing_items = await scan_all_items(repository)
 
         # ── Duplicate check (case-insensitive) ───────────────────────────────
         for item in existing_items:
@@ -141,14 +120,10 @@ def add_size(category: str, body: AddSizeRequest):
                 logger.info(
                     f"Size '{size_value}' already exists in {table_name}, skipping insert."
                 )
-                options = scan_size_table(table_name)
+                options = await scan_size_table(table_name)
                 return {"category": category, "options": options, "duplicate": True}
 
-        # ── Auto-increment numeric ID (matches DynamoDB key type N) ──────────
-        new_id = get_next_id(existing_items)
-
         new_item = {
-            "ID":   new_id,       # ✅ Number — matches partition key type N
             "Size": size_value,   # ✅ Size string value
         }
 
@@ -178,12 +153,23 @@ def add_size(category: str, body: AddSizeRequest):
         if gusset_val is not None:
             new_item["Gusset"] = gusset_val
 
-        table.put_item(Item=new_item)
+        for _ in range(MAX_ID_ATTEMPTS):
+            # ── Numeric ID from the table's block-allocated sequence (key type N) ─
+            new_id = await allocate_id(f"Size#{table_name}")
+            new_item["ID"] = new_id   # ✅ Number — matches partition key type N
+            try:
+                # Never overwrite an existing size, even if the counter is behind the table
+                await repository.put(new_item, condition=NOT_EXISTS)
+                break
+            except ConditionFailed:
+                logger.warning(f"ID {new_id} already exists in {table_name}, allocating a new one")
+        else:
+            raise HTTPException(status_code=503, detail="Could not allocate a free size ID, please retry")
         logger.info(
             f"Added size '{size_value}' with ID={new_id} to {table_name}"
         )
 
-        options = scan_size_table(table_name)
+        options = await scan_size_table(table_name)
         return {"category": category, "options": options}
 
     except ClientError as e:
@@ -195,13 +181,19 @@ def add_size(category: str, body: AddSizeRequest):
 
 
 @router.get("/sizes")
-def get_all_sizes():
+async def get_all_sizes():
     """Return all size options for all categories in one call."""
+    # All size tables are scanned concurrently
+    scans = await asyncio.gather(
+        *(scan_size_table(table_name) for table_name in SIZE_TABLE_MAP.values()),
+        return_exceptions=True,
+    )
     result = {}
-    for category, table_name in SIZE_TABLE_MAP.items():
-        try:
-            result[category] = scan_size_table(table_name)
-        except ClientError as e:
-            logger.warning(f"Failed to fetch sizes for {category}: {e}")
-            result[category] = []
+    for category, options in zip(SIZE_TABLE_MAP, scans):
+        if isinstance(options, ClientError):
+            logger.warning(f"Failed to fetch sizes for {category}: {options}")
+            options = []
+        elif isinstance(options, BaseException):
+            raise options
+        result[category] = options
     return result
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from decimal import Decimal
 from datetime import date
 import re
@@ -510,4 +510,97 @@ class CreateOrder(BaseOrderModel):
 
 
 class UpdateOrder(BaseOrderModel):
-    pass
\ No newline at end of file
+    pass
+
+
+def reject_coerced_to_none(v, handler, info):
+    """
+    Run a field's inherited validators, but reject a sent value they would
+    turn into None: in a PATCH, None removes the field, so only a literal
+    null may do that.
+    """
+    value = handler(v)
+    if v is not None and value is None:
+        raise ValueError(f"Invalid {info.field_name}; send null to remove it")
+    return value
+
+
+class ProductPatch(Product):
+    """Fields to change on one product of an order; fields left out are not touched"""
+    ProductStatus: Optional[str] = Field(None, description="Product status: 'ToDo', 'In-Progress', or 'Delivered'")
+
+    @field_validator('*', mode='wrap')
+    @classmethod
+    def reject_invalid_values(cls, v, handler, info):
+        return reject_coerced_to_none(v, handler, info)
+
+    @field_validator('GST', mode='before')
+    @classmethod
+    def convert_gst_to_float(cls, v):
+        # Unlike Product, an invalid GST is rejected instead of being reset to 0
+        if v is None:
+            return None
+        try:
+            val = float(v)
+        except (TypeError, ValueError):
+            raise ValueError("GST must be 0, 5, or 18")
+        if val not in (0.0, 5.0, 18.0):
+            raise ValueError("GST must be 0, 5, or 18")
+        return val
+
+    @field_validator('ProductStatus', mode='before')
+    @classmethod
+    def validate_product_status(cls, v):
+        # A sent status must be valid: unlike Product, null or a typo is rejected, not reset to ToDo
+        status = v.strip() if isinstance(v, str) else v
+        if status not in ("ToDo", "In-Progress", "Delivered"):
+            raise ValueError("ProductStatus must be 'ToDo', 'In-Progress', or 'Delivered'")
+        return status
+
+
+class PatchOrder(BaseOrderModel):
+    """
+    Partial order update: only the fields present in the body are written and
+    a field sent as null is removed. A sent value that is not valid for its
+    field (a bad date, a non-numeric amount, an unknown status) is rejected
+    rather than treated as a removal. Products maps a product's position in the
+    order to the fields to change on it, e.g. {"1": {"ProductStatus": "Delivered"}}.
+    """
+    AgentId: Optional[str] = Field(None, description="Agent ID")
+
+    Products: Optional[Dict[int, ProductPatch]] = Field(None, description="Product index → fields to change on that product")
+
+    OrderStatus: Optional[str] = Field(None, description="Order status: 'ToDo', 'In-Progress', or 'Delivered'")
+
+    @field_validator('OrderStatus', mode='before')
+    @classmethod
+    def validate_order_status_base(cls, v):
+        # A sent status must be valid: null or a typo is rejected, not reset to ToDo
+        status = v.strip() if isinstance(v, str) else v
+        if status not in ("ToDo", "In-Progress", "Delivered"):
+            raise ValueError("OrderStatus must be 'ToDo', 'In-Progress', or 'Delivered'")
+        return status
+
+    @field_validator('*', mode='wrap')
+    @classmethod
+    def reject_invalid_values(cls, v, handler, info):
+        return reject_coerced_to_none(v, handler, info)
+
+
+class ProductStatusUpdate(BaseModel):
+    """New status for one product of an order"""
+    ProductStatus: str = Field(..., description="Product status: 'ToDo', 'In-Progress', or 'Delivered'")
+
+    @field_validator('ProductStatus', mode='before')
+    @classmethod
+    def validate_product_status(cls, v):
+        status = v.strip() if isinstance(v, str) else v
+        if status not in ("ToDo", "In-Progress", "Delivered"):
+            raise ValueError("ProductStatus must be 'ToDo', 'In-Progress', or 'Delivered'")
+        return status
+
+
+class OrderPage(BaseModel):
+    """One page of orders plus the cursor for the page after it"""
+    items: List[Order] = Field(default_factory=list, description="Orders on this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page (null on the last page)")
\ No newline at end of file
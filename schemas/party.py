@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 import re
 
 
@@ -19,6 +19,31 @@ class Party(BaseModel):
     mobile2: Optional[str] = None
 
 
+class PartyLightweight(BaseModel):
+    partyId: str
+    partyName: Optional[str] = None
+
+
+class PartyPage(BaseModel):
+    """One page of parties plus the cursor for the page after it"""
+    items: List[Party] = Field(default_factory=list, description="Parties on this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page (null on the last page)")
+
+
+class PartySuggestion(BaseModel):
+    partyId: str
+    partyName: str
+    aliasOrCompanyName: Optional[str] = None
+
+
+class PartySearchResult(PartySuggestion):
+    city: Optional[str] = None
+    contact_Person1: Optional[str] = None
+    contact_Person2: Optional[str] = None
+    score: float
+    matchedField: str
+
+
 class CreateParty(BaseModel):
     partyName: str = Field(..., min_length=1, max_length=255, description="Party name")
     aliasOrCompanyName: Optional[str] = Field(None, max_length=255, description="Alias or company name (optional)")
@@ -0,0 +1,29 @@
+"""
+Shared test setup. The API tests run against the in-memory backend
+(DATA_BACKEND=memory), and no test talks to AWS: placeholder credentials and
+a region let boto3 build its sessions, resources and clients offline.
+"""
+
+import os
+import random
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-south-1")
+os.environ.setdefault("DATA_BACKEND", "memory")
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def new_mobile() -> str:
+    """A random 10-digit mobile number, so tests sharing the in-memory tables don't collide."""
+    return f"9{random.randint(10**8, 10**9 - 1)}"
@@ -0,0 +1,58 @@
+"""Creates never overwrite a row when the id counter is behind the table."""
+
+import asyncio
+
+from conftest import new_mobile
+from db import sequences
+from db.repositories import counters_repo
+
+AGENT = {"name": "Counter Check", "address": "12 MG Road, Pune"}
+PARTY = {
+    "partyName": "Counter Traders",
+    "agentId": "A01",
+    "contact_Person1": "Ravi Kumar",
+    "city": "Pune",
+    "state": "Maharashtra",
+}
+
+
+def rewind_counter(name: str, value: int) -> None:
+    """Set counter `name` back to `value` and drop the block this process holds, like a badly seeded counter."""
+    asyncio.run(counters_repo.put({"CounterName": name, "CounterValue": value}))
+    sequences._blocks.pop(name, None)
+
+
+def create_agent(client):
+    return client.post("/api/agents", json={**AGENT, "mobile": new_mobile()})
+
+
+def test_agent_create_skips_ids_in_use(client):
+    first = create_agent(client).json()
+    first_id = int(first["agentId"][1:])
+    rewind_counter("AgentId", first_id - 1)
+
+    second = create_agent(client)
+
+    assert second.status_code == 200
+    assert second.json()["agentId"] != first["agentId"]
+    assert client.get(f"/api/agents/{first['agentId']}").json()["mobile"] == first["mobile"]
+
+
+def test_agent_create_gives_up_with_503(client):
+    created = [create_agent(client).json() for _ in range(sequences.MAX_ID_ATTEMPTS)]
+    rewind_counter("AgentId", int(created[0]["agentId"][1:]) - 1)
+
+    assert create_agent(client).status_code == 503
+    for agent in created:
+        assert client.get(f"/api/agents/{agent['agentId']}").json()["mobile"] == agent["mobile"]
+
+
+def test_party_create_skips_ids_in_use(client):
+    first = client.post("/api/party", json={**PARTY, "mobile1": new_mobile()}).json()
+    rewind_counter("PartyId", int(first["partyId"].split("P")[-1]) - 1)
+
+    second = client.post("/api/party", json={**PARTY, "mobile1": new_mobile()})
+
+    assert second.status_code == 200
+    assert second.json()["partyId"] != first["partyId"]
+    assert client.get(f"/api/party/{first['partyId']}").json()["mobile1"] == first["mobile1"]
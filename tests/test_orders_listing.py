@@ -0,0 +1,166 @@
+"""
+Order listings on the memory backend: GET /orders pagination, ?fields= and
+from/to windows, and the /orders/open, /orders/recent and
+/agents/{id}/orders index reads.
+"""
+
+import uuid
+from calendar import monthrange
+from datetime import date, timedelta
+
+import pytest
+
+from config.settings import ACTIVE_INDEX_NAME, ORDERS_TABLE
+from db.repositories import TABLE_INDEXES
+from utils.dynamodb_utils import encode_cursor
+
+ORDER = {"AgentId": "A01", "Products": [{"ProductType": "Machine", "Quantity": 5, "Rate": 1.5}]}
+
+
+def create_orders(client, count):
+    responses = [client.post("/api/orders", json={**ORDER, "TransportName": f"T{i}"}) for i in range(count)]
+    assert {response.status_code for response in responses} == {200}
+    return [response.json()["OrderId"] for response in responses]
+
+
+def test_cursor_pagination_visits_every_order_once(client):
+    created = create_orders(client, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/orders", params=params).json()
+        assert len(page["items"]) <= 3
+        seen += [order["OrderId"] for order in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert set(created) <= set(seen)
+    assert len(seen) == len(client.get("/api/orders").json())
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/orders", params={"cursor": "zzz"}).status_code == 400
+    wrong_keys = encode_cursor({"PartyId": 1})
+    assert client.get("/api/orders", params={"limit": 2, "cursor": wrong_keys}).status_code == 400
+
+
+def test_dynamodb_cursor_must_hold_the_index_keys():
+    from db.backends.dynamodb import DynamoDBRepository
+
+    repo = DynamoDBRepository(ORDERS_TABLE, "OrderId", TABLE_INDEXES[ORDERS_TABLE])
+    start = {"OrderId": 2601010001, "Active": "2601010001"}
+    assert repo._start_key(encode_cursor(start), ACTIVE_INDEX_NAME) == start
+    # Rejected before anything is sent, instead of a ValidationException from DynamoDB
+    for wrong in ({"OrderId": 2601010001}, {**start, "AgentId": "A01"}):
+        with pytest.raises(ValueError):
+            repo._scan_page(2, encode_cursor(wrong), ACTIVE_INDEX_NAME, None, None)
+
+
+def test_fields_trim_the_response(client):
+    order_id = create_orders(client, 1)[0]
+
+    order = client.get(f"/api/orders/{order_id}", params={"fields": "TransportName,OrderStatus"}).json()
+    assert order == {"TransportName": "T0", "OrderStatus": "ToDo"}
+
+    page = client.get("/api/orders", params={"limit": 2, "fields": "OrderId"}).json()
+    assert page["items"] and all(set(item) == {"OrderId"} for item in page["items"])
+
+
+def test_unknown_field_is_rejected(client):
+    order_id = create_orders(client, 1)[0]
+    assert client.get(f"/api/orders/{order_id}", params={"fields": "Nope"}).status_code == 400
+
+
+def create_dated_orders(client, dates, **fields):
+    """One order per OrderStartDate in `dates`; returns their ids in the same order."""
+    ids = []
+    for start in dates:
+        response = client.post("/api/orders", json={**ORDER, **fields, "OrderStartDate": start})
+        assert response.status_code == 200
+        ids.append(response.json()["OrderId"])
+    return ids
+
+
+def page_through(client, url, params, limit):
+    seen, cursor = [], None
+    while True:
+        page = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(page["items"]) <= limit
+        seen += [order["OrderId"] for order in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_date_window_pages_across_month_buckets(client, limit):
+    # A year of its own, so orders created by other tests stay out of the window.
+    # January fills a page of 2 exactly, March is empty, May is outside the window.
+    year = 1990 + limit
+    dates = [f"{year}-01-05", f"{year}-01-20", f"{year}-02-10", f"{year}-04-03", f"{year}-04-28", f"{year}-05-01"]
+    created = create_dated_orders(client, dates)
+    window = {"from": f"{year}-01-01", "to": f"{year}-04-30"}
+
+    seen = page_through(client, "/api/orders", window, limit)
+
+    assert seen == created[:5]
+    unpaged = client.get("/api/orders", params=window).json()
+    assert [order["OrderId"] for order in unpaged] == created[:5]
+
+
+def test_date_window_cursor_for_another_bucket_is_rejected(client):
+    window = {"from": "1980-01-01", "to": "1980-03-31", "limit": 1}
+    outside = encode_cursor({"OrderMonth": "1981-01", "Cursor": ""})
+    assert client.get("/api/orders", params={**window, "cursor": outside}).status_code == 400
+
+
+def test_agent_orders_newest_first_without_deleted(client):
+    agent_id = f"A{uuid.uuid4().hex[:8]}"
+    created = create_dated_orders(
+        client, ["2024-03-01", "2024-05-01", "2024-01-01", "2024-04-01", "2024-02-01"], AgentId=agent_id
+    )
+    assert client.delete(f"/api/orders/{created[3]}").status_code == 200
+    other = create_dated_orders(client, ["2024-03-15"])[0]
+
+    seen = page_through(client, f"/api/agents/{agent_id}/orders", {}, 2)
+
+    assert seen == [created[1], created[0], created[4], created[2]]
+    assert other not in seen
+    window = client.get(f"/api/agents/{agent_id}/orders", params={"from": "2024-02-01", "to": "2024-04-30"}).json()
+    assert [order["OrderId"] for order in window["items"]] == [created[0], created[4]]
+
+
+def test_open_orders_leave_out_delivered(client):
+    todo, in_progress, delivered = create_orders(client, 3)
+    client.patch(f"/api/orders/{in_progress}", json={"OrderStatus": "In-Progress"})
+    client.patch(f"/api/orders/{delivered}", json={"OrderStatus": "Delivered"})
+
+    open_ids = [order["OrderId"] for order in client.get("/api/orders/open").json()]
+    assert todo in open_ids and in_progress in open_ids and delivered not in open_ids
+    assert open_ids == sorted(open_ids, key=int)
+
+    only_in_progress = client.get("/api/orders/open", params={"status": "In-Progress"}).json()
+    assert in_progress in [order["OrderId"] for order in only_in_progress]
+    assert {order["OrderStatus"] for order in only_in_progress} == {"In-Progress"}
+    assert client.get("/api/orders/open", params={"status": "Delivered"}).status_code == 400
+
+
+def test_recent_orders_walk_back_across_months(client):
+    today = date.today()
+    month_start = today.replace(day=1)
+    month_end = today.replace(day=monthrange(today.year, today.month)[1])
+    newest, previous_month = create_dated_orders(
+        client, [month_end.isoformat(), (month_start - timedelta(days=1)).isoformat()]
+    )
+    this_month = client.get("/api/orders", params={"from": month_start.isoformat(), "to": month_end.isoformat()}).json()
+
+    assert [order["OrderId"] for order in client.get("/api/orders/recent", params={"n": 1}).json()] == [newest]
+
+    recent = client.get("/api/orders/recent", params={"n": len(this_month) + 1}).json()
+    assert len(recent) == len(this_month) + 1
+    assert recent[-1]["OrderId"] == previous_month
+    starts = [order["OrderStartDate"] for order in recent]
+    assert starts == sorted(starts, reverse=True)
@@ -0,0 +1,126 @@
+"""PATCH /orders/{id}: value validation, removals and the status cascade onto products."""
+
+import pytest
+
+from routes import orders
+
+ORDER = {
+    "AgentId": "A01",
+    "Carting": 40,
+    "Products": [
+        {"ProductType": "Machine", "Quantity": 5, "Rate": 1.5},
+        {"ProductType": "Bag", "Quantity": 2, "Rate": 3},
+    ],
+}
+
+
+@pytest.fixture
+def order_id(client):
+    response = client.post("/api/orders", json=ORDER)
+    assert response.status_code == 200
+    return response.json()["OrderId"]
+
+
+@pytest.mark.parametrize("status", [None, "Shipped", ""])
+def test_invalid_order_status_is_rejected(client, order_id, status):
+    client.patch(f"/api/orders/{order_id}", json={"OrderStatus": "In-Progress"})
+
+    response = client.patch(f"/api/orders/{order_id}", json={"OrderStatus": status})
+
+    assert response.status_code == 422
+    assert client.get(f"/api/orders/{order_id}").json()["OrderStatus"] == "In-Progress"
+
+
+@pytest.mark.parametrize("status", [None, "Shipped", ""])
+def test_invalid_product_status_is_rejected(client, order_id, status):
+    client.patch(f"/api/orders/{order_id}", json={"OrderStatus": "In-Progress"})
+
+    response = client.patch(f"/api/orders/{order_id}", json={"Products": {"0": {"ProductStatus": status}}})
+
+    assert response.status_code == 422
+    products = client.get(f"/api/orders/{order_id}").json()["Products"]
+    assert products[0]["ProductStatus"] == "In-Progress"
+
+
+def test_order_status_cascades_to_products(client, order_id):
+    order = client.patch(f"/api/orders/{order_id}", json={"OrderStatus": "In-Progress"}).json()
+
+    assert order["OrderStatus"] == "In-Progress"
+    assert [product["ProductStatus"] for product in order["Products"]] == ["In-Progress", "In-Progress"]
+    assert not order.get("OrderEndDate")
+
+
+def test_delivered_cascade_sets_end_date(client, order_id):
+    order = client.patch(f"/api/orders/{order_id}", json={"OrderStatus": "Delivered"}).json()
+
+    assert [product["ProductStatus"] for product in order["Products"]] == ["Delivered", "Delivered"]
+    assert order["OrderEndDate"]
+
+
+def test_product_statuses_derive_the_order_status(client, order_id):
+    order = client.patch(
+        f"/api/orders/{order_id}", json={"Products": {"0": {"ProductStatus": "Delivered"}}}
+    ).json()
+    assert order["OrderStatus"] == "ToDo"  # mixed statuses keep the order's status
+
+    order = client.patch(
+        f"/api/orders/{order_id}", json={"Products": {"1": {"ProductStatus": "Delivered"}}}
+    ).json()
+    assert order["OrderStatus"] == "Delivered"
+
+
+def test_unknown_product_position_is_rejected(client, order_id):
+    response = client.patch(f"/api/orders/{order_id}", json={"Products": {"5": {"ProductStatus": "Delivered"}}})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"OrderStartDate": "garbage"},
+        {"OrderEndDate": "31/12/2026"},
+        {"Carting": "abc"},
+        {"Products": {"0": {"Rate": "abc"}}},
+        {"Products": {"0": {"PlateRate": "abc"}}},
+        {"Products": {"0": {"GST": 7}}},
+    ],
+)
+def test_invalid_value_is_rejected_not_removed(client, order_id, body):
+    before = client.get(f"/api/orders/{order_id}").json()
+
+    response = client.patch(f"/api/orders/{order_id}", json=body)
+
+    assert response.status_code == 422
+    assert client.get(f"/api/orders/{order_id}").json() == before
+
+
+def test_null_removes_a_field(client, order_id):
+    order = client.patch(f"/api/orders/{order_id}", json={"Carting": None}).json()
+    assert order.get("Carting") is None
+
+
+def test_delivered_order_keeps_an_end_date(client, order_id):
+    client.patch(f"/api/orders/{order_id}", json={"OrderStatus": "Delivered"})
+
+    response = client.patch(f"/api/orders/{order_id}", json={"OrderEndDate": None})
+
+    assert response.status_code == 200
+    assert response.json()["OrderEndDate"]
+    assert client.get(f"/api/orders/{order_id}").json()["OrderEndDate"]
+
+
+def test_products_shrunk_concurrently_give_409(client, order_id, monkeypatch):
+    read = orders.orders_repo.get
+
+    async def read_then_shrink(key, attributes=None):
+        current = await read(key, attributes)
+        # Another request drops the last product between this read and the write
+        await orders.orders_repo.update(key, remove=[("Products", 1)])
+        return current
+
+    monkeypatch.setattr(orders.orders_repo, "get", read_then_shrink)
+    response = client.patch(f"/api/orders/{order_id}", json={"Products": {"1": {"Rate": 9}}})
+    monkeypatch.undo()
+
+    assert response.status_code == 409
+    assert len(client.get(f"/api/orders/{order_id}").json()["Products"]) == 1
@@ -0,0 +1,34 @@
+"""GET /party/lightweight: ETag revalidation and invalidation on writes."""
+
+from conftest import new_mobile
+
+PARTY = {
+    "partyName": "Directory Traders",
+    "agentId": "A01",
+    "contact_Person1": "Ravi Kumar",
+    "city": "Pune",
+    "state": "Maharashtra",
+}
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get("/api/party/lightweight")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get("/api/party/lightweight", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_party_write_changes_the_etag(client):
+    etag = client.get("/api/party/lightweight").headers["ETag"]
+    party = client.post("/api/party", json={**PARTY, "mobile1": new_mobile()}).json()
+
+    response = client.get("/api/party/lightweight", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert {"partyId": party["partyId"], "partyName": party["partyName"]} in response.json()
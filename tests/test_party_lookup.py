@@ -0,0 +1,66 @@
+"""Party reads served from GSIs: /party/by-name and /agents/{id}/parties."""
+
+import random
+import uuid
+
+from conftest import new_mobile
+
+PARTY = {
+    "agentId": "A01",
+    "contact_Person1": "Ravi Kumar",
+    "city": "Pune",
+    "state": "Maharashtra",
+}
+
+
+def create_party(client, **fields):
+    response = client.post("/api/party", json={**PARTY, "mobile1": new_mobile(), **fields})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_by_name_ignores_case_and_spacing(client):
+    name = f"Zenith Polymers {uuid.uuid4().hex[:8]}"
+    first = create_party(client, partyName=name)
+    create_party(client, partyName=name.upper())
+
+    response = client.get(f"/api/party/by-name/  {name.lower().replace(' ', '   ')} ")
+
+    assert response.status_code == 200
+    assert response.json()["partyId"] == first["partyId"]  # lowest PartyId wins
+
+
+def test_by_name_follows_deletes_and_renames(client):
+    name = f"Kaveri Mills {uuid.uuid4().hex[:8]}"
+    first = create_party(client, partyName=name)
+    second = create_party(client, partyName=name)
+
+    assert client.delete(f"/api/party/{first['partyId']}").status_code == 200
+    assert client.get(f"/api/party/by-name/{name}").json()["partyId"] == second["partyId"]
+
+    renamed = f"{name} Renamed"
+    update = {**PARTY, "partyName": renamed, "mobile1": second["mobile1"]}
+    assert client.put(f"/api/party/{second['partyId']}", json=update).status_code == 200
+    assert client.get(f"/api/party/by-name/{name}").status_code == 404
+    assert client.get(f"/api/party/by-name/{renamed}").json()["partyId"] == second["partyId"]
+
+
+def test_agent_parties_pages_without_deleted(client):
+    agent_id = f"A{random.randint(10**6, 10**7 - 1)}"
+    created = [create_party(client, partyName=f"Agent Party {i}", agentId=agent_id)["partyId"] for i in range(5)]
+    assert client.delete(f"/api/party/{created[2]}").status_code == 200
+    other = create_party(client, partyName="Other Agent Party")["partyId"]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/api/agents/{agent_id}/parties", params=params).json()
+        assert len(page["items"]) <= 2
+        seen += [party["partyId"] for party in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [created[0], created[1], created[3], created[4]]
+    assert other not in seen
+    assert client.get("/api/agents/Axyz/parties").status_code == 400
@@ -0,0 +1,191 @@
+"""
+Party search: PrefixIndex and GET /party/suggest, TrigramIndex ranking and
+GET /party/search, and PartySearchIndexes rebuilds (stale indexes keep
+serving while a rebuild runs).
+"""
+
+import asyncio
+import uuid
+
+from conftest import new_mobile
+from utils import trigram_index
+from utils.party_search import PartySearchIndexes, prefix_terms
+from utils.prefix_index import PrefixIndex
+from utils.trigram_index import TrigramIndex
+
+PARTY = {
+    "agentId": "A01",
+    "contact_Person1": "Ravi Kumar",
+    "city": "Pune",
+    "state": "Maharashtra",
+}
+
+
+def party(party_id, name):
+    return {"PartyId": party_id, "PartyName": name, "AgentId": "A01"}
+
+
+class SlowRepository:
+    """Scan returns the next prepared result, waiting on `release` from the second scan on."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.scans = 0
+        self.release = asyncio.Event()
+
+    async def scan(self, index=None, attributes=None):
+        self.scans += 1
+        if self.scans > 1:
+            await self.release.wait()
+        return self.results[min(self.scans, len(self.results)) - 1]
+
+
+def names(entries):
+    return [entry["partyName"] for entry in entries]
+
+
+def test_stale_index_is_served_while_rebuilding():
+    async def scenario():
+        repository = SlowRepository([party(1, "Shree Traders")], [party(1, "Shree Traders"), party(2, "Shiv Mills")])
+        indexes = PartySearchIndexes(repository, "ActiveIndex", ttl=0)
+
+        assert names((await indexes.prefix()).search("sh", 10)) == ["Shree Traders"]
+
+        # ttl=0: every read is stale, but the rebuild runs in the background
+        prefix = await asyncio.wait_for(indexes.prefix(), timeout=1)
+        assert names(prefix.search("sh", 10)) == ["Shree Traders"]
+        await asyncio.wait_for(indexes.trigram(), timeout=1)
+        await asyncio.sleep(0)
+        assert repository.scans == 2  # one rebuild in flight, not one per read
+
+        # A write made during the rebuild reaches the current and the new indexes
+        indexes.put(party(3, "Shakti Paper"))
+        assert "Shakti Paper" in names((await indexes.prefix()).search("sh", 10))
+
+        repository.release.set()
+        await indexes._refreshing
+        assert sorted(names((await indexes.prefix()).search("sh", 10))) == ["Shakti Paper", "Shiv Mills", "Shree Traders"]
+
+    asyncio.run(scenario())
+
+
+def test_keep_fresh_builds_at_startup():
+    async def scenario():
+        repository = SlowRepository([party(1, "Shree Traders")])
+        indexes = PartySearchIndexes(repository, "ActiveIndex", ttl=60)
+        task = asyncio.create_task(indexes.keep_fresh())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        assert repository.scans == 1
+        assert names((await indexes.prefix()).search("shree", 10)) == ["Shree Traders"]
+        assert repository.scans == 1
+
+    asyncio.run(scenario())
+
+
+def test_abbreviation_scores_above_min_score():
+    index = TrigramIndex()
+    index.put(1, {"PartyName": "Mehta Industries"}, "mehta")
+    index.put(2, {"PartyName": "Gupta Textiles"}, "gupta")
+
+    assert index.search("Mehta Ind.", 10) == [(0.5, "PartyName", "mehta")]
+    assert index.search("Mehta Ind.", 10, min_score=0.6) == []
+
+
+def test_heavier_field_ranks_first():
+    index = TrigramIndex({"PartyName": 1.0, "City": 0.5})
+    index.put(1, {"PartyName": "Shree Mills", "City": "Nagpur"}, "by city")
+    index.put(2, {"PartyName": "Nagpur", "City": "Pune"}, "by name")
+
+    results = index.search("Nagpur", 10, min_score=0)
+
+    assert results == [(1.0, "PartyName", "by name"), (0.5, "City", "by city")]
+
+
+def test_candidates_are_capped(monkeypatch):
+    monkeypatch.setattr(trigram_index, "MAX_CANDIDATES", 5)
+    index = TrigramIndex()
+    for key in range(50):
+        index.put(key, {"PartyName": "Mehta Traders"}, key)
+    index.put("rare", {"PartyName": "Mehta Textiles"}, "rare")
+
+    results = index.search("Mehta Textiles", 100, min_score=0)
+
+    # The rarest trigrams are read first, so the one close match is never cut off
+    assert len(results) <= 5
+    assert results[0][2] == "rare"
+
+
+def test_search_endpoint_follows_creates_and_deletes(client):
+    name = f"Quokka Fabrics {uuid.uuid4().hex[:6]}"
+    party = client.post("/api/party", json={**PARTY, "partyName": name, "mobile1": new_mobile()}).json()
+
+    results = client.get("/api/party/search", params={"q": name.replace("Quokka", "Qokka")}).json()
+    assert results[0]["partyId"] == party["partyId"]
+    assert results[0]["matchedField"] == "partyName"
+    assert 0.3 <= results[0]["score"] < 1
+
+    assert client.delete(f"/api/party/{party['partyId']}").status_code == 200
+    results = client.get("/api/party/search", params={"q": name}).json()
+    assert party["partyId"] not in [result["partyId"] for result in results]
+
+
+def prefix_index(*parties):
+    index = PrefixIndex()
+    for key, name, alias in parties:
+        index.put(key, prefix_terms({"PartyName": name, "AliasOrCompanyName": alias}), name)
+    return index
+
+
+def test_prefix_matches_later_words_and_alias():
+    index = prefix_index((1, "Shree Ganesh Traders", None), (2, "Gupta Mills", "Ganesh Enterprises"))
+
+    assert index.search("traders", 10) == ["Shree Ganesh Traders"]
+    assert index.search("ganesh", 10) == ["Gupta Mills", "Shree Ganesh Traders"]
+    assert index.search("enterprises", 10) == ["Gupta Mills"]
+
+
+def test_prefix_lists_each_party_once_within_limit():
+    index = prefix_index(
+        (1, "Shree Shakti Traders", "Shree Enterprises"),
+        (2, "Shree Mills", None),
+        (3, "Shree Paper", None),
+    )
+
+    assert sorted(index.search("sh", 10)) == ["Shree Mills", "Shree Paper", "Shree Shakti Traders"]
+    assert len(index.search("sh", 2)) == 2
+
+
+def test_prefix_put_replaces_and_remove_drops():
+    index = prefix_index((1, "Shree Traders", None))
+
+    index.put(1, prefix_terms({"PartyName": "Kaveri Mills"}), "Kaveri Mills")
+    assert index.search("shree", 10) == []
+    assert index.search("kaveri", 10) == ["Kaveri Mills"]
+
+    index.remove(1)
+    assert index.search("kaveri", 10) == [] and len(index) == 0
+
+
+def test_suggest_endpoint_follows_updates_and_deletes(client):
+    word, alias, renamed = (f"zx{uuid.uuid4().hex[:8]}" for _ in range(3))
+    party = client.post(
+        "/api/party",
+        json={**PARTY, "partyName": f"Shree {word} Traders", "aliasOrCompanyName": alias, "mobile1": new_mobile()},
+    ).json()
+
+    def suggested(q, **params):
+        return [s["partyId"] for s in client.get("/api/party/suggest", params={"q": q, **params}).json()]
+
+    assert suggested(word.upper()) == [party["partyId"]]
+    assert suggested(f"{alias[:5]}  ") == [party["partyId"]]
+
+    update = {**PARTY, "partyName": f"Shree {renamed}", "mobile1": party["mobile1"]}
+    assert client.put(f"/api/party/{party['partyId']}", json=update).status_code == 200
+    assert suggested(word) == []
+    assert suggested(renamed) == [party["partyId"]]
+
+    assert client.delete(f"/api/party/{party['partyId']}").status_code == 200
+    assert suggested(renamed) == []
+    assert len(suggested("s", limit=2)) <= 2
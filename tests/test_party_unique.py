@@ -0,0 +1,86 @@
+"""Party Mobile1 / Email uniqueness: 409s and guard release on change and delete."""
+
+import uuid
+
+from conftest import new_mobile
+
+PARTY = {
+    "partyName": "Shree Traders",
+    "agentId": "A01",
+    "contact_Person1": "Ravi Kumar",
+    "city": "Pune",
+    "state": "Maharashtra",
+}
+
+
+def new_email() -> str:
+    return f"{uuid.uuid4().hex[:12]}@example.com"
+
+
+def create_party(client, **fields):
+    return client.post("/api/party", json={**PARTY, **fields})
+
+
+def test_duplicate_mobile_is_rejected(client):
+    mobile = new_mobile()
+    first = create_party(client, mobile1=mobile)
+    assert first.status_code == 200
+
+    # Same number, formatted differently
+    duplicate = create_party(client, mobile1=f"{mobile[:5]}-{mobile[5:]}")
+
+    assert duplicate.status_code == 409
+    assert first.json()["partyId"] in duplicate.json()["detail"]
+
+
+def test_duplicate_email_is_rejected(client):
+    email = new_email()
+    assert create_party(client, mobile1=new_mobile(), email=email).status_code == 200
+    assert create_party(client, mobile1=new_mobile(), email=email.upper()).status_code == 409
+
+
+def test_update_to_a_used_mobile_is_rejected(client):
+    taken = new_mobile()
+    assert create_party(client, mobile1=taken).status_code == 200
+    party = create_party(client, mobile1=new_mobile()).json()
+
+    response = client.put(f"/api/party/{party['partyId']}", json={**PARTY, "mobile1": taken})
+
+    assert response.status_code == 409
+    assert client.get(f"/api/party/{party['partyId']}").json()["mobile1"] == party["mobile1"]
+
+
+def test_changed_mobile_releases_the_old_one(client):
+    old, new = new_mobile(), new_mobile()
+    party = create_party(client, mobile1=old).json()
+
+    response = client.put(f"/api/party/{party['partyId']}", json={**PARTY, "mobile1": new})
+
+    assert response.status_code == 200 and response.json()["mobile1"] == new
+    assert create_party(client, mobile1=old).status_code == 200
+    assert create_party(client, mobile1=new).status_code == 409
+
+
+def test_update_keeping_contacts_succeeds(client):
+    mobile, email = new_mobile(), new_email()
+    party = create_party(client, mobile1=mobile, email=email).json()
+
+    response = client.put(
+        f"/api/party/{party['partyId']}", json={**PARTY, "mobile1": mobile, "email": email, "city": "Mumbai"}
+    )
+
+    assert response.status_code == 200 and response.json()["city"] == "Mumbai"
+    assert create_party(client, mobile1=mobile).status_code == 409
+
+
+def test_delete_releases_guards(client):
+    mobile, email = new_mobile(), new_email()
+    party = create_party(client, mobile1=mobile, email=email).json()
+
+    assert client.delete(f"/api/party/{party['partyId']}").status_code == 200
+
+    assert create_party(client, mobile1=mobile, email=email).status_code == 200
+
+
+def test_update_of_missing_party_is_404(client):
+    assert client.put("/api/party/P99999", json={**PARTY, "mobile1": new_mobile()}).status_code == 404
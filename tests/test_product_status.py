@@ -0,0 +1,53 @@
+"""PATCH /orders/{id}/products/{index}/status."""
+
+import pytest
+
+from db.repository import ConditionFailed
+from routes import orders
+
+ORDER = {
+    "AgentId": "A01",
+    "Products": [
+        {"ProductType": "Machine", "Quantity": 5, "Rate": 1.5},
+        {"ProductType": "Bag", "Quantity": 2, "Rate": 3},
+    ],
+}
+
+
+@pytest.fixture
+def order_id(client):
+    response = client.post("/api/orders", json=ORDER)
+    assert response.status_code == 200
+    return response.json()["OrderId"]
+
+
+def test_product_status_update(client, order_id):
+    order = client.patch(f"/api/orders/{order_id}/products/0/status", json={"ProductStatus": "Delivered"}).json()
+    assert [product["ProductStatus"] for product in order["Products"]] == ["Delivered", "ToDo"]
+
+    order = client.patch(f"/api/orders/{order_id}/products/1/status", json={"ProductStatus": "Delivered"}).json()
+    assert order["OrderStatus"] == "Delivered" and order["OrderEndDate"]
+
+
+def test_invalid_product_status_update(client, order_id):
+    url = f"/api/orders/{order_id}/products"
+    assert client.patch(f"{url}/0/status", json={"ProductStatus": "Shipped"}).status_code == 422
+    assert client.patch(f"{url}/9/status", json={"ProductStatus": "Delivered"}).status_code == 400
+    assert client.patch("/api/orders/1/products/0/status", json={"ProductStatus": "Delivered"}).status_code == 404
+
+
+def test_concurrent_changes_give_409(client, order_id, monkeypatch):
+    calls = []
+
+    async def changed_every_time(*args, **kwargs):
+        calls.append(kwargs.get("expect"))
+        raise ConditionFailed("statuses changed")
+
+    monkeypatch.setattr(orders, "STATUS_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(orders.orders_repo, "update", changed_every_time)
+
+    response = client.patch(f"/api/orders/{order_id}/products/0/status", json={"ProductStatus": "Delivered"})
+
+    assert response.status_code == 409
+    assert len(calls) == orders.MAX_STATUS_UPDATE_ATTEMPTS
+    assert all(calls)  # every write was guarded on the statuses it read
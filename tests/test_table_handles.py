@@ -0,0 +1,42 @@
+"""Per-thread DynamoDB resources behind the shared table handles (db/dynamodb.py)."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db import dynamodb
+from db.dynamodb import get_client, get_resource, get_table
+
+THREADS = 16
+
+
+def test_each_thread_gets_its_own_resource_and_client():
+    barrier = threading.Barrier(THREADS)
+
+    def worker(name):
+        barrier.wait()  # every worker is alive at once, so no thread is reused
+        handle = get_table(name)
+        # Attribute access goes to this thread's Table; nothing is sent to AWS
+        assert handle.name == name and handle.table_name == name
+        assert handle.meta.client is get_resource().meta.client
+        return handle, get_resource(), get_client()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(worker, ["Orders", "Party"] * (THREADS // 2)))
+
+    handles, resources, clients = zip(*results)
+    assert len({id(handle) for handle in handles}) == 2
+    assert handles[0] is get_table("Orders") and handles[1] is get_table("Party")
+    assert len({id(resource) for resource in resources}) == THREADS
+    assert len({id(client) for client in clients}) == THREADS
+    for resource, client in zip(resources, clients):
+        assert resource.meta.client._loader is dynamodb._data_loader
+        assert client._loader is dynamodb._data_loader
+
+
+def test_thread_reuses_its_resource_and_tables():
+    def worker():
+        table = get_table("Orders")
+        return get_resource() is get_resource(), table.meta is table.meta
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(worker).result() == (True, True)
@@ -1,9 +1,13 @@
 """DynamoDB utility functions for data conversion."""
 
 from decimal import Decimal
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
+import base64
+import json
 import logging
 
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -28,6 +32,51 @@ def convert_items_to_python(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     return [convert_item_to_python(item) for item in items]
 
 
+def decode_number(text: str) -> Union[int, float]:
+    """DynamoDB number string → int when integral as written, float otherwise."""
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+
+def decode_value(value: Dict[str, Any]) -> Any:
+    """
+    Decode one low-level AttributeValue ({"S": ...}, {"N": ...}, ...) straight
+    to a JSON-ready Python value: numbers become int/float (never Decimal),
+    sets become lists.
+    """
+    (tag, raw), = value.items()
+    if tag == "S":
+        return raw
+    if tag == "N":
+        return decode_number(raw)
+    if tag == "M":
+        return {k: decode_value(v) for k, v in raw.items()}
+    if tag == "L":
+        return [decode_value(v) for v in raw]
+    if tag == "BOOL":
+        return raw
+    if tag == "NULL":
+        return None
+    if tag == "SS":
+        return list(raw)
+    if tag == "NS":
+        return [decode_number(n) for n in raw]
+    if tag == "B":
+        return bytes(raw)
+    if tag == "BS":
+        return [bytes(b) for b in raw]
+    raise TypeError(f"Unknown DynamoDB type: {tag}")
+
+
+def decode_item(item: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Decode a low-level client item in one pass.
+    Replaces TypeDeserializer + convert_item_to_python on the read path.
+    """
+    return {k: decode_value(v) for k, v in item.items()}
+
+
 def is_item_deleted(item: Dict[str, Any]) -> bool:
     """Return True if the DynamoDB item is marked deleted."""
     if not isinstance(item, dict):
@@ -47,6 +96,62 @@ def filter_deleted_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return [item for item in items if not is_item_deleted(item)]
 
 
+# Live (not soft-deleted) orders, parties and agents carry Active = their own
+# primary key as a string. It is the partition key of the sparse ActiveIndex GSI,
+# so reading that index only ever touches live rows, while index writes and
+# parallel-scan segments spread over as many partition key values as there are
+# live rows. Soft deletes REMOVE the attribute.
+ACTIVE_ATTRIBUTE = "Active"
+
+
+def active_value(key: Any) -> str:
+    """The Active value of a live item with primary key `key` (2601010001 → "2601010001")."""
+    if isinstance(key, (Decimal, float)):
+        key = int(key)
+    return str(key)
+
+
+def mark_active(item: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Set or clear the Active marker on an item (primary key attribute `key`) about to be written (in place)."""
+    if is_item_deleted(item):
+        item.pop(ACTIVE_ATTRIBUTE, None)
+    else:
+        item[ACTIVE_ATTRIBUTE] = active_value(item[key])
+    return item
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Turn a DynamoDB LastEvaluatedKey into an opaque, URL-safe cursor string.
+    Returns None when there is no further page.
+    """
+    if not last_evaluated_key:
+        return None
+    serializer = TypeSerializer()
+    raw = {k: serializer.serialize(v) for k, v in last_evaluated_key.items()}
+    payload = json.dumps(raw, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Turn a cursor produced by encode_cursor back into an ExclusiveStartKey.
+    If `keys` is given, the cursor must hold exactly those attributes (the
+    key attributes of the table or index it pages through).
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        deserializer = TypeDeserializer()
+        start = {k: deserializer.deserialize(v) for k, v in raw.items()}
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if keys is not None and set(start) != set(keys):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return start
+
+
 def convert_product_for_storage(product: Dict[str, Any]) -> Dict[str, Any]:
     """
     Convert a product dict to DynamoDB storage format.
@@ -0,0 +1,54 @@
+"""Sparse fieldsets: ?fields= query parameter → attributes to read from the repository."""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+
+def model_field_attributes(model: Type[BaseModel]) -> Dict[str, Tuple[str, ...]]:
+    """Field map for models whose field names are the DynamoDB attribute names."""
+    return {name: (name,) for name in model.model_fields}
+
+
+def parse_fields(raw: Optional[str], field_map: Dict[str, Tuple[str, ...]]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ?fields= value into a list of response field names.
+    Returns None when no fieldset was requested.
+    Raises ValueError for names that are not in `field_map`.
+    """
+    if raw is None or not raw.strip():
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in field_map]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(field_map)}"
+        )
+    return fields
+
+
+def projection_attributes(
+    fields: Optional[Sequence[str]],
+    field_map: Dict[str, Tuple[str, ...]],
+    extra: Iterable[str] = (),
+) -> Optional[List[str]]:
+    """
+    The stored attributes behind `fields` (None = read everything).
+    `extra` attributes (keys, `deleted`, ...) are always read because the
+    handler itself needs them.
+    """
+    if not fields:
+        return None
+    return list(dict.fromkeys([a for f in fields for a in field_map[f]] + list(extra)))
+
+
+def trim(record: Dict[str, Any], fields: Sequence[str], model: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """
+    Reduce a response record to the requested fields.
+    With `model`, the record is validated first so values get the same types
+    as in the full response; fields that were not requested are left out
+    instead of being filled with model defaults.
+    """
+    if model is not None:
+        return model.model_validate(record).model_dump(mode="json", include=set(fields))
+    return {f: record.get(f) for f in fields}
@@ -1,7 +1,7 @@
 import logging
 from decimal import Decimal
 from botocore.exceptions import ClientError
-from db.dynamodb import agents_table, party_table, products_table
+from db.sequences import allocate_id
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -24,13 +24,23 @@ def normalize_ddb_item(item: dict) -> dict:
     return out
 
 
+# Response field → DynamoDB attributes it is built from (used for ?fields= projections)
+AGENT_FIELD_ATTRIBUTES = {
+    "agentId": ("AgentId",),
+    "name": ("Name",),
+    "mobile": ("Mobile",),
+    "aadhar_Details": ("Aadhar_Details",),
+    "address": ("Address",),
+}
+
+
 def normalize_agent_item(item: dict) -> dict:
     """
     Convert DynamoDB item to API-safe response.
     Formats numeric Agent ID to string format (e.g., 1 -> "A01")
     """
     def convert(value):
-        if isinstance(value, Decimal):
+        if isinstance(value, (Decimal, int, float)) and not isinstance(value, bool):
             return str(value)
         return value
 
@@ -50,16 +60,28 @@ def normalize_agent_item(item: dict) -> dict:
     }
 
 
-def normalize_party_item(item: dict) -> dict:
+PARTY_FIELD_ATTRIBUTES = {
+    "partyId": ("PartyId", "AgentId"),  # formatted as A01P001
+    "partyName": ("PartyName",),
+    "aliasOrCompanyName": ("AliasOrCompanyName",),
+    "address": ("Address",),
+    "city": ("City",),
+    "state": ("State",),
+    "pincode": ("Pincode",),
+    "agentId": ("AgentId",),
+    "contact_Person1": ("Contact_Person1",),
+    "contact_Person2": ("Contact_Person2",),
+    "email": ("Email",),
+    "mobile1": ("Mobile1",),
+    "mobile2": ("Mobile2",),
+}
+
+
+def format_party_ids(item: dict) -> tuple:
     """
-    Convert DynamoDB Party item to API-safe response.
-    Formats numeric IDs: AgentId (1 -> "A01"), PartyId (1 -> "A01P001")
+    The formatted (PartyId, AgentId) of a Party item: (1, 1) -> ("A01P001", "A01").
+    Either is None when missing.
     """
-    def convert(value):
-        if isinstance(value, Decimal):
-            value = int(value)
-        return str(value) if value is not None else None
-
     # Get numeric agent ID and format it
     agent_id = item.get("AgentId")
     formatted_agent_id = None
@@ -85,6 +107,20 @@ def normalize_party_item(item: dict) -> dict:
         else:
             formatted_party_id = str(party_id)
     
+    return formatted_party_id, formatted_agent_id
+
+
+def normalize_party_item(item: dict) -> dict:
+    """
+    Convert DynamoDB Party item to API-safe response.
+    Formats numeric IDs: AgentId (1 -> "A01"), PartyId (1 -> "A01P001")
+    """
+    def convert(value):
+        if isinstance(value, (Decimal, float)):
+            value = int(value)
+        return str(value) if value is not None else None
+
+    formatted_party_id, formatted_agent_id = format_party_ids(item)
     return {
         "partyId": formatted_party_id,
         "partyName": item.get("PartyName"),
@@ -103,13 +139,37 @@ def normalize_party_item(item: dict) -> dict:
     }
 
 
+PRODUCT_FIELD_ATTRIBUTES = {
+    "productId": ("ProductId",),
+    "productType": ("ProductType",),
+    "productSize": ("ProductSize",),
+    "bagMaterial": ("BagMaterial",),
+    "quantity": ("Quantity",),
+    "sheetGSM": ("SheetGSM",),
+    "sheetColor": ("SheetColor",),
+    "borderGSM": ("BorderGSM",),
+    "borderColor": ("BorderColor",),
+    "handleType": ("HandleType",),
+    "handleColor": ("HandleColor",),
+    "alternativeHandleColor": ("AlternativeHandleColor",),
+    "handleGSM": ("HandleGSM",),
+    "printingType": ("PrintingType",),
+    "printColor": ("PrintColor",),
+    "color": ("Color",),
+    "design": ("Design",),
+    "plateBlockNumber": ("PlateBlockNumber",),
+    "plateAvailable": ("PlateAvailable",),
+    "rate": ("Rate",),
+}
+
+
 def normalize_product_item(item: dict) -> dict:
     """
     Convert DynamoDB Product item to API-safe response.
     Handles Decimal conversion properly.
     """
     def convert_decimal(value):
-        if isinstance(value, Decimal):
+        if isinstance(value, (Decimal, int)) and not isinstance(value, bool):
             return float(value)
         return value
 
@@ -144,41 +204,21 @@ def aws_error_detail(e: ClientError) -> str:
     return f"{code}: {msg}"
 
 
-def get_next_agent_id() -> int:
+async def get_next_agent_id() -> int:
     """
-    Get the next agent ID number (numeric).
-    Finds the highest existing agent ID and returns the next one.
+    Get the next agent ID number (numeric) from the AgentId sequence.
     Returns: numeric ID (e.g., 1, 2, 3) - will be formatted to "A01", "A02" in responses
     """
     try:
-        items = agents_table.scan().get("Items", [])
-        
-        agent_ids = []
-        for item in items:
-            agent_id = item.get("AgentId")
-            if agent_id:
-                # Convert to int (handle both numeric and string formats from DB)
-                if isinstance(agent_id, Decimal):
-                    agent_ids.append(int(agent_id))
-                elif isinstance(agent_id, int):
-                    agent_ids.append(agent_id)
-                else:
-                    try:
-                        agent_ids.append(int(agent_id))
-                    except (ValueError, TypeError):
-                        pass
-
-        next_id = max(agent_ids) + 1 if agent_ids else 1
-        return next_id
+        return await allocate_id("AgentId")
     except Exception as e:
         logger.error(f"Error getting next agent ID: {str(e)}")
         raise
 
 
-def get_next_party_id(agent_id: int) -> int:
+async def get_next_party_id(agent_id: int) -> int:
     """
-    Get the next party ID number (numeric) globally across all parties.
-    Finds the highest existing PartyId across all agents and returns max + 1.
+    Get the next party ID number (numeric) from the global PartyId sequence.
 
     Args:
         agent_id: The numeric agent ID (unused for ID generation, kept for signature compatibility)
@@ -186,39 +226,18 @@ def get_next_party_id(agent_id: int) -> int:
     Returns: numeric ID unique across the entire party table
     """
     try:
-        items = party_table.scan().get("Items", [])
-
-        party_ids = []
-        for item in items:
-            party_id = item.get("PartyId")
-            if party_id:
-                try:
-                    party_ids.append(int(party_id) if isinstance(party_id, (int, Decimal)) else int(party_id))
-                except (ValueError, TypeError):
-                    pass
-
-        return max(party_ids) + 1 if party_ids else 1
+        return await allocate_id("PartyId")
     except Exception as e:
         logger.error(f"Error getting next party ID: {str(e)}")
         raise
 
 
-def get_next_product_id() -> int:
+async def get_next_product_id() -> int:
     """
-    Get the next product ID by finding the highest existing product ID and adding 1
+    Get the next product ID from the ProductId sequence
     """
     try:
-        items = products_table.scan().get("Items", [])
-        if not items:
-            return 1
-
-        product_ids = []
-        for item in items:
-            product_id = item.get("ProductId")
-            if product_id:
-                product_ids.append(int(product_id) if isinstance(product_id, Decimal) else int(product_id))
-
-        return max(product_ids) + 1 if product_ids else 1
+        return await allocate_id("ProductId")
     except Exception as e:
         logger.error(f"Error getting next product ID: {str(e)}")
         raise
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Order status rules, applied on every order write.
+
+OrderStatus is stored on the item as clients see it, so reads return the
+stored value and the status can be indexed. Existing orders:
+migrations/backfill_order_status.py
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+ORDER_STATUSES = ("ToDo", "In-Progress", "Delivered")
+DEFAULT_STATUS = "ToDo"
+
+# Live orders that are not Delivered carry OpenStatus = their OrderStatus.
+# It is the partition key of the sparse OpenOrdersIndex GSI, so the open-work
+# views never read delivered or deleted orders. Backfill:
+# migrations/backfill_open_orders_index.py
+OPEN_STATUSES = ("ToDo", "In-Progress")
+OPEN_STATUS_ATTRIBUTE = "OpenStatus"
+
+# Live orders with an OrderStartDate carry OrderMonth = "YYYY-MM" of that date,
+# the partition key of the OrderMonthIndex GSI (sort key OrderStartDate), so a
+# date-range read only queries the months it covers. Backfill:
+# migrations/backfill_order_month_index.py
+ORDER_MONTH_ATTRIBUTE = "OrderMonth"
+
+
+def derive_order_status(product_statuses: Iterable[Optional[str]], current: Optional[str] = None) -> str:
+    """
+    The order status implied by the product statuses: the common status when
+    every product has the same one, otherwise `current` (an order with mixed
+    or no products keeps the status it was given).
+    """
+    statuses = set(product_statuses)
+    if len(statuses) == 1:
+        (status,) = statuses
+        if status in ORDER_STATUSES:
+            return status
+    return current if current in ORDER_STATUSES else DEFAULT_STATUS
+
+
+def cascade_order_status(products: List[Dict[str, Any]], order_status: str) -> None:
+    """Give every product the order's status (new orders start with one status throughout)."""
+    for product in products:
+        product["ProductStatus"] = order_status
+
+
+def open_status(order_status: Optional[str], deleted: bool = False) -> Optional[str]:
+    """The OpenStatus value for an order, or None when it must not be in OpenOrdersIndex."""
+    return order_status if order_status in OPEN_STATUSES and not deleted else None
+
+
+def order_month(start_date: Optional[str], deleted: bool = False) -> Optional[str]:
+    """The OrderMonth bucket of an ISO OrderStartDate, or None when the order must not be in OrderMonthIndex."""
+    return start_date[:7] if start_date and not deleted else None
+
+
+def month_buckets(date_from: date, date_to: date) -> List[str]:
+    """The OrderMonth values covering date_from..date_to, in order."""
+    months = []
+    year, month = date_from.year, date_from.month
+    while (year, month) <= (date_to.year, date_to.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def months_back(today: date, count: int) -> List[str]:
+    """`count` OrderMonth values ending with the month of `today`, newest first."""
+    months = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months
+
+
+def apply_order_rules(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bring a whole order item in line with the rules before it is written (in place):
+    OrderStatus follows the product statuses, a Delivered order without an
+    OrderEndDate gets today's date, and the OpenStatus and OrderMonth index
+    markers are set or cleared.
+    """
+    products = order.get("Products", [])
+    order["OrderStatus"] = derive_order_status((p.get("ProductStatus") for p in products), order.get("OrderStatus"))
+    if order["OrderStatus"] == "Delivered" and not order.get("OrderEndDate"):
+        order["OrderEndDate"] = date.today().isoformat()
+
+    deleted = order.get("deleted") is True
+    markers = {
+        OPEN_STATUS_ATTRIBUTE: open_status(order["OrderStatus"], deleted),
+        ORDER_MONTH_ATTRIBUTE: order_month(order.get("OrderStartDate"), deleted),
+    }
+    for attribute, value in markers.items():
+        if value:
+            order[attribute] = value
+        else:
+            order.pop(attribute, None)
+    return order
@@ -0,0 +1,56 @@
+"""
+Per-process cache of the party directory behind GET /party/lightweight.
+
+The response body (every live party's partyId and partyName, in PartyId
+order) is built from one ActiveIndex scan projected to PartyId, AgentId
+and PartyName, encoded once, and served as-is with an ETag until a party
+write in this process invalidates it or `ttl` seconds pass (for writes
+made by other processes).
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Optional, Tuple
+
+from db.repository import Repository
+from utils.helpers import format_party_ids
+
+DIRECTORY_ATTRIBUTES = ["PartyId", "AgentId", "PartyName"]
+
+
+class PartyDirectory:
+    def __init__(self, repository: Repository, index: str, ttl: float):
+        self.repository = repository
+        self.index = index
+        self.ttl = ttl
+        self._cached: Optional[Tuple[bytes, str]] = None
+        self._built_at = 0.0
+        # Bumped by every invalidation, so a build that overlapped a write is not cached
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._cached = None
+
+    def _fresh(self) -> bool:
+        return self._cached is not None and time.monotonic() - self._built_at < self.ttl
+
+    async def get(self) -> Tuple[bytes, str]:
+        """The JSON body and its ETag, rebuilt when invalidated or older than the TTL."""
+        if self._fresh():
+            return self._cached
+        async with self._lock:
+            if self._fresh():
+                return self._cached
+            version, started = self._version, time.monotonic()
+            items = await self.repository.scan(index=self.index, attributes=DIRECTORY_ATTRIBUTES)
+            items.sort(key=lambda item: item["PartyId"])
+            parties = [{"partyId": format_party_ids(item)[0], "partyName": item.get("PartyName")} for item in items]
+            body = json.dumps(parties, separators=(",", ":"), ensure_ascii=False).encode()
+            entry = (body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+            if version == self._version:
+                self._cached, self._built_at = entry, started
+            return entry
@@ -0,0 +1,33 @@
+"""
+Normalized party names for exact-name lookups.
+
+Live parties carry PartyNameKey = their PartyName casefolded with runs of
+whitespace collapsed, the partition key of the PartyNameIndex GSI (sort key
+PartyId). Looking a name up is then one Query on the normalized input.
+Soft deletes REMOVE the attribute. Backfill: migrations/backfill_party_name_index.py
+"""
+
+from typing import Any, Dict, Optional
+
+PARTY_NAME_KEY_ATTRIBUTE = "PartyNameKey"
+
+
+def normalize_party_name(name: Optional[str]) -> str:
+    """'  Shree   GANESH ' → 'shree ganesh'."""
+    return " ".join(str(name or "").casefold().split())
+
+
+def party_name_key(name: Optional[str], deleted: bool = False) -> Optional[str]:
+    """The PartyNameKey value, or None when the party must not be in PartyNameIndex."""
+    key = normalize_party_name(name)
+    return key if key and not deleted else None
+
+
+def apply_party_name_key(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Set or clear PartyNameKey on a party item about to be written (in place)."""
+    key = party_name_key(item.get("PartyName"), item.get("deleted") is True)
+    if key:
+        item[PARTY_NAME_KEY_ATTRIBUTE] = key
+    else:
+        item.pop(PARTY_NAME_KEY_ATTRIBUTE, None)
+    return item
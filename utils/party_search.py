@@ -0,0 +1,152 @@
+"""
+Per-process search indexes over live parties: the typeahead PrefixIndex
+(GET /party/suggest) and the fuzzy TrigramIndex (GET /party/search).
+
+Both are built from one projected ActiveIndex scan, updated in place by
+this process's party writes, and rebuilt in the background every `ttl`
+seconds (keep_fresh, started with the app in main.py) so parties written by
+other processes show up too. Requests keep using the current indexes while
+a rebuild runs; only the first use in a process waits for a build. Writes
+made while a rebuild is scanning are queued and replayed onto the new indexes.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db.repository import Repository
+from utils.helpers import normalize_party_item
+from utils.party_names import normalize_party_name
+from utils.prefix_index import PrefixIndex, word_suffixes
+from utils.trigram_index import TrigramIndex
+
+logger = logging.getLogger("uvicorn.error")
+
+SEARCH_ATTRIBUTES = ["PartyId", "PartyName", "AliasOrCompanyName", "AgentId", "City", "Contact_Person1", "Contact_Person2"]
+# Fuzzy search fields → (response field name, weight of a match on that field)
+SEARCH_FIELDS = {
+    "PartyName": ("partyName", 1.0),
+    "AliasOrCompanyName": ("aliasOrCompanyName", 0.9),
+    "Contact_Person1": ("contact_Person1", 0.7),
+    "Contact_Person2": ("contact_Person2", 0.7),
+    "City": ("city", 0.5),
+}
+ENTRY_FIELDS = ("partyId", "partyName", "aliasOrCompanyName", "city", "contact_Person1", "contact_Person2")
+
+Change = Callable[[PrefixIndex, TrigramIndex], None]
+
+
+def party_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The API record kept in the indexes for a party item."""
+    party = normalize_party_item(item)
+    return {k: party[k] for k in ENTRY_FIELDS}
+
+
+def prefix_terms(item: Dict[str, Any]) -> List[str]:
+    names = (item.get("PartyName"), item.get("AliasOrCompanyName"))
+    return [term for name in names for term in word_suffixes(normalize_party_name(name))]
+
+
+class PartySearchIndexes:
+    """The prefix and trigram indexes of one process, kept warm together."""
+
+    def __init__(self, repository: Repository, index: str, ttl: float):
+        self.repository = repository
+        self.index = index
+        self.ttl = ttl
+        self._prefix: Optional[PrefixIndex] = None
+        self._trigram: Optional[TrigramIndex] = None
+        self._built_at = 0.0
+        self._pending: Optional[List[Change]] = None
+        self._lock = asyncio.Lock()
+        self._refreshing: Optional[asyncio.Task] = None
+
+    # ── Writes ────────────────────────────────────────────────────
+    def put(self, item: Dict[str, Any]) -> None:
+        """Add or refresh a live party."""
+        key, entry = item["PartyId"], party_entry(item)
+        texts = {field: item.get(field) for field in SEARCH_FIELDS}
+
+        def change(prefix: PrefixIndex, trigram: TrigramIndex) -> None:
+            prefix.put(key, prefix_terms(item), entry)
+            trigram.put(key, texts, entry)
+
+        self._apply(change)
+
+    def remove(self, party_id: Any) -> None:
+        """Drop a deleted party."""
+        def change(prefix: PrefixIndex, trigram: TrigramIndex) -> None:
+            prefix.remove(party_id)
+            trigram.remove(party_id)
+
+        self._apply(change)
+
+    def _apply(self, change: Change) -> None:
+        if self._pending is not None:
+            self._pending.append(change)
+        if self._prefix is not None:
+            change(self._prefix, self._trigram)
+
+    # ── Reads ─────────────────────────────────────────────────────
+    async def prefix(self) -> PrefixIndex:
+        await self._ensure_built()
+        return self._prefix
+
+    async def trigram(self) -> TrigramIndex:
+        await self._ensure_built()
+        return self._trigram
+
+    def _fresh(self) -> bool:
+        return self._prefix is not None and time.monotonic() - self._built_at < self.ttl
+
+    async def _ensure_built(self) -> None:
+        if self._prefix is None:
+            await self.refresh()
+        elif not self._fresh() and (self._refreshing is None or self._refreshing.done()):
+            # No keep_fresh task in this process (e.g. Lambda runs without
+            # lifespan events): rebuild in the background, serve the old indexes
+            self._refreshing = asyncio.create_task(self._refresh_logged())
+
+    # ── Rebuilds ──────────────────────────────────────────────────
+    async def keep_fresh(self) -> None:
+        """Build the indexes, then rebuild them every `ttl` seconds (a task that runs for the app's lifetime)."""
+        while True:
+            await self._refresh_logged()
+            await asyncio.sleep(self.ttl)
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Party search index rebuild failed: {e}")
+
+    async def refresh(self) -> None:
+        """Rebuild both indexes from one scan and swap them in; readers use the old ones meanwhile."""
+        async with self._lock:
+            if self._fresh():
+                # Rebuilt by another caller while this one waited for the lock
+                return
+            self._pending = []
+            try:
+                started = time.monotonic()
+                items = await self.repository.scan(index=self.index, attributes=SEARCH_ATTRIBUTES)
+                prefix = PrefixIndex()
+                prefix.put_many((item["PartyId"], prefix_terms(item), party_entry(item)) for item in items)
+                trigram = TrigramIndex({field: weight for field, (_, weight) in SEARCH_FIELDS.items()})
+                for item in items:
+                    trigram.put(item["PartyId"], {f: item.get(f) for f in SEARCH_FIELDS}, party_entry(item))
+                for change in self._pending:
+                    change(prefix, trigram)
+                self._prefix, self._trigram, self._built_at = prefix, trigram, started
+                logger.info(f"✓ Party search indexes built with {len(prefix)} parties")
+            finally:
+                self._pending = None
+
+
+def search_results(results: List[Tuple[float, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """TrigramIndex results → PartySearchResult records."""
+    return [
+        {**entry, "score": score, "matchedField": SEARCH_FIELDS[field][0]}
+        for score, field, entry in results
+    ]
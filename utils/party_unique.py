@@ -0,0 +1,49 @@
+"""
+Uniqueness guards for party Mobile1 and Email.
+
+Every live party owns one PartyUnique item per normalized Mobile1 / Email
+value (UniqueKey "mobile#9876543210", "email#ravi@example.com"), written in
+the same transaction as the party with a not-exists condition. A duplicate
+therefore fails that single conditional write instead of needing a Party
+scan, and the guard names the party that already uses the value. Guards
+are released when the value changes or the party is soft-deleted.
+Create and backfill: migrations/backfill_party_unique_keys.py
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+UNIQUE_KEY_ATTRIBUTE = "UniqueKey"
+
+# Party attribute → (UniqueKey prefix, label used in error messages)
+UNIQUE_FIELDS = {
+    "Mobile1": ("mobile", "Mobile 1"),
+    "Email": ("email", "Email"),
+}
+
+
+def normalize_mobile(value: Any) -> str:
+    """'+91 98765-43210' → '9876543210' (the last 10 digits)."""
+    return re.sub(r"\D", "", str(value or ""))[-10:]
+
+
+def normalize_email(value: Any) -> str:
+    """' Ravi@Example.COM ' → 'ravi@example.com'."""
+    return str(value or "").strip().casefold()
+
+
+_NORMALIZERS = {"Mobile1": normalize_mobile, "Email": normalize_email}
+
+
+def unique_keys(item: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """{UniqueKey: party attribute} for the Mobile1 / Email values a party item holds."""
+    keys = {}
+    for attribute, (prefix, _) in UNIQUE_FIELDS.items():
+        value = _NORMALIZERS[attribute]((item or {}).get(attribute))
+        if value:
+            keys[f"{prefix}#{value}"] = attribute
+    return keys
+
+
+def guard_item(unique_key: str, party_id: Any) -> Dict[str, Any]:
+    return {UNIQUE_KEY_ATTRIBUTE: unique_key, "PartyId": party_id}
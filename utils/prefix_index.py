@@ -0,0 +1,78 @@
+"""In-memory prefix index for typeahead: a sorted array of (term, key) searched with bisect."""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+
+def word_suffixes(text: str) -> List[str]:
+    """'shree ganesh traders' → ['shree ganesh traders', 'ganesh traders', 'traders'], so any word can start a match."""
+    words = text.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """
+    Maps keys to a value and a set of already-normalized terms.
+    search(prefix) returns the values of keys with a term starting with
+    `prefix`, in term order. Lookups are O(log n + matches); put/remove
+    shift the array, which is cheap for a few hundred thousand terms.
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, Hashable]] = []
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def put(self, key: Hashable, terms: Iterable[str], value: Any) -> None:
+        """Add `key`, or replace its terms and value."""
+        new_terms = tuple(dict.fromkeys(t for t in terms if t))
+        with self._lock:
+            self._discard(key)
+            for term in new_terms:
+                insort(self._entries, (term, key))
+            self._terms[key] = new_terms
+            self._values[key] = value
+
+    def put_many(self, records: Iterable[Tuple[Hashable, Iterable[str], Any]]) -> None:
+        """put() for many (key, terms, value) records, sorting once (for the initial build)."""
+        with self._lock:
+            for key, terms, value in records:
+                self._discard(key)
+                new_terms = tuple(dict.fromkeys(t for t in terms if t))
+                self._entries.extend((term, key) for term in new_terms)
+                self._terms[key] = new_terms
+                self._values[key] = value
+            self._entries.sort()
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def search(self, prefix: str, limit: int) -> List[Any]:
+        """Values of up to `limit` distinct keys having a term that starts with `prefix`."""
+        results: List[Any] = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            while position < len(self._entries) and len(results) < limit:
+                term, key = self._entries[position]
+                if not term.startswith(prefix):
+                    break
+                if key not in seen:
+                    seen.add(key)
+                    results.append(self._values[key])
+                position += 1
+        return results
+
+    def _discard(self, key: Hashable) -> None:
+        for term in self._terms.pop(key, ()):
+            position = bisect_left(self._entries, (term, key))
+            if position < len(self._entries) and self._entries[position] == (term, key):
+                del self._entries[position]
+        self._values.pop(key, None)
@@ -0,0 +1,103 @@
+"""In-memory trigram index for ranked fuzzy search over a few text fields per key."""
+
+import heapq
+import re
+import threading
+from itertools import islice
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+# Longest query considered; bounds the number of query trigrams
+MAX_QUERY_LENGTH = 64
+# Stop collecting candidates from rarer to more common trigrams past this many
+MAX_CANDIDATES = 2000
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def trigrams(text: Optional[str]) -> FrozenSet[str]:
+    """
+    Trigrams of each word, padded like PostgreSQL pg_trgm ("  w", " wo", ..., "d "),
+    after casefolding and dropping punctuation: "Mehta Ind." and "mehta ind" match.
+    """
+    grams: Set[str] = set()
+    for word in _NON_WORD.sub(" ", str(text or "").casefold()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """
+    Inverted index trigram → (key, field) documents.
+    search() ranks keys by the best weighted similarity of any of their fields:
+    shared trigrams / all trigrams of query and field (Jaccard). Candidates come
+    from the rarest query trigrams first and are capped at MAX_CANDIDATES (a
+    posting list that would overflow the cap contributes only part of its
+    documents), so a search costs O(MAX_CANDIDATES × query trigrams) whatever
+    the index size.
+    Thread-safe.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or {}
+        self._postings: Dict[str, Set[Tuple[Hashable, str]]] = {}
+        self._documents: Dict[Tuple[Hashable, str], FrozenSet[str]] = {}
+        self._fields: Dict[Hashable, Tuple[str, ...]] = {}
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def put(self, key: Hashable, texts: Dict[str, Optional[str]], value: Any) -> None:
+        """Add `key` with its field texts, or replace them."""
+        documents = {field: trigrams(text) for field, text in texts.items()}
+        with self._lock:
+            self._discard(key)
+            for field, grams in documents.items():
+                if not grams:
+                    continue
+                self._documents[(key, field)] = grams
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add((key, field))
+            self._fields[key] = tuple(f for f, grams in documents.items() if grams)
+            self._values[key] = value
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def search(self, query: str, limit: int, min_score: float = 0.3) -> List[Tuple[float, str, Any]]:
+        """Up to `limit` (score, matched field, value) results with score >= min_score, best first."""
+        query_grams = trigrams(query[:MAX_QUERY_LENGTH])
+        if not query_grams:
+            return []
+        with self._lock:
+            candidates: Set[Tuple[Hashable, str]] = set()
+            for gram in sorted(query_grams, key=lambda g: len(self._postings.get(g, ()))):
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+                postings = self._postings.get(gram)
+                if postings:
+                    candidates.update(islice(postings, MAX_CANDIDATES - len(candidates)))
+
+            best: Dict[Hashable, Tuple[float, str]] = {}
+            for key, field in candidates:
+                grams = self._documents[(key, field)]
+                shared = len(query_grams & grams)
+                score = self.weights.get(field, 1.0) * shared / (len(query_grams) + len(grams) - shared)
+                if score >= min_score and score > best.get(key, (0.0, ""))[0]:
+                    best[key] = (score, field)
+
+            ranked = heapq.nlargest(limit, best.items(), key=lambda entry: entry[1][0])
+            return [(round(score, 4), field, self._values[key]) for key, (score, field) in ranked]
+
+    def _discard(self, key: Hashable) -> None:
+        for field in self._fields.pop(key, ()):
+            for gram in self._documents.pop((key, field), ()):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard((key, field))
+                    if not postings:
+                        del self._postings[gram]
+        self._values.pop(key, None)